@@ -0,0 +1,72 @@
+"""
+Cherche le point de bascule du cache de résultats : coût par appel de convertir
+et d'evaluer, avec et sans cache, selon le nombre de requêtes distinctes (donc
+le taux de succès du cache, dont la taille est fixe).
+
+Usage: python benchmarks/bench_cache.py [appels] [taille_cache]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cache import activer_cache, desactiver_cache, statistiques_cache
+import conversions
+import expressions
+
+DISTINCTES = (1, 100, 1_000, 4_096, 10_000, 100_000, 1_000_000)
+
+
+def mesurer(appels, fonction):
+    """Renvoie le coût moyen d'un appel en ns"""
+    debut = time.perf_counter()
+    for arguments in appels:
+        fonction(*arguments)
+    return (time.perf_counter() - debut) / len(appels) * 1e9
+
+
+def comparer(nom, module, fonction, generer, nombre_appels, taille_cache, distinctes):
+    """Mesure module.fonction, relue après chaque (dés)activation : le cache remplace conversions.convertir"""
+    print(f"\n{nom} (cache de {taille_cache} entrées)")
+    print(f"{'distinctes':>10} {'succès':>7} {'direct':>9} {'cache':>9} {'gain':>6}")
+    bascule = None
+    for n in distinctes:
+        aleatoire = random.Random(n)
+        appels = [generer(aleatoire.randrange(n)) for _ in range(nombre_appels)]
+
+        desactiver_cache()
+        direct = mesurer(appels, getattr(module, fonction))
+        activer_cache(taille_cache)
+        mesurer(appels[:taille_cache], getattr(module, fonction))  # préchauffage
+        avec_cache = mesurer(appels, getattr(module, fonction))
+        taux = statistiques_cache()[nom]["taux_succes"]
+        desactiver_cache()
+
+        print(f"{n:>10} {taux:>6.0%} {direct:>7.0f}ns {avec_cache:>7.0f}ns {direct / avec_cache:>5.2f}x")
+        if bascule is None and avec_cache > direct:
+            bascule = (n, taux)
+    if bascule and bascule[0] == distinctes[0]:
+        print("-> le cache ne paie jamais : l'appel direct est plus rapide même à 100 % de succès")
+    elif bascule:
+        print(f"-> le cache ne paie plus à partir de {bascule[0]} requêtes distinctes "
+              f"(taux de succès ~{bascule[1]:.0%})")
+    else:
+        print("-> le cache reste rentable sur toute la plage mesurée")
+
+
+def main():
+    nombre_appels = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    taille_cache = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+
+    comparer("conversions", conversions, "convertir", lambda i: (float(i), "km", "mile", "longueur"),
+             nombre_appels, taille_cache, DISTINCTES)
+    # evaluer mémorise déjà l'arbre syntaxique par texte : on reste sous sa
+    # propre limite pour ne mesurer que le cache de résultats
+    comparer("expressions", expressions, "evaluer", lambda i: (f"{i} km + 300 m",),
+             nombre_appels // 4, taille_cache, DISTINCTES[:4])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Compare le chemin float (convertir) et le chemin exact (convertir_exact, en
+Fraction et en Decimal), et vérifie l'aller-retour µm -> mile -> nm.
+
+Usage: python benchmarks/bench_exact.py [nombre_de_conversions]
+"""
+import os
+import sys
+import time
+from decimal import Decimal
+from fractions import Fraction
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversions import convertir, convertir_exact
+
+
+def mesurer(fonction, nombre, repetitions=3):
+    """Renvoie le meilleur temps par conversion, en microsecondes"""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur / nombre * 1e6
+
+
+def main():
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    valeurs = list(range(nombre))
+
+    # Aller-retour : le chemin float dérive, le chemin exact non
+    aller = convertir(1, "µm", "mile", "longueur")
+    print(f"float : 1 µm -> mile -> nm = {convertir(aller, 'mile', 'nm', 'longueur')!r}")
+    aller = convertir_exact(1, "µm", "mile", "longueur")
+    print(f"exact : 1 µm -> mile -> nm = {convertir_exact(aller, 'mile', 'nm', 'longueur')}")
+
+    for source, cible, grandeur in [("km", "mile", "longueur"), ("°F", "°C", "temperature")]:
+        print(f"\n{source} -> {cible} ({grandeur}), {nombre} conversions")
+        reference = mesurer(lambda: [convertir(v, source, cible, grandeur) for v in valeurs], nombre)
+        print(f"  {'float':<10} {reference:8.3f} µs/conversion")
+        for type_resultat in (Fraction, Decimal):
+            duree = mesurer(
+                lambda: [convertir_exact(v, source, cible, grandeur, type_resultat) for v in valeurs],
+                nombre,
+            )
+            print(f"  {type_resultat.__name__:<10} {duree:8.3f} µs/conversion  (x{duree / reference:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Vérifie que le coût par conversion côté interface reste constant quand
+l'historique grossit : ajout dans le journal et lecture de la fenêtre visible
+(ce que fait VueHistorique), pour 1k, 10k et 100k entrées.
+
+Usage: python benchmarks/bench_historique.py [taille_max]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from historique import JournalHistorique
+
+LIGNES_VISIBLES = 40  # fenêtre par défaut de VueHistorique
+
+
+def main():
+    taille_max = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as dossier:
+        journal = JournalHistorique(os.path.join(dossier, "historique.jsonl"), retention=None)
+        taille = 0
+        palier = 1_000
+        while palier <= taille_max:
+            journal.importer(
+                {"horodatage": "2024-01-01 12:00:00", "texte": f"{i} km = {i * 0.621371:.6g} mile"}
+                for i in range(taille, palier)
+            )
+            journal.vider()
+            taille = palier
+
+            mesures = 200
+            debut = time.perf_counter()
+            for i in range(mesures):
+                journal.ajouter(f"{i} km = {i * 0.621371:.6g} mile")
+            ajout = (time.perf_counter() - debut) / mesures
+            journal.vider()
+
+            debut = time.perf_counter()
+            for _ in range(mesures):
+                total = journal.nombre()
+                journal.lire_plage(total - LIGNES_VISIBLES, total)
+            fenetre = (time.perf_counter() - debut) / mesures
+
+            print(f"{journal.nombre():>9} entrées : ajout {ajout * 1e6:7.1f} µs, "
+                  f"fenêtre de {LIGNES_VISIBLES} lignes {fenetre * 1e6:7.1f} µs")
+            taille = journal.nombre()
+            palier *= 10
+        journal.fermer()
+
+
+if __name__ == "__main__":
+    main()
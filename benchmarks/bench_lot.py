@@ -0,0 +1,54 @@
+"""
+Compare le débit (valeurs/seconde) de convertir_lot avec la boucle scalaire
+sur convertir, pour une grandeur standard et pour la température.
+
+Usage: python benchmarks/bench_lot.py [taille]
+"""
+import os
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversions import convertir, convertir_lot
+
+
+def mesurer(fonction, taille, repetitions=3):
+    """Renvoie le meilleur débit observé en valeurs/seconde"""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return taille / meilleur
+
+
+def main():
+    taille = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    valeurs = [float(i) for i in range(taille)]
+    cas = [("km", "mile", "longueur"), ("°C", "°F", "temperature")]
+
+    conteneurs = {
+        "list": valeurs,
+        "array.array": array("d", valeurs),
+        "memoryview": memoryview(array("d", valeurs)),
+    }
+    try:
+        import numpy as np
+        conteneurs["numpy"] = np.asarray(valeurs)
+    except ImportError:
+        pass
+
+    print(f"{taille} valeurs par lot")
+    for source, cible, grandeur in cas:
+        print(f"\n{source} -> {cible} ({grandeur})")
+        scalaire = mesurer(lambda: [convertir(v, source, cible, grandeur) for v in valeurs], taille)
+        print(f"  {'boucle convertir':<20} {scalaire:>14,.0f} valeurs/s")
+        for nom, lot in conteneurs.items():
+            debit = mesurer(lambda: convertir_lot(lot, source, cible, grandeur), taille)
+            print(f"  {nom:<20} {debit:>14,.0f} valeurs/s  (x{debit / scalaire:.1f})")
+
+
+if __name__ == "__main__":
+    main()
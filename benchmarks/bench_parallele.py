@@ -0,0 +1,53 @@
+"""
+Mesure la mise à l'échelle de convertir_lot_parallele de 1 à N processus,
+comparée à convertir_lot sur un seul cœur.
+
+Usage: python benchmarks/bench_parallele.py [taille] [processus_max]
+"""
+import os
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversions import convertir_lot
+from parallele import convertir_lot_parallele, fermer_pool
+
+
+def mesurer(fonction, repetitions=3):
+    """Renvoie le meilleur temps en secondes"""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur
+
+
+def main():
+    taille = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    processus_max = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    lot = array("d", range(taille))
+    try:
+        import numpy as np
+        lot = np.arange(taille, dtype="d")
+    except ImportError:
+        pass
+    print(f"{taille} valeurs ({type(lot).__name__}), km -> mile")
+
+    reference = mesurer(lambda: convertir_lot(lot, "km", "mile", "longueur"))
+    print(f"  {'convertir_lot':<16} {taille / reference:>14,.0f} valeurs/s")
+
+    for processus in range(1, processus_max + 1):
+        # seuil=0 force la mémoire partagée (1 processus revient à convertir_lot)
+        convertir_lot_parallele(lot, "km", "mile", "longueur", processus=processus, seuil=0)  # démarrage du pool
+        duree = mesurer(lambda: convertir_lot_parallele(
+            lot, "km", "mile", "longueur", processus=processus, seuil=0))
+        print(f"  {processus:>2} processus     {taille / duree:>14,.0f} valeurs/s  (x{reference / duree:.2f})")
+    fermer_pool()
+
+
+if __name__ == "__main__":
+    main()
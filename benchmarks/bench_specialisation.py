@@ -0,0 +1,80 @@
+"""
+Mesure le gain de la spécialisation automatique des paires chaudes de
+convertir sur un trafic asymétrique : les paires d'unités sont tirées selon une
+loi de Zipf (quelques paires font l'essentiel des appels). La seconde moitié
+du trafic change de paires favorites, pour vérifier que les anciennes sont
+évincées au profit des nouvelles.
+
+Usage: python benchmarks/bench_specialisation.py [appels] [exposant]
+"""
+import os
+import random
+import sys
+import time
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import conversions
+from conversions import TAILLE_SPECIALISATION, configurer_specialisation, statistiques_specialisation
+from constantes import GRANDEURS
+
+
+def paires():
+    """Toutes les paires (source, cible, grandeur) des tables intégrées"""
+    return [(source, cible, grandeur)
+            for grandeur, unites in GRANDEURS.items()
+            for source in unites for cible in unites if source != cible]
+
+
+def trafic(toutes, nombre, exposant, graine):
+    """Appels dont les paires suivent une loi de Zipf sur un ordre aléatoire des paires"""
+    aleatoire = random.Random(graine)
+    ordre = toutes[:]
+    aleatoire.shuffle(ordre)
+    poids = list(accumulate(1 / rang ** exposant for rang in range(1, len(ordre) + 1)))
+    choisies = aleatoire.choices(ordre, cum_weights=poids, k=nombre)
+    return [(aleatoire.uniform(-100, 100), *paire) for paire in choisies]
+
+
+def mesurer(appels, repetitions=3):
+    """Meilleur coût moyen par appel en ns"""
+    convertir = conversions.convertir  # variante installée par configurer_specialisation
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        for valeur, source, cible, grandeur in appels:
+            convertir(valeur, source, cible, grandeur)
+        meilleur = min(meilleur, time.perf_counter() - debut)
+    return meilleur / len(appels) * 1e9
+
+
+def main():
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 400_000
+    exposant = float(sys.argv[2]) if len(sys.argv) > 2 else 1.1
+    toutes = paires()
+    # Deux phases de trafic aux paires favorites différentes
+    appels = trafic(toutes, nombre // 2, exposant, 1) + trafic(toutes, nombre // 2, exposant, 2)
+    print(f"{len(toutes)} paires, {nombre} appels, Zipf s={exposant}")
+
+    configurer_specialisation(taille=0)
+    attendus = [conversions.convertir(*appel) for appel in appels]
+    generique = mesurer(appels)
+
+    print(f"\n{'paires spécialisées':>20} {'ns/appel':>9} {'gain':>6} {'part chaude':>12} {'évictions':>10}")
+    print(f"{0:>20} {generique:>9.0f} {1:>5.2f}x {'-':>12} {'-':>10}")
+    for taille in (8, 32, TAILLE_SPECIALISATION):
+        configurer_specialisation(taille=taille)
+        obtenus = [conversions.convertir(*appel) for appel in appels]
+        if obtenus != attendus:
+            raise SystemExit("ÉCHEC : résultats différents du chemin générique")
+        stats = statistiques_specialisation()  # une passe depuis une table vide
+        part = stats["appels_specialises"] / (stats["appels_specialises"] + stats["appels_generiques"])
+        specialise = mesurer(appels)
+        print(f"{taille:>20} {specialise:>9.0f} {generique / specialise:>5.2f}x {part:>11.0%} "
+              f"{stats['evictions']:>10}")
+    configurer_specialisation(taille=0)
+
+
+if __name__ == "__main__":
+    main()
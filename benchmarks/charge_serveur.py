@@ -0,0 +1,128 @@
+"""
+Test de charge du service de conversion (serveur.py) : lance le serveur dans
+un processus séparé puis envoie des conversions simples depuis N connexions
+persistantes simultanées. Affiche les latences p50/p99, le débit et la taille
+moyenne des lots formés par le regroupement côté serveur.
+
+Usage: python benchmarks/charge_serveur.py [requetes] [connexions] [--unix] [--delai-lot MS]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+CORPS = {"valeur": 0, "de": "km", "vers": "mile", "grandeur": "longueur"}
+
+
+def port_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def ouvrir(adresse):
+    if isinstance(adresse, str):
+        return await asyncio.open_unix_connection(adresse)
+    return await asyncio.open_connection(*adresse)
+
+
+async def requete(lecteur, ecrivain, methode, chemin, donnees=None):
+    corps = json.dumps(donnees).encode() if donnees is not None else b""
+    ecrivain.write(
+        f"{methode} {chemin} HTTP/1.1\r\nHost: local\r\nContent-Length: {len(corps)}\r\n\r\n".encode() + corps
+    )
+    await ecrivain.drain()
+    await lecteur.readline()
+    longueur = 0
+    while True:
+        ligne = await lecteur.readline()
+        if ligne == b"\r\n":
+            break
+        nom, _, valeur = ligne.decode().partition(":")
+        if nom.lower() == "content-length":
+            longueur = int(valeur)
+    return json.loads(await lecteur.readexactly(longueur))
+
+
+async def client(adresse, nombre, latences):
+    lecteur, ecrivain = await ouvrir(adresse)
+    for i in range(nombre):
+        debut = time.perf_counter()
+        await requete(lecteur, ecrivain, "POST", "/convertir", dict(CORPS, valeur=i))
+        latences.append(time.perf_counter() - debut)
+    ecrivain.close()
+
+
+async def attendre_serveur(adresse, delai=10):
+    limite = time.monotonic() + delai
+    while True:
+        try:
+            lecteur, ecrivain = await ouvrir(adresse)
+            ecrivain.close()
+            return
+        except OSError:
+            if time.monotonic() > limite:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def charger(adresse, requetes, connexions):
+    await attendre_serveur(adresse)
+    latences = []
+    debut = time.perf_counter()
+    await asyncio.gather(*(client(adresse, requetes // connexions, latences) for _ in range(connexions)))
+    duree = time.perf_counter() - debut
+
+    lecteur, ecrivain = await ouvrir(adresse)
+    sante = await requete(lecteur, ecrivain, "GET", "/sante")
+    ecrivain.close()
+    return latences, duree, sante
+
+
+def centile(valeurs_triees, p):
+    return valeurs_triees[min(len(valeurs_triees) - 1, int(p / 100 * len(valeurs_triees)))]
+
+
+def main():
+    parseur = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parseur.add_argument("requetes", nargs="?", type=int, default=20_000)
+    parseur.add_argument("connexions", nargs="?", type=int, default=64)
+    parseur.add_argument("--unix", action="store_true", help="passer par une socket Unix plutôt que TCP")
+    parseur.add_argument("--delai-lot", default="0", help="délai de regroupement du serveur, en ms")
+    args = parseur.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        commande = [sys.executable, os.path.join(RACINE, "serveur.py"), "--delai-lot", args.delai_lot]
+        if args.unix:
+            adresse = os.path.join(dossier, "unitswitch.sock")
+            commande += ["--sans-tcp", "--socket", adresse]
+        else:
+            adresse = ("127.0.0.1", port_libre())
+            commande += ["--port", str(adresse[1])]
+
+        serveur = subprocess.Popen(commande, stderr=subprocess.DEVNULL)
+        try:
+            latences, duree, sante = asyncio.run(charger(adresse, args.requetes, args.connexions))
+        finally:
+            serveur.terminate()
+            serveur.wait()
+
+    latences.sort()
+    print(f"{len(latences)} requêtes sur {args.connexions} connexions "
+          f"({'socket Unix' if args.unix else 'TCP'}), délai de lot {args.delai_lot} ms")
+    print(f"  débit : {len(latences) / duree:,.0f} req/s")
+    print(f"  p50   : {centile(latences, 50) * 1e3:.2f} ms")
+    print(f"  p99   : {centile(latences, 99) * 1e3:.2f} ms")
+    print(f"  lots  : {sante['lots']} (taille moyenne {sante['taille_moyenne_lot']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Suite de micro-benchmarks du moteur de conversion, pour détecter les
+régressions de performance : convertir, convertir_standard,
+convertir_temperature, les fonctions par grandeur (convertir_longueur...),
+l'évaluation d'expressions et la persistance de l'historique, chacun sur
+plusieurs tailles d'entrée.
+
+Les résultats (coût moyen par opération, médiane de plusieurs répétitions, et
+dispersion de ces répétitions) sont écrits en JSON ; comparés à une référence
+enregistrée, un cas plus lent que la référence au-delà du seuil fait échouer la
+suite (code de sortie 1). Une référence ne vaut que pour la machine qui l'a
+produite.
+
+Contre le bruit de la machine :
+- les répétitions des cas sont entrelacées : une perturbation passagère ne
+  touche qu'une répétition par cas, que la médiane écarte ;
+- une boucle d'étalonnage indépendante du moteur est mesurée avec les cas, et
+  la référence est ramenée à la vitesse de la machine au moment du passage ;
+- le seuil d'un cas est élargi à la dispersion de ses répétitions.
+
+Aucune référence n'est livrée avec le dépôt : elle se crée sur la machine qui
+compare, avant les changements à vérifier. Sans référence, la comparaison
+échoue (code de sortie 2) ; --sans-reference se contente alors de mesurer.
+
+Usage:
+    python benchmarks/suite.py --enregistrer-reference      # crée la référence
+    python benchmarks/suite.py                              # compare à la référence
+    python benchmarks/suite.py --sans-reference             # mesure seulement
+    python benchmarks/suite.py --rapide --seuil 0.25 --cas convertir
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversions import (convertir, convertir_longueur, convertir_masse, convertir_standard,
+                         convertir_temperature, convertir_temps)
+from expressions import evaluer
+from historique import JournalHistorique
+
+DOSSIER = os.path.dirname(os.path.abspath(__file__))
+CHEMIN_REFERENCE = os.path.join(DOSSIER, "reference.json")
+CHEMIN_RESULTATS = os.path.join(DOSSIER, "resultats.json")
+TAILLES = (1_000, 10_000, 100_000)
+TAILLES_RAPIDES = (1_000, 10_000)
+SEUIL = 0.25  # ralentissement relatif toléré avant de signaler une régression
+VERSION_RESULTATS = 2  # 2 : médiane, dispersion et étalonnage au lieu du meilleur temps
+ETALONNAGE = "etalonnage"
+
+# --- Cas mesurés ---
+# Chaque cas reçoit la taille et un dossier temporaire, et renvoie une fonction
+# qui effectue `taille` opérations, ou un couple (fonction, nettoyage) quand des
+# ressources doivent être libérées après la mesure ; la préparation n'est pas mesurée.
+
+def _valeurs(taille):
+    return [i * 0.37 for i in range(taille)]
+
+def _boucle(fonction, *arguments):
+    def preparer(taille, dossier):
+        valeurs = _valeurs(taille)
+
+        def executer():
+            for valeur in valeurs:
+                fonction(valeur, *arguments)
+        return executer
+    return preparer
+
+def _evaluer(taille, dossier):
+    # Textes distincts, mais en nombre borné pour rester dans le cache
+    # d'arbres syntaxiques comme le ferait une saisie réelle
+    textes = [f"{i % 200} km + {i % 5}00 m" for i in range(taille)]
+
+    def executer():
+        for texte in textes:
+            evaluer(texte)
+    return executer
+
+def _entrees(debut, fin):
+    for i in range(debut, fin):
+        yield {"horodatage": "2024-01-01 12:00:00", "texte": f"{i} km = {i * 0.621371:.6g} mile",
+               "grandeur": "longueur", "valeur": float(i), "source": "km", "cible": "mile",
+               "resultat": i * 0.621371}
+
+def _journal_rempli(taille, dossier, nom):
+    chemin = os.path.join(dossier, f"{nom}-{taille}.jsonl")
+    if not os.path.exists(chemin):
+        journal = JournalHistorique(chemin, retention=None)
+        try:
+            journal.importer(_entrees(0, taille))
+        finally:
+            journal.fermer()
+    return chemin
+
+def _historique_ajout(taille, dossier):
+    journal = JournalHistorique(os.path.join(dossier, f"ajout-{taille}.jsonl"), retention=None)
+    journal.pret()  # attend la construction de l'index
+
+    def executer():
+        for i in range(taille):
+            journal.ajouter(f"{i} km = {i * 0.621371:.6g} mile", grandeur="longueur")
+        journal.vider()
+    return executer, journal.fermer
+
+def _historique_lecture(taille, dossier):
+    journal = JournalHistorique(_journal_rempli(taille, dossier, "lecture"), retention=None)
+    journal.pret()
+
+    def executer():
+        for debut in range(0, taille, 1_000):
+            journal.lire_plage(debut, debut + 1_000)
+    return executer, journal.fermer
+
+def _historique_ouverture(taille, dossier):
+    chemin = _journal_rempli(taille, dossier, "ouverture")
+
+    def executer():
+        # Sans instantané : l'index est reconstruit en relisant tout le fichier
+        if os.path.exists(chemin + ".index"):
+            os.remove(chemin + ".index")
+        journal = JournalHistorique(chemin, retention=None)
+        try:
+            journal.rechercher()
+        finally:
+            journal.fermer()
+    return executer
+
+def _etalonnage(taille, dossier):
+    # Boucle Python fixe, sans le moteur : mesure la vitesse de la machine
+    def executer():
+        total = 0.0
+        for i in range(taille):
+            total += i * 0.37
+    return executer
+
+CAS = {
+    "convertir": _boucle(convertir, "km", "mile", "longueur"),
+    "convertir.temperature": _boucle(convertir, "°C", "°F", "temperature"),
+    "convertir_standard": _boucle(convertir_standard, "km", "mile", "longueur"),
+    "convertir_temperature": _boucle(convertir_temperature, "°C", "°F"),
+    "convertir_longueur": _boucle(convertir_longueur, "km", "mile"),
+    "convertir_masse": _boucle(convertir_masse, "kg", "livre"),
+    "convertir_temps": _boucle(convertir_temps, "h", "s"),
+    "evaluer": _evaluer,
+    "historique.ajout": _historique_ajout,
+    "historique.lecture": _historique_lecture,
+    "historique.ouverture": _historique_ouverture,
+}
+
+# --- Mesure ---
+
+def mesurer(executions, repetitions):
+    """
+    Mesure des cas préparés en entrelaçant leurs répétitions : une répétition
+    de chaque cas, puis la suivante, etc.
+
+    Args:
+        executions (dict): {clé: (fonction, taille)}
+        repetitions (int): Nombre de répétitions de chaque cas
+
+    Returns:
+        dict: {clé: (médiane du coût moyen par opération en ns,
+        dispersion des répétitions : écart interquartile / médiane)}
+    """
+    durees = {cle: [] for cle in executions}
+    for executer, _ in executions.values():
+        executer()  # préchauffage
+    for _ in range(repetitions):
+        for cle, (executer, _) in executions.items():
+            debut = time.perf_counter()
+            executer()
+            durees[cle].append(time.perf_counter() - debut)
+
+    mesures = {}
+    for cle, (_, taille) in executions.items():
+        premier, mediane, troisieme = statistics.quantiles(durees[cle], n=4)
+        mesures[cle] = (mediane / taille * 1e9, (troisieme - premier) / mediane)
+    return mesures
+
+def executer_suite(cas, tailles, repetitions):
+    """
+    Returns:
+        tuple: ({"cas[taille]": {"cas", "taille", "ns_par_op", "dispersion"}},
+        coût d'une itération de la boucle d'étalonnage en ns)
+    """
+    executions = {ETALONNAGE: (_etalonnage(100_000, None), 100_000)}
+    nettoyages = []
+    with tempfile.TemporaryDirectory() as dossier:
+        try:
+            for nom in cas:
+                for taille in tailles:
+                    executer = CAS[nom](taille, dossier)
+                    if isinstance(executer, tuple):
+                        executer, nettoyer = executer
+                        nettoyages.append(nettoyer)
+                    executions[f"{nom}[{taille}]"] = (executer, taille)
+            mesures = mesurer(executions, repetitions)
+        finally:
+            # Journaux fermés avant la suppression du dossier temporaire
+            for nettoyer in nettoyages:
+                nettoyer()
+
+    resultats = {}
+    for nom in cas:
+        for taille in tailles:
+            cle = f"{nom}[{taille}]"
+            ns, dispersion = mesures[cle]
+            resultats[cle] = {"cas": nom, "taille": taille, "ns_par_op": ns, "dispersion": dispersion}
+            print(f"  {cle:<36} {ns:12.1f} ns/op  ±{dispersion / 2:.0%}")
+    etalonnage = mesures[ETALONNAGE][0]
+    print(f"  {ETALONNAGE:<36} {etalonnage:12.1f} ns/op")
+    return resultats, etalonnage
+
+def environnement():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "systeme": platform.system(),
+        "processeurs": os.cpu_count(),
+    }
+
+def comparer(resultats, reference, seuil, vitesse=1.0):
+    """
+    Compare des résultats à une référence. Le seuil d'un cas est élargi à la
+    plus grande dispersion mesurée (référence ou actuelle) : un écart qui reste
+    dans le bruit des répétitions n'est pas une régression.
+
+    Args:
+        resultats (dict): Résultats de executer_suite
+        reference (dict): Résultats de référence
+        seuil (float): Ralentissement relatif toléré
+        vitesse (float): Étalonnage actuel / étalonnage de la référence ; les
+            temps de référence sont multipliés par ce rapport
+
+    Returns:
+        list: Clés des cas plus lents que la référence au-delà du seuil
+    """
+    regressions = []
+    print(f"\n  {'cas':<36} {'référence':>12} {'actuel':>12} {'écart':>8} {'seuil':>7}")
+    for cle, mesure in resultats.items():
+        ancienne = reference.get(cle)
+        if ancienne is None:
+            print(f"  {cle:<36} {'-':>12} {mesure['ns_par_op']:12.1f} {'nouveau':>8}")
+            continue
+        attendu = ancienne["ns_par_op"] * vitesse
+        ecart = mesure["ns_par_op"] / attendu - 1
+        seuil_cas = max(seuil, mesure["dispersion"], ancienne["dispersion"])
+        marque = ""
+        if ecart > seuil_cas:
+            regressions.append(cle)
+            marque = "  RÉGRESSION"
+        print(f"  {cle:<36} {attendu:12.1f} {mesure['ns_par_op']:12.1f} {ecart:+8.1%} "
+              f"{seuil_cas:7.0%}{marque}")
+    return regressions
+
+def ecrire_json(chemin, donnees):
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        json.dump(donnees, f, indent=2, ensure_ascii=False)
+    os.replace(temporaire, chemin)
+
+def main():
+    parseur = argparse.ArgumentParser(description="Micro-benchmarks et contrôle de régression du moteur.")
+    parseur.add_argument("--sortie", default=CHEMIN_RESULTATS,
+                         help="fichier JSON des résultats (défaut benchmarks/resultats.json)")
+    parseur.add_argument("--reference", default=CHEMIN_REFERENCE,
+                         help="référence à comparer (défaut benchmarks/reference.json)")
+    parseur.add_argument("--enregistrer-reference", action="store_true",
+                         help="enregistre les résultats comme nouvelle référence")
+    parseur.add_argument("--seuil", type=float, default=SEUIL,
+                         help=f"ralentissement relatif toléré (défaut {SEUIL})")
+    parseur.add_argument("--repetitions", type=int, default=9,
+                         help="répétitions par mesure, au moins 2 (défaut 9)")
+    parseur.add_argument("--sans-reference", action="store_true",
+                         help="mesure sans comparer, même si aucune référence n'existe")
+    parseur.add_argument("--rapide", action="store_true", help=f"tailles réduites {TAILLES_RAPIDES}")
+    parseur.add_argument("--cas", nargs="+", choices=sorted(CAS), metavar="CAS",
+                         help=f"cas à mesurer (défaut tous : {', '.join(CAS)})")
+    args = parseur.parse_args()
+    if args.repetitions < 2:
+        # La dispersion (écart interquartile) demande au moins deux répétitions
+        parseur.error(f"--repetitions doit valoir au moins 2 (reçu {args.repetitions})")
+
+    cas = args.cas or list(CAS)
+    tailles = TAILLES_RAPIDES if args.rapide else TAILLES
+    resultats, etalonnage = executer_suite(cas, tailles, args.repetitions)
+    donnees = {
+        "version": VERSION_RESULTATS,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "environnement": environnement(),
+        "etalonnage_ns": etalonnage,
+        "resultats": resultats,
+    }
+    ecrire_json(args.sortie, donnees)
+    print(f"\nRésultats écrits dans {args.sortie}")
+
+    if args.enregistrer_reference:
+        ecrire_json(args.reference, donnees)
+        print(f"Référence enregistrée dans {args.reference}")
+        return 0
+    if args.sans_reference:
+        return 0
+    if not os.path.exists(args.reference):
+        print(f"ÉCHEC : aucune référence dans {args.reference} ; la créer avec --enregistrer-reference "
+              f"(ou mesurer seulement avec --sans-reference)")
+        return 2
+
+    with open(args.reference, encoding="utf-8") as f:
+        reference = json.load(f)
+    if reference.get("version") != VERSION_RESULTATS:
+        print(f"ÉCHEC : référence au format {reference.get('version')} (attendu {VERSION_RESULTATS}), "
+              f"la réenregistrer avec --enregistrer-reference")
+        return 2
+    if reference.get("environnement") != donnees["environnement"]:
+        print("Attention : référence produite dans un autre environnement, comparaison indicative")
+
+    vitesse = etalonnage / reference["etalonnage_ns"]
+    print(f"\nÉtalonnage : {etalonnage:.1f} ns/op contre {reference['etalonnage_ns']:.1f} pour la référence, "
+          f"temps de référence ramenés à x{vitesse:.2f}")
+    regressions = comparer(resultats, reference["resultats"], args.seuil, vitesse)
+    if regressions:
+        print(f"\nÉCHEC : {len(regressions)} régression(s) au-delà de {args.seuil:.0%} : {', '.join(regressions)}")
+        return 1
+    print(f"\nOK : aucune régression au-delà de {args.seuil:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Contrôle de non-régression du temps d'import du moteur de conversion, à partir
+de python -X importtime. Échoue (code de sortie 1) si le moteur importe une
+dépendance graphique ou lourde, ou si son temps d'import dépasse le budget.
+
+Chaque mesure se fait dans un interpréteur neuf ; on garde la meilleure de
+plusieurs exécutions pour écarter le bruit de la machine.
+
+Usage: python benchmarks/verifier_import.py [--budget MS] [--essais N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES_MOTEUR = ("constantes", "conversions", "expressions", "quantites", "flux", "binaire", "parallele")
+# Ne doivent jamais être chargés par un simple import du moteur
+INTERDITS = ("tkinter", "customtkinter", "webbrowser", "numpy", "multiprocessing",
+             "fractions", "decimal", "threading", "asyncio")
+BUDGET_MS = 30.0  # ~26 ms mesurés sur une VM lente à 1 cœur ; à resserrer sur une machine plus rapide
+
+
+def mesurer(modules):
+    """
+    Importe les modules dans un interpréteur neuf.
+
+    Returns:
+        tuple: (temps cumulé par module en µs, modules interdits chargés)
+    """
+    code = (
+        f"import sys; import {', '.join(modules)}; "
+        f"print(','.join(m for m in {INTERDITS!r} if m in sys.modules))"
+    )
+    processus = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=RACINE, capture_output=True, text=True, check=True,
+    )
+    cumuls = {}
+    for ligne in processus.stderr.splitlines():
+        if not ligne.startswith("import time:") or "|" not in ligne:
+            continue
+        _, cumul, nom = ligne.split("|")
+        nom = nom.strip()
+        if nom in modules and cumul.strip().isdigit():
+            cumuls[nom] = int(cumul)
+    charges = [m for m in processus.stdout.strip().split(",") if m]
+    return cumuls, charges
+
+
+def main():
+    parseur = argparse.ArgumentParser(description="Vérifie le temps d'import du moteur de conversion.")
+    parseur.add_argument("--budget", type=float, default=BUDGET_MS,
+                         help=f"temps d'import maximal du moteur en ms (défaut {BUDGET_MS})")
+    parseur.add_argument("--essais", type=int, default=7, help="nombre d'exécutions (défaut 7)")
+    args = parseur.parse_args()
+
+    meilleurs = {}
+    interdits = set()
+    for _ in range(args.essais):
+        cumuls, charges = mesurer(MODULES_MOTEUR)
+        interdits.update(charges)
+        for nom, cumul in cumuls.items():
+            meilleurs[nom] = min(cumul, meilleurs.get(nom, cumul))
+
+    # Les modules de premier niveau s'additionnent sans double compte
+    total = sum(meilleurs.values()) / 1000
+    for nom in MODULES_MOTEUR:
+        print(f"  {nom:<12} {meilleurs.get(nom, 0) / 1000:7.2f} ms")
+    print(f"  {'total':<12} {total:7.2f} ms (budget {args.budget:.1f} ms)")
+
+    echec = False
+    if interdits:
+        print(f"ÉCHEC : le moteur charge {', '.join(sorted(interdits))}")
+        echec = True
+    if total > args.budget:
+        print(f"ÉCHEC : import du moteur trop lent ({total:.2f} ms > {args.budget:.1f} ms)")
+        echec = True
+    if not echec:
+        print("OK")
+    return 1 if echec else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Conversion de fichiers binaires bruts de float64 petit-boutiste (une colonne de
+télémétrie par fichier). Les fichiers sont projetés en mémoire (mmap) et
+traités par blocs de taille fixe, sans jamais créer un float Python par valeur
+lorsque NumPy est disponible.
+"""
+import mmap
+import os
+import sys
+import time
+from array import array
+
+from conversions import coefficients
+
+TAILLE_FLOAT64 = 8
+TAILLE_BLOC = 8 * 1024 * 1024  # octets par bloc (1 048 576 valeurs)
+
+def _convertir_blocs_numpy(np, source, cible, nombre, facteur, decalage, valeurs_par_bloc):
+    """Multiplie bloc par bloc directement dans les pages projetées"""
+    vue_source = np.frombuffer(source, dtype="<f8", count=nombre)
+    vue_cible = vue_source if cible is source else np.frombuffer(cible, dtype="<f8", count=nombre)
+    for debut in range(0, nombre, valeurs_par_bloc):
+        fin = min(debut + valeurs_par_bloc, nombre)
+        np.multiply(vue_source[debut:fin], facteur, out=vue_cible[debut:fin])
+        if decalage:
+            np.add(vue_cible[debut:fin], decalage, out=vue_cible[debut:fin])
+
+def _convertir_blocs_array(source, cible, nombre, facteur, decalage, valeurs_par_bloc):
+    """Repli sans NumPy : un array.array par bloc, plus lent mais en mémoire bornée"""
+    permuter = sys.byteorder != "little"
+    for debut in range(0, nombre * TAILLE_FLOAT64, valeurs_par_bloc * TAILLE_FLOAT64):
+        fin = min(debut + valeurs_par_bloc * TAILLE_FLOAT64, nombre * TAILLE_FLOAT64)
+        bloc = array("d", source[debut:fin])
+        if permuter:
+            bloc.byteswap()
+        if decalage:
+            bloc = array("d", [v * facteur + decalage for v in bloc])
+        else:
+            bloc = array("d", [v * facteur for v in bloc])
+        if permuter:
+            bloc.byteswap()
+        cible[debut:fin] = bloc.tobytes()
+
+def convertir_fichier_binaire(entree, sortie, unite_source, unite_cible, grandeur, taille_bloc=TAILLE_BLOC):
+    """
+    Convertit un fichier de float64 petit-boutistes vers un autre fichier,
+    ou sur place si sortie vaut None ou désigne le fichier d'entrée.
+
+    Args:
+        entree (str): Chemin du fichier d'entrée
+        sortie (str ou None): Chemin du fichier de sortie, None pour écrire sur place
+        unite_source (str): Unité de départ
+        unite_cible (str): Unité cible
+        grandeur (str): Type de grandeur physique
+        taille_bloc (int): Taille d'un bloc en octets
+
+    Returns:
+        tuple: (nombre d'octets traités, durée en secondes)
+    """
+    facteur, decalage = coefficients(unite_source, unite_cible, grandeur)
+    if sortie is not None and os.path.exists(sortie) and os.path.samefile(entree, sortie):
+        # Ouvrir la sortie en "wb" viderait l'entrée avant de la lire
+        sortie = None
+
+    taille = os.path.getsize(entree)
+    if taille % TAILLE_FLOAT64:
+        raise ValueError(f"Taille de {entree} non multiple de 8 octets : {taille}")
+    nombre = taille // TAILLE_FLOAT64
+    valeurs_par_bloc = max(1, taille_bloc // TAILLE_FLOAT64)
+
+    debut = time.perf_counter()
+    if sortie is not None:
+        with open(sortie, "wb") as f:
+            f.truncate(taille)
+    if nombre == 0:
+        return 0, time.perf_counter() - debut
+
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    with open(entree, "r+b" if sortie is None else "rb") as f_entree:
+        acces = mmap.ACCESS_WRITE if sortie is None else mmap.ACCESS_READ
+        with mmap.mmap(f_entree.fileno(), taille, access=acces) as source:
+            if sortie is None:
+                _executer(np, source, source, nombre, facteur, decalage, valeurs_par_bloc)
+                source.flush()
+            else:
+                with open(sortie, "r+b") as f_sortie, \
+                        mmap.mmap(f_sortie.fileno(), taille, access=mmap.ACCESS_WRITE) as cible:
+                    _executer(np, source, cible, nombre, facteur, decalage, valeurs_par_bloc)
+                    cible.flush()
+
+    return taille, time.perf_counter() - debut
+
+def _executer(np, source, cible, nombre, facteur, decalage, valeurs_par_bloc):
+    """Choisit le chemin NumPy ou le repli array.array"""
+    if np is not None:
+        _convertir_blocs_numpy(np, source, cible, nombre, facteur, decalage, valeurs_par_bloc)
+    else:
+        _convertir_blocs_array(source, cible, nombre, facteur, decalage, valeurs_par_bloc)
@@ -0,0 +1,157 @@
+"""
+Cache de résultats optionnel devant convertir et evaluer, pour les tableaux de
+bord qui redemandent sans cesse les mêmes conversions. Il est désactivé par
+défaut : une conversion simple ne coûte qu'une multiplication, et le cache ne
+rapporte que si le taux de succès est élevé (voir benchmarks/bench_cache.py).
+
+Pour un convertir scalaire, même à 100 % de succès, la lecture du cache coûte
+plus cher que le calcul qu'elle évite (~684 ns contre ~387 ns par appel pour
+km -> mile) : le cache de conversions ralentit l'appel. Seul le cache
+d'evaluer, qui évite l'analyse et l'évaluation d'une expression, fait gagner
+du temps ; le réglage conseillé est donc activer_cache(conversions=False).
+Seules les valeurs scalaires (int, float, Fraction, Decimal) sont mises en
+cache : un tableau numpy ou une liste est converti directement. Désactivé, le
+cache de conversions ne coûte rien : conversions.convertir n'est remplacée par
+la variante avec cache qu'à l'activation.
+
+Exemple:
+    from cache import activer_cache, statistiques_cache
+    activer_cache(taille=10_000, ttl=60, conversions=False)
+    ...
+    statistiques_cache()  # {"conversions": {"succes": ..., "echecs": ...}, ...}
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from conversions import MANQUANT
+
+TAILLE_CACHE = 4096
+
+class CacheLRU:
+    """
+    Cache borné : l'entrée la moins récemment utilisée est évincée quand il est
+    plein ; avec un ttl, une entrée plus ancienne que ttl secondes est ignorée.
+
+    Args:
+        taille (int): Nombre maximal d'entrées
+        ttl (float, optional): Durée de vie d'une entrée en secondes
+    """
+
+    def __init__(self, taille=TAILLE_CACHE, ttl=None):
+        if taille < 1:
+            raise ValueError(f"Taille de cache invalide : {taille}")
+        self.taille = taille
+        self.ttl = ttl
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def lire(self, cle):
+        """Renvoie la valeur mémorisée pour cle, ou MANQUANT"""
+        # Lecture sans verrou : les opérations élémentaires du dict sont
+        # atomiques, une entrée évincée entre-temps compte comme un échec
+        entrees = self._entrees
+        try:
+            valeur = entrees[cle]
+            if self.ttl is not None:
+                valeur, expiration = valeur
+                if time.monotonic() >= expiration:
+                    entrees.pop(cle, None)
+                    self.expirations += 1
+                    raise KeyError(cle)
+            entrees.move_to_end(cle)
+        except KeyError:
+            self.echecs += 1
+            return MANQUANT
+        self.succes += 1
+        return valeur
+
+    def ecrire(self, cle, valeur):
+        with self._verrou:
+            if self.ttl is not None:
+                valeur = (valeur, time.monotonic() + self.ttl)
+            self._entrees[cle] = valeur
+            self._entrees.move_to_end(cle)
+            if len(self._entrees) > self.taille:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+
+    def statistiques(self):
+        lectures = self.succes + self.echecs
+        return {
+            "taille": len(self._entrees),
+            "taille_max": self.taille,
+            "ttl": self.ttl,
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "taux_succes": self.succes / lectures if lectures else 0.0,
+        }
+
+def activer_cache(taille=TAILLE_CACHE, ttl=None, conversions=True, expressions=True):
+    """
+    Place un cache de résultats devant convertir et/ou evaluer. Réactiver
+    remplace le cache existant (compteurs remis à zéro).
+
+    Args:
+        taille (int): Nombre maximal d'entrées de chaque cache
+        ttl (float, optional): Durée de vie d'une entrée en secondes
+        conversions (bool): Mettre en cache conversions.convertir (plus lent qu'un
+            calcul direct pour une valeur scalaire, voir plus haut)
+        expressions (bool): Mettre en cache expressions.evaluer
+    """
+    import conversions as module_conversions
+    import expressions as module_expressions
+
+    if conversions:
+        from decimal import Decimal
+        from fractions import Fraction
+
+        module_conversions._TYPES_CACHABLES.update((Fraction, Decimal))
+        module_conversions._cache = CacheLRU(taille, ttl)
+        module_conversions._installer_convertir()
+    if expressions:
+        module_expressions._cache = CacheLRU(taille, ttl)
+
+def desactiver_cache():
+    """Retire les caches : convertir et evaluer calculent de nouveau chaque appel"""
+    import conversions as module_conversions
+    import expressions as module_expressions
+
+    module_conversions._cache = None
+    module_conversions._installer_convertir()
+    module_expressions._cache = None
+
+def vider_cache():
+    """Oublie les résultats mémorisés (à appeler si les tables d'unités changent)"""
+    for cache in _caches().values():
+        if cache is not None:
+            cache.vider()
+
+def statistiques_cache():
+    """
+    Renvoie les compteurs de chaque cache actif.
+
+    Returns:
+        dict: {"conversions": {...}, "expressions": {...}}, None pour un cache inactif
+    """
+    return {nom: cache.statistiques() if cache is not None else None
+            for nom, cache in _caches().items()}
+
+def _caches():
+    import conversions as module_conversions
+    import expressions as module_expressions
+
+    return {"conversions": module_conversions._cache, "expressions": module_expressions._cache}
@@ -1,7 +1,12 @@
 """
 Ce fichier contient tous les facteurs de conversion pour les 7 grandeurs du SI.
-Les valaeurs sont basées sur le système métrique et les unités courantes.
+Les valeurs sont basées sur le système métrique et les unités courantes.
+Des unités supplémentaires peuvent être définies dans un fichier utilisateur,
+voir registre.py.
 """
+from array import array
+from collections import namedtuple
+
 # Facteur de conversion par rapport à l'unité SI de reférence
 LONGUEUR = {
     # Unités SI (l'unité de reférence est le m)
@@ -12,7 +17,6 @@ LONGUEUR = {
     "mm" : 0.001,
     "µm" : 1e-6,
     "nm" : 1e-9,
-    "m" : 1,
     # Unités non SI
     "pouce" : 0.0254,
     "pied" : 0.3048,
@@ -29,7 +33,7 @@ MASSE = {
     "tonne" : 1000,
     # Unités non SI
     "livre" : 0.453592,
-    "once" : 0.283495
+    "once" : 0.0283495
 }
 
 TEMPS = {
@@ -42,7 +46,7 @@ TEMPS = {
     "min" : 60,
     "h" : 3600,
     "jour" : 86400,
-    "an" : 313536000 #Pour une année non bissextile.
+    "an" : 31536000 # Pour une année non bissextile (365 jours).
 }
 
 INTENSITE_ELECTRIQUE = {
@@ -54,19 +58,11 @@ INTENSITE_ELECTRIQUE = {
 }
 
 TEMPERATURE = {
-    # Unités possibles et formules de conversion en fonction de K(supposée de reférence)
-    "K" : {
-        "vers_K": lambda x: x,
-        "depuis_K": lambda x: x
-    },
-    "°C" : {
-        "vers_K": lambda c: c + 273.15,
-        "depuis_K": lambda k: k - 273.15
-    },
-    "°F" : {
-        "vers_K": lambda f: (f - 32) * 5/9 + 273.15,
-        "depuis_K": lambda k: (k - 273.15) * 9/5 + 32
-    }
+    # Coefficients (echelle, decalage) tels que K = valeur * echelle + decalage
+    # (K est supposée de reférence). Écrits en rationnels exacts, voir rationnel().
+    "K" : ("1", "0"),
+    "°C" : ("1", "273.15"),
+    "°F" : ("5/9", "45967/180")  # 273.15 - 32 * 5/9
 }
 
 INTENSITE_LUMINEUSE = {
@@ -79,7 +75,7 @@ INTENSITE_LUMINEUSE = {
 QUANTITE_MATIERE = {
     # Unités SI
     "mol" : 1,
-    "mmmol" : 0.001,
+    "mmol" : 0.001,
     "kmol" : 1000
 }
 
@@ -92,4 +88,167 @@ GRANDEURS = {
     "temperature" : TEMPERATURE,
     "intensite_lumineuse" : INTENSITE_LUMINEUSE,
     "quantite_matiere" : QUANTITE_MATIERE,
-}
\ No newline at end of file
+}
+
+# Vecteur des exposants de chaque grandeur de base, dans l'ordre :
+# (longueur, masse, temps, intensité électrique, température,
+#  intensité lumineuse, quantité de matière)
+DIMENSIONS = {
+    "longueur" : (1, 0, 0, 0, 0, 0, 0),
+    "masse" : (0, 1, 0, 0, 0, 0, 0),
+    "temps" : (0, 0, 1, 0, 0, 0, 0),
+    "intensite_electrique" : (0, 0, 0, 1, 0, 0, 0),
+    "temperature" : (0, 0, 0, 0, 1, 0, 0),
+    "intensite_lumineuse" : (0, 0, 0, 0, 0, 1, 0),
+    "quantite_matiere" : (0, 0, 0, 0, 0, 0, 1),
+}
+
+# Symboles SI des unités de reférence, dans le même ordre
+SYMBOLES_SI = ("m", "kg", "s", "A", "K", "cd", "mol")
+
+# Motif d'un nom d'unité, commun à la calculatrice, à l'analyse dimensionnelle
+# et au registre : des lettres (µ, Ω... compris), éventuellement précédées de °.
+# Ni chiffres ni exposants : m² se lit m suivi de l'exposant ².
+NOM_UNITE = r"°[^\W\d_⁰¹²³⁴⁵⁶⁷⁸⁹]*|[^\W\d_⁰¹²³⁴⁵⁶⁷⁸⁹]+"
+
+# Unités dérivées : (facteur par rapport aux unités SI de reférence, dimensions)
+UNITES_DERIVEES = {
+    # Fréquence et force
+    "Hz" : (1, (0, 0, -1, 0, 0, 0, 0)),
+    "kHz" : (1000, (0, 0, -1, 0, 0, 0, 0)),
+    "N" : (1, (1, 1, -2, 0, 0, 0, 0)),
+    "kN" : (1000, (1, 1, -2, 0, 0, 0, 0)),
+    # Pression
+    "Pa" : (1, (-1, 1, -2, 0, 0, 0, 0)),
+    "kPa" : (1000, (-1, 1, -2, 0, 0, 0, 0)),
+    "bar" : (100000, (-1, 1, -2, 0, 0, 0, 0)),
+    # Énergie et puissance
+    "J" : (1, (2, 1, -2, 0, 0, 0, 0)),
+    "kJ" : (1000, (2, 1, -2, 0, 0, 0, 0)),
+    "Wh" : (3600, (2, 1, -2, 0, 0, 0, 0)),
+    "kWh" : (3.6e6, (2, 1, -2, 0, 0, 0, 0)),
+    "W" : (1, (2, 1, -3, 0, 0, 0, 0)),
+    "kW" : (1000, (2, 1, -3, 0, 0, 0, 0)),
+    # Électricité
+    "C" : (1, (0, 0, 1, 1, 0, 0, 0)),
+    "V" : (1, (2, 1, -3, -1, 0, 0, 0)),
+    # Volume
+    "L" : (0.001, (3, 0, 0, 0, 0, 0, 0)),
+    "mL" : (1e-6, (3, 0, 0, 0, 0, 0, 0)),
+}
+
+# Table compilée d'une grandeur :
+# unites[i] se convertit vers unites[j] par valeur * matrice[i][j] + decalages[i][j]
+# (decalages vaut None pour les grandeurs purement multiplicatives)
+# rapports : {source: {cible: rapport}}, même contenu que la matrice pour les
+# appels par noms d'unités (deux lectures de dict, sans indices ni array)
+TableConversion = namedtuple(
+    "TableConversion", ["unites", "index", "matrice", "decalages", "rapports"], defaults=[None, None]
+)
+
+def compiler_table(facteurs):
+    """Construit la matrice dense des rapports pour toutes les paires d'unités"""
+    unites = tuple(facteurs)
+    index = {unite: i for i, unite in enumerate(unites)}
+    matrice = tuple(
+        array("d", [facteurs[source] / facteurs[cible] for cible in unites])
+        for source in unites
+    )
+    rapports = {source: dict(zip(unites, ligne)) for source, ligne in zip(unites, matrice)}
+    return TableConversion(unites, index, matrice, None, rapports)
+
+def rationnel(texte):
+    """
+    Lit un coefficient exact, "5/9" ou "273.15", en couple d'entiers
+    (numérateur, dénominateur) sans passer par un float.
+    """
+    numerateur, _, denominateur = str(texte).partition("/")
+    entier, _, decimales = numerateur.strip().partition(".")
+    return int(entier + decimales), 10 ** len(decimales) * int(denominateur or 1)
+
+def compiler_table_affine(coefficients):
+    """
+    Construit les matrices d'échelle et de décalage fusionnés pour toutes les
+    paires d'unités affines. Le calcul se fait en rationnels entiers ; la
+    division entière finale de Python est correctement arrondie, comme
+    float(Fraction) mais sans importer fractions.
+    """
+    unites = tuple(coefficients)
+    index = {unite: i for i, unite in enumerate(unites)}
+    rationnels = {unite: tuple(map(rationnel, coefficients[unite])) for unite in unites}
+    matrice = []
+    decalages = []
+    for source in unites:
+        (es_n, es_d), (ds_n, ds_d) = rationnels[source]
+        ligne_echelle = array("d")
+        ligne_decalage = array("d")
+        for cible in unites:
+            (ec_n, ec_d), (dc_n, dc_d) = rationnels[cible]
+            # echelle_source / echelle_cible
+            ligne_echelle.append(es_n * ec_d / (es_d * ec_n))
+            # (decalage_source - decalage_cible) / echelle_cible
+            ligne_decalage.append((ds_n * dc_d - dc_n * ds_d) * ec_d / (ds_d * dc_d * ec_n))
+        matrice.append(ligne_echelle)
+        decalages.append(ligne_decalage)
+    return TableConversion(unites, index, tuple(matrice), tuple(decalages))
+
+def facteur_exact(facteur):
+    """
+    Convertit un facteur en fraction exacte à partir de son écriture décimale :
+    1609.34 donne 160934/100 et non l'approximation binaire du float.
+    """
+    from fractions import Fraction
+
+    if isinstance(facteur, Fraction):
+        return facteur
+    return Fraction(repr(facteur)) if isinstance(facteur, float) else Fraction(facteur)
+
+def table_exacte(grandeur):
+    """
+    Renvoie la table de conversion en fractions exactes d'une grandeur.
+    Elle est construite à la première demande puis gardée en cache.
+    """
+    table = TABLES_EXACTES.get(grandeur)
+    if table is not None:
+        return table
+
+    from fractions import Fraction
+
+    facteurs = GRANDEURS[grandeur]
+    unites = tuple(facteurs)
+    index = {unite: i for i, unite in enumerate(unites)}
+    if grandeur == "temperature":
+        exacts = {unite: (Fraction(echelle), Fraction(decalage)) for unite, (echelle, decalage) in facteurs.items()}
+        matrice = tuple(
+            tuple(exacts[source][0] / exacts[cible][0] for cible in unites)
+            for source in unites
+        )
+        decalages = tuple(
+            tuple((exacts[source][1] - exacts[cible][1]) / exacts[cible][0] for cible in unites)
+            for source in unites
+        )
+    else:
+        exacts = {unite: facteur_exact(facteur) for unite, facteur in facteurs.items()}
+        matrice = tuple(
+            tuple(exacts[source] / exacts[cible] for cible in unites)
+            for source in unites
+        )
+        decalages = None
+
+    table = TABLES_EXACTES[grandeur] = TableConversion(unites, index, matrice, decalages)
+    return table
+
+def compiler_tables():
+    """(Re)construit les tables compilées de toutes les grandeurs"""
+    TABLES.clear()
+    TABLES_EXACTES.clear()
+    for nom, facteurs in GRANDEURS.items():
+        if nom == "temperature":
+            TABLES[nom] = compiler_table_affine(facteurs)
+        else:
+            TABLES[nom] = compiler_table(facteurs)
+
+# Tables compilées une seule fois à l'import (les tables exactes à la demande)
+TABLES = {}
+TABLES_EXACTES = {}
+compiler_tables()
@@ -1,6 +1,51 @@
-from constantes import GRANDEURS, TEMPERATURE
+import sys
+from _thread import allocate_lock
+from array import array
+from time import perf_counter
 
-def convertir(valeur, unite_source, unite_cible, grandeur):
+from constantes import GRANDEURS, TABLES, TEMPERATURE, table_exacte
+
+# Le moteur n'importe que la bibliothèque standard de base : fractions, decimal
+# et numpy ne sont chargés qu'à la première utilisation (voir verifier_import.py)
+
+_cache = None  # CacheLRU placé devant convertir par cache.activer_cache
+# Types de valeur mis en cache ; cache.activer_cache y ajoute Fraction et Decimal.
+# Un tableau ou une liste n'est pas hachable et passe toujours à côté du cache.
+_TYPES_CACHABLES = {int, float}
+MANQUANT = object()  # renvoyé par un cache quand la clé est absente ou expirée
+_mesures = None  # Instrumentation placée par instrumentation.activer_instrumentation
+
+# Spécialisation des paires les plus demandées, désactivée par défaut (voir
+# configurer_specialisation) : une fois activée, convertir est remplacée par une
+# variante qui compte les appels de chaque paire rencontrée. Quand une paire du chemin générique atteint SEUIL_SPECIALISATION
+# appels sur la période, les paires les plus appelées de la période reçoivent
+# des coefficients figés, les autres retournent au chemin générique, et une
+# nouvelle période commence (voir benchmarks/bench_specialisation.py).
+TAILLE_SPECIALISATION = 128  # taille conseillée une fois activée
+SEUIL_SPECIALISATION = 256
+PAIRES_SUIVIES = 65_536  # au-delà, les nouvelles paires attendent la période suivante
+
+class _Paire:
+    """Appels d'une paire sur la période, et ses coefficients si elle est spécialisée"""
+    __slots__ = ("facteur", "decalage", "appels")
+
+    def __init__(self, facteur=None, decalage=None, appels=1):
+        self.facteur = facteur  # None : chemin générique
+        self.decalage = decalage  # None hors température
+        self.appels = appels
+
+_paires = {}  # (source, cible, grandeur) -> _Paire ; remplacé d'un bloc à chaque période
+_taille_specialisation = 0  # 0 : désactivée, aucun suivi des paires
+_seuil_specialisation = SEUIL_SPECIALISATION
+_promotions = 0
+_evictions = 0
+_cumul_specialises = 0  # appels des périodes terminées, par chemin
+_cumul_generiques = 0
+# Une seule réévaluation à la fois ; _thread plutôt que threading pour garder
+# l'import du moteur léger (voir verifier_import.py)
+_verrou_reevaluation = allocate_lock()
+
+def convertir(valeur, unite_source, unite_cible, grandeur, arrondi=None):
     """
     Convertit une valeur d'une unité à une autre pour une grandeur donnée.
     Gère automatiquement le cas particulier de la température.
@@ -10,45 +55,482 @@ def convertir(valeur, unite_source, unite_cible, grandeur):
         unite_source (str): Unité de départ
         unite_cible (str): Unité cible
         grandeur (str): Type de grandeur physique
+        arrondi (int, optional): Nombre de décimales pour l'affichage.
+            Par défaut le résultat n'est pas arrondi.
         
     Returns:
         float: Valeur convertie
+
+    La spécialisation, le cache et l'instrumentation, une fois activés,
+    remplacent conversions.convertir par une variante (voir
+    _installer_convertir) : appeler conversions.convertir plutôt qu'une
+    référence importée avant leur activation.
     """
     # Vérification des unités valides
-    if grandeur not in GRANDEURS and grandeur != "temperature":
+    if grandeur not in GRANDEURS:
         raise ValueError(f"Grandeur inconnue : {grandeur}")
     
     if grandeur == "temperature":
-        return convertir_temperature(valeur, unite_source, unite_cible)
+        resultat = convertir_temperature(valeur, unite_source, unite_cible)
     else:
-        return convertir_standard(valeur, unite_source, unite_cible, grandeur)
+        resultat = convertir_standard(valeur, unite_source, unite_cible, grandeur)
+    
+    if arrondi is not None:
+        resultat = round(resultat, arrondi)
+    return resultat
+
+_convertir_direct = convertir
+
+def _convertir_specialise(valeur, unite_source, unite_cible, grandeur, arrondi=None):
+    """convertir avec la table des paires chaudes, installée tant que la spécialisation est active"""
+    suivie = _paires.get((unite_source, unite_cible, grandeur))
+    if suivie is None or suivie.facteur is None:
+        resultat = _convertir_direct(valeur, unite_source, unite_cible, grandeur, arrondi)
+        if suivie is not None:
+            suivie.appels += 1
+            if suivie.appels >= _seuil_specialisation:
+                _reevaluer_specialisations()
+        elif _taille_specialisation and len(_paires) < PAIRES_SUIVIES:
+            _paires[(unite_source, unite_cible, grandeur)] = _Paire()
+        return resultat
+
+    # Paire chaude : unités déjà validées, coefficients déjà résolus
+    suivie.appels += 1
+    decalage = suivie.decalage
+    if decalage is None:
+        resultat = valeur * suivie.facteur
+    else:
+        resultat = valeur * suivie.facteur + decalage
+    if arrondi is not None:
+        resultat = round(resultat, arrondi)
+    return resultat
+_sous_cache = convertir  # fonction appelée par _convertir_en_cache quand le résultat manque
+_sous_mesures = convertir  # fonction chronométrée par _convertir_mesure
+
+def _convertir_en_cache(valeur, unite_source, unite_cible, grandeur, arrondi=None):
+    """convertir précédée du cache de résultats, installée tant que le cache est actif"""
+    cache = _cache
+    if cache is None or type(valeur) not in _TYPES_CACHABLES:
+        return _sous_cache(valeur, unite_source, unite_cible, grandeur, arrondi)
+    cle = (valeur, unite_source, unite_cible, grandeur, arrondi)
+    resultat = cache.lire(cle)
+    if resultat is MANQUANT:
+        resultat = _sous_cache(valeur, unite_source, unite_cible, grandeur, arrondi)
+        cache.ecrire(cle, resultat)
+    return resultat
+
+def _convertir_mesure(valeur, unite_source, unite_cible, grandeur, arrondi=None):
+    """convertir chronométrée, installée tant que l'instrumentation est active"""
+    mesures = _mesures
+    debut = perf_counter()
+    resultat = _sous_mesures(valeur, unite_source, unite_cible, grandeur, arrondi)
+    if mesures is not None:
+        mesures.observer_conversion(grandeur, unite_source, unite_cible, perf_counter() - debut)
+    return resultat
+
+def _installer_convertir():
+    """
+    Remplace convertir par la variante qui correspond aux fonctions activées :
+    une fonction désactivée ne coûte alors rien à chaque conversion.
+    """
+    global convertir, _sous_cache, _sous_mesures
+    fonction = _convertir_specialise if _taille_specialisation else _convertir_direct
+    if _cache is not None:
+        _sous_cache = fonction
+        fonction = _convertir_en_cache
+    if _mesures is not None:
+        _sous_mesures = fonction
+        fonction = _convertir_mesure
+    convertir = fonction
+
+def _reevaluer_specialisations():
+    """
+    Fin de période : spécialise les paires les plus appelées, renvoie les
+    autres au chemin générique, oublie celles qui n'ont plus été appelées et
+    remet les compteurs à zéro.
+
+    D'autres fils continuent d'ajouter des paires à _paires pendant ce temps :
+    on travaille sur une copie (dict() copie d'un bloc sous le GIL), et un fil
+    qui arrive pendant une réévaluation en cours passe son tour.
+    """
+    if not _verrou_reevaluation.acquire(False):
+        return
+    try:
+        _reevaluer(dict(_paires))
+    finally:
+        _verrou_reevaluation.release()
+
+def _reevaluer(anciennes):
+    """Réévaluation sur une copie figée des paires suivies"""
+    global _paires, _promotions, _evictions, _cumul_specialises, _cumul_generiques
+    for suivie in anciennes.values():
+        if suivie.facteur is None:
+            _cumul_generiques += suivie.appels
+        else:
+            _cumul_specialises += suivie.appels
+    retenues = set(sorted(anciennes, key=lambda paire: anciennes[paire].appels,
+                          reverse=True)[:_taille_specialisation])
+
+    # Les entrées promues ou évincées sont remplacées, jamais modifiées : un
+    # autre fil ne voit jamais un facteur sans son décalage
+    nouvelles = {}
+    for paire, suivie in anciennes.items():
+        if paire in retenues:
+            if suivie.facteur is None:
+                try:
+                    facteur, decalage = coefficients(*paire)
+                except ValueError:
+                    continue  # tables modifiées depuis la conversion
+                suivie = _Paire(facteur, decalage if paire[2] == "temperature" else None)
+                _promotions += 1
+        elif suivie.facteur is not None:
+            suivie = _Paire()
+            _evictions += 1
+        elif not suivie.appels:
+            continue
+        suivie.appels = 0
+        nouvelles[paire] = suivie
+    _paires = nouvelles
+
+def configurer_specialisation(taille=TAILLE_SPECIALISATION, seuil=SEUIL_SPECIALISATION):
+    """
+    Règle la spécialisation automatique des paires chaudes ; les paires
+    suivies et les compteurs sont oubliés.
+
+    Elle est désactivée par défaut, et ne coûte alors rien : convertir n'est
+    remplacée par la variante spécialisée qu'ici. Active, le suivi coûte
+    ~90 ns à chaque conversion du chemin générique, et ne rapporte que si
+    quelques paires font l'essentiel du trafic. Sur le trafic Zipf de bench_specialisation.py (s=1.1, 238 paires),
+    8 paires ne rapportent rien (0.85x à 1.1x selon les mesures), 32 paires
+    donnent 1.1x à 1.3x et 128 paires 1.4x à 1.5x : d'où TAILLE_SPECIALISATION = 128.
+
+    Args:
+        taille (int): Nombre maximal de paires spécialisées (0 pour désactiver)
+        seuil (int): Appels d'une paire générique sur une période qui déclenchent
+            une réévaluation
+    """
+    global _taille_specialisation, _seuil_specialisation
+    if taille < 0 or seuil < 1:
+        raise ValueError(f"Réglage de spécialisation invalide : taille={taille}, seuil={seuil}")
+    _taille_specialisation = taille
+    _seuil_specialisation = seuil
+    oublier_specialisations()
+    _installer_convertir()
+
+def oublier_specialisations():
+    """Vide la table de dispatch et remet les compteurs à zéro (à appeler si les tables d'unités changent)"""
+    global _paires, _promotions, _evictions, _cumul_specialises, _cumul_generiques
+    _paires = {}
+    _promotions = _evictions = _cumul_specialises = _cumul_generiques = 0
+
+def statistiques_specialisation():
+    """
+    Returns:
+        dict: Paires spécialisées (appels sur la période en cours), appels servis
+            par chaque chemin, promotions et évictions
+    """
+    paires = list(_paires.items())
+    specialisees = {" ".join(paire): suivie.appels for paire, suivie in paires if suivie.facteur is not None}
+    return {
+        "taille_max": _taille_specialisation,
+        "seuil": _seuil_specialisation,
+        "specialisees": specialisees,
+        "appels_specialises": _cumul_specialises + sum(specialisees.values()),
+        "appels_generiques": _cumul_generiques + sum(s.appels for _, s in paires if s.facteur is None),
+        "promotions": _promotions,
+        "evictions": _evictions,
+    }
 
 def convertir_standard(valeur, unite_source, unite_cible, grandeur):
     """
     Conversion standard pour les grandeurs utilisant des facteurs multiplicatifs.
     """
-    facteurs = GRANDEURS[grandeur]
+    ligne = TABLES[grandeur].rapports.get(unite_source)
     
     # Vérification des unités existantes
-    if unite_source not in facteurs:
+    if ligne is None:
         raise ValueError(f"Unité source inconnue pour {grandeur}: {unite_source}")
-    if unite_cible not in facteurs:
+    rapport = ligne.get(unite_cible)
+    if rapport is None:
         raise ValueError(f"Unité cible inconnue pour {grandeur}: {unite_cible}")
     
-    return valeur * facteurs[unite_source] / facteurs[unite_cible]
+    return valeur * rapport
+
+def resoudre_indices(unite_source, unite_cible, grandeur):
+    """
+    Résout une seule fois les indices entiers de deux unités dans la table
+    compilée, pour les boucles qui utilisent ensuite convertir_index.
+
+    Returns:
+        tuple: (indice_source, indice_cible)
+    """
+    if grandeur not in TABLES:
+        raise ValueError(f"Grandeur inconnue : {grandeur}")
+    table = TABLES[grandeur]
+    if table.decalages is not None:
+        raise ValueError(f"Grandeur non multiplicative : {grandeur}")
+    index = table.index
+    if unite_source not in index:
+        raise ValueError(f"Unité source inconnue pour {grandeur}: {unite_source}")
+    if unite_cible not in index:
+        raise ValueError(f"Unité cible inconnue pour {grandeur}: {unite_cible}")
+    return index[unite_source], index[unite_cible]
+
+def convertir_index(valeur, indice_source, indice_cible, grandeur):
+    """
+    Chemin rapide : conversion à partir d'indices déjà résolus, sans
+    recherche ni vérification des noms d'unités.
+    """
+    return valeur * TABLES[grandeur].matrice[indice_source][indice_cible]
 
 def convertir_temperature(valeur, unite_source, unite_cible):
     """
     Conversion spéciale pour la température entre K, °C et °F.
+    Le passage par le Kelvin est fusionné en une seule opération
+    valeur * echelle + decalage, valable aussi pour un tableau NumPy.
     """
-    if unite_source not in TEMPERATURE:
+    table = TABLES["temperature"]
+    index = table.index
+    if unite_source not in index:
         raise ValueError(f"Unité source température inconnue: {unite_source}")
-    if unite_cible not in TEMPERATURE:
+    if unite_cible not in index:
         raise ValueError(f"Unité cible température inconnue: {unite_cible}")
     
-    # Conversion via Kelvin (unité SI)
-    kelvin = TEMPERATURE[unite_source]["vers_K"](valeur)
-    return round(TEMPERATURE[unite_cible]["depuis_K"](kelvin), 2)
+    i, j = index[unite_source], index[unite_cible]
+    return valeur * table.matrice[i][j] + table.decalages[i][j]
+
+_types_exacts = None  # (Fraction, Decimal), importés à la première conversion exacte
+
+def _importer_types_exacts():
+    # Un import dans la fonction coûterait ~3 µs à chaque conversion exacte
+    global _types_exacts
+    from decimal import Decimal
+    from fractions import Fraction
+
+    _types_exacts = (Fraction, Decimal)
+    return _types_exacts
+
+def convertir_exact(valeur, unite_source, unite_cible, grandeur, type_resultat=None):
+    """
+    Conversion exacte : les facteurs sont des fractions, il n'y a donc aucune
+    erreur d'arrondi, même sur une chaîne de conversions.
+    Compter 2 à 4 fois le coût de convertir pour une valeur entière (calcul
+    direct sur numérateur et dénominateur), davantage pour une chaîne ou un
+    Decimal (voir benchmarks/bench_exact.py).
+
+    Args:
+        valeur (int, str, Fraction, Decimal ou float): Valeur à convertir.
+            Une chaîne comme "0.1" est lue exactement, un float garde sa
+            valeur binaire.
+        unite_source (str): Unité de départ
+        unite_cible (str): Unité cible
+        grandeur (str): Type de grandeur physique
+        type_resultat (type, optional): Fraction (par défaut) ou Decimal
+
+    Returns:
+        Fraction ou Decimal: Valeur convertie
+    """
+    Fraction, Decimal = _types_exacts or _importer_types_exacts()
+
+    if grandeur not in GRANDEURS:
+        raise ValueError(f"Grandeur inconnue : {grandeur}")
+
+    table = table_exacte(grandeur)
+    index = table.index
+    if unite_source not in index:
+        raise ValueError(f"Unité source inconnue pour {grandeur}: {unite_source}")
+    if unite_cible not in index:
+        raise ValueError(f"Unité cible inconnue pour {grandeur}: {unite_cible}")
+
+    if type_resultat is not None and type_resultat is not Fraction and type_resultat is not Decimal:
+        raise ValueError(f"Type de résultat exact non supporté : {type_resultat}")
+
+    i, j = index[unite_source], index[unite_cible]
+    if type(valeur) is int:
+        # Entier : calcul direct sur les numérateurs et dénominateurs, une
+        # seule réduction (ou aucune pour un Decimal) au lieu d'une par opération
+        facteur = table.matrice[i][j]
+        numerateur = valeur * facteur.numerator
+        denominateur = facteur.denominator
+        if table.decalages is not None:
+            decalage = table.decalages[i][j]
+            numerateur = numerateur * decalage.denominator + decalage.numerator * denominateur
+            denominateur *= decalage.denominator
+        if type_resultat is Decimal:
+            return Decimal(numerateur) / Decimal(denominateur)
+        return Fraction(numerateur, denominateur)
+
+    resultat = Fraction(valeur) * table.matrice[i][j]
+    if table.decalages is not None:
+        resultat += table.decalages[i][j]
+    if type_resultat is Decimal:
+        return Decimal(resultat.numerator) / Decimal(resultat.denominator)
+    return resultat
+
+def coefficients(unite_source, unite_cible, grandeur):
+    """
+    Calcule une seule fois les coefficients de la conversion affine
+    resultat = valeur * facteur + decalage entre deux unités.
+
+    Returns:
+        tuple: (facteur, decalage), le décalage est nul hors température
+    """
+    if grandeur not in TABLES:
+        raise ValueError(f"Grandeur inconnue : {grandeur}")
+
+    table = TABLES[grandeur]
+    index = table.index
+    if unite_source not in index:
+        raise ValueError(f"Unité source inconnue pour {grandeur}: {unite_source}")
+    if unite_cible not in index:
+        raise ValueError(f"Unité cible inconnue pour {grandeur}: {unite_cible}")
+
+    i, j = index[unite_source], index[unite_cible]
+    if table.decalages is None:
+        return table.matrice[i][j], 0
+    return table.matrice[i][j], table.decalages[i][j]
+
+def convertir_lot(valeurs, unite_source, unite_cible, grandeur):
+    """
+    Convertit un lot de valeurs avec une seule recherche de facteur.
+    Accepte une liste, un tuple, un array.array, une memoryview ou un
+    tableau NumPy et renvoie un conteneur du même type.
+
+    Args:
+        valeurs: Valeurs à convertir
+        unite_source (str): Unité de départ
+        unite_cible (str): Unité cible
+        grandeur (str): Type de grandeur physique
+
+    Returns:
+        Valeurs converties, dans le même type de conteneur
+    """
+    facteur, decalage = coefficients(unite_source, unite_cible, grandeur)
+    return appliquer_lot(valeurs, facteur, decalage)
+
+def convertir_vers_toutes(valeur, unite_source, grandeur):
+    """
+    Convertit une valeur vers toutes les unités de sa grandeur en une seule
+    opération vectorielle sur la ligne de l'unité source dans la table compilée.
+
+    Args:
+        valeur (float): Valeur à convertir
+        unite_source (str): Unité de départ
+        grandeur (str): Type de grandeur physique
+
+    Returns:
+        dict: {unite: valeur convertie}, dans l'ordre de la table
+    """
+    if grandeur not in TABLES:
+        raise ValueError(f"Grandeur inconnue : {grandeur}")
+    table = TABLES[grandeur]
+    if unite_source not in table.index:
+        raise ValueError(f"Unité source inconnue pour {grandeur}: {unite_source}")
+
+    i = table.index[unite_source]
+    if table.decalages is None:
+        # valeur * facteur vers chaque unité : la ligne entière passe en un bloc
+        resultats = appliquer_lot(table.matrice[i], valeur)
+    else:
+        resultats = [valeur * echelle + decalage for echelle, decalage in zip(table.matrice[i], table.decalages[i])]
+    return dict(zip(table.unites, resultats))
+
+def appliquer_lot(valeurs, facteur, decalage=0):
+    """
+    Applique valeur * facteur + decalage à tout un lot de valeurs.
+    NumPy n'est utilisé que s'il a déjà été importé par l'appelant.
+    """
+    np = sys.modules.get("numpy")
+
+    if np is not None and isinstance(valeurs, np.ndarray):
+        resultat = valeurs * facteur
+        if decalage:
+            resultat += decalage
+        return resultat
+
+    if isinstance(valeurs, memoryview):
+        # Copie des octets dans un array.array du même type, puis traitement en bloc
+        source = array(valeurs.format, valeurs.tobytes())
+        return memoryview(appliquer_lot(source, facteur, decalage))
+
+    if isinstance(valeurs, array):
+        # Le résultat est flottant, même pour un tableau d'entiers
+        code = valeurs.typecode if valeurs.typecode in ("f", "d") else "d"
+        if np is not None:
+            source = np.frombuffer(valeurs, dtype=valeurs.typecode).astype(code)
+            resultat = array(code)
+            resultat.frombytes((source * facteur + decalage).astype(code).tobytes())
+            return resultat
+        return array(code, _multiplier(valeurs, facteur, decalage))
+
+    resultat = _multiplier(valeurs, facteur, decalage)
+    return tuple(resultat) if isinstance(valeurs, tuple) else resultat
+
+def _multiplier(valeurs, facteur, decalage):
+    """Repli en Python pur : une compréhension de liste sans aucun branchement"""
+    if decalage:
+        return [v * facteur + decalage for v in valeurs]
+    return [v * facteur for v in valeurs]
+
+class ConvertisseurLineaire:
+    """Conversion figée entre deux unités : une seule multiplication par appel"""
+    __slots__ = ("facteur",)
+
+    def __init__(self, facteur):
+        self.facteur = facteur
+
+    def __call__(self, valeur):
+        return valeur * self.facteur
+
+    def __repr__(self):
+        return f"ConvertisseurLineaire(facteur={self.facteur!r})"
+
+    def inverse(self):
+        """Renvoie le convertisseur de l'unité cible vers l'unité source"""
+        return ConvertisseurLineaire(1 / self.facteur)
+
+    def batch(self, valeurs):
+        """Convertit un lot de valeurs (voir convertir_lot)"""
+        return appliquer_lot(valeurs, self.facteur)
+
+class ConvertisseurAffine:
+    """Conversion figée de température : valeur * echelle + decalage fusionnés"""
+    __slots__ = ("echelle", "decalage")
+
+    def __init__(self, echelle, decalage):
+        self.echelle = echelle
+        self.decalage = decalage
+
+    def __call__(self, valeur):
+        return valeur * self.echelle + self.decalage
+
+    def __repr__(self):
+        return f"ConvertisseurAffine(echelle={self.echelle!r}, decalage={self.decalage!r})"
+
+    def inverse(self):
+        """Renvoie le convertisseur de l'unité cible vers l'unité source"""
+        return ConvertisseurAffine(1 / self.echelle, -self.decalage / self.echelle)
+
+    def batch(self, valeurs):
+        """Convertit un lot de valeurs (voir convertir_lot)"""
+        return appliquer_lot(valeurs, self.echelle, self.decalage)
+
+def compiler(unite_source, unite_cible, grandeur):
+    """
+    Valide une seule fois la grandeur et les deux unités et renvoie un
+    convertisseur réutilisable.
+
+    Exemple:
+        km_vers_mile = compiler("km", "mile", "longueur")
+        km_vers_mile(5)  # 3.10686...
+
+    Returns:
+        ConvertisseurLineaire ou ConvertisseurAffine (température)
+    """
+    facteur, decalage = coefficients(unite_source, unite_cible, grandeur)
+    if grandeur == "temperature":
+        return ConvertisseurAffine(facteur, decalage)
+    return ConvertisseurLineaire(facteur)
 
 # Fonctions pratiques pour chaque grandeur
 def convertir_longueur(valeur, unite_source, unite_cible):
@@ -69,3 +551,8 @@ def convertir_intensite_lumineuse(valeur, unite_source, unite_cible):
 def convertir_quantite_matiere(valeur, unite_source, unite_cible):
     return convertir(valeur, unite_source, unite_cible, "quantite_matiere")
 
+
+if __name__ == "__main__":
+    # Ligne de commande : python -m conversions --help
+    from flux import main
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Export de l'historique persistant en CSV, JSONL ou format binaire en colonnes.
+Le journal est relu par blocs d'entrées : la mémoire utilisée ne dépend pas de
+la taille de l'historique, et l'export peut tourner hors du fil de l'interface
+en signalant sa progression. Le fichier est écrit à côté puis mis en place une
+fois complet : un export annulé ou en échec ne laisse pas de fichier tronqué.
+
+Format en colonnes (.ucol), petit-boutiste :
+    en-tête        b"UCOL2\\n"
+    groupes        un par bloc, voir _ecrire_groupe
+    pied           JSON {"dictionnaire": [...], "groupes": [[position, lignes], ...]}
+    fin            position du pied (uint64) puis b"UCOL2\\n"
+Chaque groupe stocke ses colonnes bout à bout : temps (int64 AAAAMMJJHHMMSS),
+valeur et resultat (float64, NaN si absent), grandeur, source et cible (uint32,
+indice dans le dictionnaire, 0 si absent) puis les textes (longueurs uint32 et
+octets UTF-8 concaténés). Les fichiers UCOL1, aux indices en uint16, restent
+lisibles.
+"""
+import csv
+import json
+import os
+import struct
+import sys
+from array import array
+
+from historique import cle_temps
+
+TAILLE_BLOC = 10_000
+FORMATS = ("csv", "jsonl", "ucol")
+MAGIQUE = b"UCOL2\n"
+CODES_INDICES = {b"UCOL1\n": "H", MAGIQUE: "I"}  # type des indices du dictionnaire par version
+ENTETE_CSV = ["Date", "Heure", "Conversion", "Grandeur", "Valeur", "Source", "Cible", "Résultat"]
+COLONNES_TEXTE = ("grandeur", "source", "cible")
+
+def format_depuis_extension(chemin):
+    """Déduit le format d'export de l'extension du fichier (csv par défaut)"""
+    extension = chemin.rsplit(".", 1)[-1].lower() if "." in chemin else ""
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension == "ucol":
+        return "ucol"
+    return "csv"
+
+def _ligne_csv(entree):
+    date, _, heure = entree["horodatage"].partition(" ")
+    return [date, heure, entree["texte"]] + [
+        "" if entree.get(cle) is None else entree[cle]
+        for cle in ("grandeur", "valeur", "source", "cible", "resultat")
+    ]
+
+def _nombre(valeur):
+    return float(valeur) if isinstance(valeur, (int, float)) else float("nan")
+
+def _ecrire_groupe(fichier, entrees, dictionnaire):
+    """Écrit un bloc d'entrées en colonnes et complète le dictionnaire de chaînes"""
+    temps = array("q")
+    for entree in entrees:
+        try:
+            temps.append(cle_temps(entree.get("horodatage", "")))
+        except ValueError:
+            temps.append(0)
+    colonnes = [
+        temps,
+        array("d", (_nombre(e.get("valeur")) for e in entrees)),
+        array("d", (_nombre(e.get("resultat")) for e in entrees)),
+    ]
+    for cle in COLONNES_TEXTE:
+        colonnes.append(array("I", (
+            dictionnaire.setdefault(e[cle], len(dictionnaire) + 1) if e.get(cle) else 0
+            for e in entrees
+        )))
+    textes = [e["texte"].encode("utf-8") for e in entrees]
+    colonnes.append(array("I", map(len, textes)))
+
+    if sys.byteorder != "little":
+        for colonne in colonnes:
+            colonne.byteswap()
+    for colonne in colonnes:
+        fichier.write(colonne.tobytes())
+    fichier.write(b"".join(textes))
+
+def exporter_historique(journal, chemin, format_export=None, taille_bloc=TAILLE_BLOC,
+                        progression=None, annulation=None):
+    """
+    Exporte l'historique du journal bloc par bloc.
+
+    Args:
+        journal (JournalHistorique): Historique à exporter
+        chemin (str): Fichier de sortie
+        format_export (str, optional): "csv", "jsonl" ou "ucol", déduit de l'extension sinon
+        taille_bloc (int): Nombre d'entrées lues à la fois
+        progression (callable, optional): Appelée avec (entrées écrites, total) après chaque bloc
+        annulation (threading.Event, optional): Interrompt l'export quand elle est levée
+
+    Returns:
+        int: Nombre d'entrées exportées (lues avant l'annulation, le cas échéant)
+    """
+    format_export = format_export or format_depuis_extension(chemin)
+    if format_export not in FORMATS:
+        raise ValueError(f"Format d'export inconnu : {format_export}")
+
+    journal.pret()  # l'export tourne en arrière-plan : il peut attendre l'indexation
+    generation = journal.generation
+    total = journal.nombre()  # les entrées ajoutées pendant l'export n'y figurent pas
+    ecrites = 0
+    dictionnaire = {}
+    groupes = []
+    mode = "wb" if format_export == "ucol" else "w"
+    options = {} if format_export == "ucol" else {"newline": "", "encoding": "utf-8"}
+    temporaire = chemin + ".tmp"
+    annule = False
+    try:
+        with open(temporaire, mode, **options) as fichier:
+            if format_export == "csv":
+                ecrivain = csv.writer(fichier, delimiter=";")
+                ecrivain.writerow(ENTETE_CSV)
+            elif format_export == "ucol":
+                fichier.write(MAGIQUE)
+
+            for debut in range(0, total, taille_bloc):
+                if annulation is not None and annulation.is_set():
+                    annule = True
+                    break
+                entrees = journal.lire_plage(debut, min(debut + taille_bloc, total), generation)
+                if entrees is None:
+                    # Lignes renumérotées : la suite de l'export sauterait ou répéterait des entrées
+                    raise ValueError("Historique compacté ou effacé pendant l'export")
+                if format_export == "csv":
+                    ecrivain.writerows(map(_ligne_csv, entrees))
+                elif format_export == "jsonl":
+                    fichier.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entrees))
+                else:
+                    groupes.append((fichier.tell(), len(entrees)))
+                    _ecrire_groupe(fichier, entrees, dictionnaire)
+                ecrites += len(entrees)
+                if progression is not None:
+                    progression(ecrites, total)
+
+            if format_export == "ucol" and not annule:
+                position = fichier.tell()
+                pied = {"dictionnaire": sorted(dictionnaire, key=dictionnaire.get), "groupes": groupes}
+                fichier.write(json.dumps(pied, ensure_ascii=False).encode("utf-8"))
+                fichier.write(struct.pack("<Q", position) + MAGIQUE)
+        if not annule:
+            os.replace(temporaire, chemin)
+    finally:
+        # Annulation ou erreur : le fichier de destination n'est pas touché
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+    return ecrites
+
+def lire_colonnes(chemin):
+    """
+    Relit un export .ucol, un groupe à la fois.
+
+    Yields:
+        dict: Colonnes du groupe ("temps", "valeur", "resultat", "grandeur",
+        "source", "cible", "texte"), les chaînes étant décodées
+    """
+    with open(chemin, "rb") as fichier:
+        code_indices = CODES_INDICES.get(fichier.read(len(MAGIQUE)))
+        if code_indices is None:
+            raise ValueError(f"Fichier .ucol invalide : {chemin}")
+        fichier.seek(-8 - len(MAGIQUE), 2)
+        fin_pied = fichier.tell()
+        position_pied, = struct.unpack("<Q", fichier.read(8))
+        fichier.seek(position_pied)
+        pied = json.loads(fichier.read(fin_pied - position_pied))
+        noms = [None] + pied["dictionnaire"]
+
+        for position, lignes in pied["groupes"]:
+            fichier.seek(position)
+            colonnes = {}
+            for nom, code in (("temps", "q"), ("valeur", "d"), ("resultat", "d"),
+                              ("grandeur", code_indices), ("source", code_indices), ("cible", code_indices),
+                              ("longueurs", "I")):
+                colonne = array(code)
+                colonne.frombytes(fichier.read(lignes * colonne.itemsize))
+                if sys.byteorder != "little":
+                    colonne.byteswap()
+                colonnes[nom] = colonne
+            for cle in COLONNES_TEXTE:
+                colonnes[cle] = [noms[i] for i in colonnes[cle]]
+            textes = fichier.read(sum(colonnes["longueurs"]))
+            colonnes["texte"] = []
+            debut = 0
+            for longueur in colonnes.pop("longueurs"):
+                colonnes["texte"].append(textes[debut:debut + longueur].decode("utf-8"))
+                debut += longueur
+            yield colonnes
@@ -0,0 +1,256 @@
+"""
+Analyse et évaluation des expressions avec unités de la calculatrice,
+par exemple "2h30min + 45min", "500 g × 10" ou "(1 km + 300 m) ÷ 2".
+
+Chaque expression est découpée en jetons puis compilée en arbre syntaxique.
+Les arbres sont gardés en cache par texte d'expression : réévaluer la même
+formule ne la réanalyse pas.
+
+Pour les températures, seule la première mesure est une température absolue :
+ce qu'on lui ajoute ou retranche est un écart, converti sans décalage
+("10 °C + 5 K" donne 15 °C).
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import conversions
+from constantes import NOM_UNITE
+from conversions import MANQUANT, TABLES, coefficients
+
+# Noeuds de l'arbre syntaxique
+Scalaire = namedtuple("Scalaire", ["valeur"])
+Mesure = namedtuple("Mesure", ["termes"])  # ((valeur, unite), ...) additionnés, ex. 2h30min
+Operation = namedtuple("Operation", ["operateur", "gauche", "droite"])
+Oppose = namedtuple("Oppose", ["operande"])
+
+# Expression compilée : l'arbre et les unités rencontrées, dans l'ordre
+ExpressionCompilee = namedtuple("ExpressionCompilee", ["arbre", "unites"])
+
+# Résultat d'une évaluation (unite vaut None pour un nombre sans unité)
+Resultat = namedtuple("Resultat", ["valeur", "unite", "grandeur"])
+
+TAILLE_CACHE = 1024
+_cache = None  # CacheLRU des résultats placé devant evaluer par cache.activer_cache
+
+# Synonymes typographiques des opérateurs
+OPERATEURS = {
+    "+": "+",
+    "-": "-",
+    "−": "-",
+    "*": "×",
+    "×": "×",
+    "·": "×",
+    "/": "÷",
+    "÷": "÷",
+}
+
+_JETON = re.compile(r"""
+    \s*(?:
+        (?P<nombre>(?:\d+(?:[.,]\d*)?|[.,]\d+)(?:[eE][+-]?\d+)?)
+      | (?P<unite>""" + NOM_UNITE + r""")
+      | (?P<symbole>[-+−*×·/÷()])
+    )""", re.VERBOSE)
+
+def decouper(texte):
+    """
+    Découpe une expression en jetons (type, valeur).
+
+    Returns:
+        list: Jetons de type "nombre", "unite" ou "symbole"
+    """
+    jetons = []
+    position = 0
+    texte = texte.rstrip()
+    while position < len(texte):
+        correspondance = _JETON.match(texte, position)
+        if correspondance is None:
+            raise ValueError(f"Caractère inattendu à la position {position}: {texte[position:].strip()[:1]!r}")
+        genre = correspondance.lastgroup
+        valeur = correspondance.group(genre)
+        if genre == "nombre":
+            jetons.append(("nombre", float(valeur.replace(",", "."))))
+        elif genre == "symbole" and valeur in OPERATEURS:
+            jetons.append(("symbole", OPERATEURS[valeur]))
+        else:
+            jetons.append((genre, valeur))
+        position = correspondance.end()
+    return jetons
+
+class _Analyseur:
+    """
+    Analyseur descendant récursif :
+        expression := terme (("+" | "-") terme)*
+        terme      := facteur (("×" | "÷") facteur)*
+        facteur    := ("+" | "-") facteur | primaire
+        primaire   := "(" expression ")" | nombre (unite (nombre unite)*)?
+    """
+
+    def __init__(self, jetons):
+        self.jetons = jetons
+        self.position = 0
+        self.unites = []
+
+    def regarder(self):
+        if self.position < len(self.jetons):
+            return self.jetons[self.position]
+        return (None, None)
+
+    def consommer(self):
+        jeton = self.regarder()
+        self.position += 1
+        return jeton
+
+    def analyser(self):
+        if not self.jetons:
+            raise ValueError("Expression vide")
+        arbre = self.expression()
+        if self.position < len(self.jetons):
+            raise ValueError(f"Jeton inattendu : {self.regarder()[1]}")
+        return ExpressionCompilee(arbre, tuple(self.unites))
+
+    def expression(self):
+        noeud = self.terme()
+        while self.regarder() in (("symbole", "+"), ("symbole", "-")):
+            operateur = self.consommer()[1]
+            noeud = Operation(operateur, noeud, self.terme())
+        return noeud
+
+    def terme(self):
+        noeud = self.facteur()
+        while self.regarder() in (("symbole", "×"), ("symbole", "÷")):
+            operateur = self.consommer()[1]
+            noeud = Operation(operateur, noeud, self.facteur())
+        return noeud
+
+    def facteur(self):
+        if self.regarder() == ("symbole", "-"):
+            self.consommer()
+            return Oppose(self.facteur())
+        if self.regarder() == ("symbole", "+"):
+            self.consommer()
+            return self.facteur()
+        return self.primaire()
+
+    def primaire(self):
+        genre, valeur = self.consommer()
+        if (genre, valeur) == ("symbole", "("):
+            noeud = self.expression()
+            if self.consommer() != ("symbole", ")"):
+                raise ValueError("Parenthèse fermante manquante")
+            return noeud
+        if genre != "nombre":
+            raise ValueError(f"Nombre attendu, trouvé : {valeur if valeur is not None else 'fin'}")
+        if self.regarder()[0] != "unite":
+            return Scalaire(valeur)
+
+        # Unités accolées : "2h30min" ou "1 m 20 cm" s'additionnent
+        termes = [(valeur, self.consommer()[1])]
+        while (self.regarder()[0] == "nombre"
+               and self.position + 1 < len(self.jetons)
+               and self.jetons[self.position + 1][0] == "unite"):
+            termes.append((self.consommer()[1], self.consommer()[1]))
+        self.unites.extend(unite for _, unite in termes)
+        return Mesure(tuple(termes))
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def compiler_expression(texte):
+    """
+    Compile une expression en arbre syntaxique, avec un cache par texte.
+
+    Returns:
+        ExpressionCompilee: Arbre et unités de l'expression
+    """
+    return _Analyseur(decouper(texte)).analyser()
+
+def deduire_grandeur(unites):
+    """Retrouve la grandeur commune à une suite d'unités"""
+    grandeurs = set()
+    for unite in unites:
+        candidates = [nom for nom, table in TABLES.items() if unite in table.index]
+        if not candidates:
+            raise ValueError(f"Unité inconnue : {unite}")
+        if len(candidates) > 1:
+            raise ValueError(f"Unité ambiguë : {unite} ({', '.join(candidates)})")
+        grandeurs.add(candidates[0])
+    if len(grandeurs) > 1:
+        raise ValueError(f"Grandeurs incompatibles : {', '.join(sorted(grandeurs))}")
+    return grandeurs.pop() if grandeurs else None
+
+def _ecart(valeur, unite, reference, grandeur):
+    """Convertit un écart (ex. de température) : facteur seul, sans décalage"""
+    return valeur * coefficients(unite, reference, grandeur)[0]
+
+def _evaluer(noeud, reference, grandeur, ecart=False):
+    """
+    Évalue un noeud. Les mesures sont exprimées dans l'unité de référence.
+
+    Args:
+        ecart (bool): Le noeud est ajouté ou retranché à une mesure : ses
+            mesures sont des écarts (seul compte pour les températures)
+
+    Returns:
+        tuple: (valeur, a_une_unite)
+    """
+    if isinstance(noeud, Scalaire):
+        return noeud.valeur, False
+
+    if isinstance(noeud, Mesure):
+        (valeur, unite), *suivants = noeud.termes
+        total = (_ecart if ecart else conversions.convertir)(valeur, unite, reference, grandeur)
+        return total + sum(_ecart(valeur, unite, reference, grandeur) for valeur, unite in suivants), True
+
+    if isinstance(noeud, Oppose):
+        valeur, a_unite = _evaluer(noeud.operande, reference, grandeur, ecart)
+        return -valeur, a_unite
+
+    operateur = noeud.operateur
+    gauche, unite_gauche = _evaluer(noeud.gauche, reference, grandeur, ecart)
+    droite, unite_droite = _evaluer(noeud.droite, reference, grandeur, ecart or operateur in ("+", "-"))
+
+    if operateur in ("+", "-"):
+        if unite_gauche != unite_droite:
+            raise ValueError("Impossible d'additionner une mesure et un nombre sans unité")
+        return (gauche + droite if operateur == "+" else gauche - droite), unite_gauche
+
+    if operateur == "×":
+        if unite_gauche and unite_droite:
+            raise ValueError("Le produit de deux mesures n'est pas pris en charge")
+        return gauche * droite, unite_gauche or unite_droite
+
+    # Division : mesure ÷ nombre, ou rapport sans unité de deux mesures
+    if unite_droite and not unite_gauche:
+        raise ValueError("Impossible de diviser un nombre par une mesure")
+    if droite == 0:
+        raise ValueError("Division par zéro")
+    return gauche / droite, unite_gauche and not unite_droite
+
+def evaluer(texte, grandeur=None):
+    """
+    Évalue une expression avec unités. Le résultat est exprimé dans la
+    première unité de l'expression.
+
+    Args:
+        texte (str): Expression, ex. "2h30min + 45min"
+        grandeur (str, optional): Grandeur physique, déduite des unités sinon
+
+    Returns:
+        Resultat: (valeur, unite, grandeur)
+    """
+    cache = _cache
+    if cache is not None:
+        cle = (texte, grandeur)
+        resultat = cache.lire(cle)
+        if resultat is not MANQUANT:
+            return resultat
+
+    expression = compiler_expression(texte)
+    if grandeur is None:
+        grandeur = deduire_grandeur(expression.unites)
+    reference = expression.unites[0] if expression.unites else None
+
+    valeur, a_unite = _evaluer(expression.arbre, reference, grandeur)
+    resultat = Resultat(valeur, reference if a_unite else None, grandeur if a_unite else None)
+    if cache is not None:
+        cache.ecrire(cle, resultat)
+    return resultat
@@ -0,0 +1,277 @@
+"""
+Pipeline de conversion en flux pour les fichiers CSV et JSONL, sans interface
+graphique. Le fichier est lu et écrit par blocs de lignes : la mémoire utilisée
+ne dépend pas de la taille du fichier.
+
+Usage:
+    python -m conversions mesures.csv -c distance --de km --vers mile -g longueur -o sortie.csv
+    python -m conversions mesures.jsonl -c temp --de °F --vers °C -g temperature --workers 4
+    python -m conversions telemetrie.f64 --de km --vers m -g longueur --sur-place
+"""
+import csv
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+from conversions import appliquer_lot, coefficients
+
+TAILLE_BLOC = 10_000
+
+def _valeur_invalide(valeurs, numeros, colonne):
+    """Erreur désignant la première valeur non numérique, cherchée seulement après un échec"""
+    for valeur, numero in zip(valeurs, numeros):
+        try:
+            float(valeur)
+        except (TypeError, ValueError):
+            return ValueError(f"Ligne {numero}, colonne {colonne} : valeur non numérique {valeur!r}")
+    return ValueError(f"Colonne {colonne} : valeur non numérique")
+
+def convertir_bloc_csv(lignes, indices, facteur, decalage, delimiteur, premiere=1):
+    """
+    Convertit les colonnes demandées d'un bloc de lignes CSV déjà découpées.
+    Les cellules vides sont laissées telles quelles.
+
+    Args:
+        premiere (int): Numéro de la première ligne du bloc dans le fichier, pour les erreurs
+
+    Returns:
+        tuple: (texte CSV du bloc, nombre de lignes)
+    """
+    for indice in indices:
+        positions = [n for n, ligne in enumerate(lignes) if len(ligne) > indice and ligne[indice] != ""]
+        try:
+            valeurs = appliquer_lot([float(lignes[n][indice]) for n in positions], facteur, decalage)
+        except ValueError:
+            raise _valeur_invalide([lignes[n][indice] for n in positions],
+                                   [premiere + n for n in positions], indice + 1) from None
+        for n, valeur in zip(positions, valeurs):
+            lignes[n][indice] = repr(valeur)
+
+    tampon = io.StringIO()
+    csv.writer(tampon, delimiter=delimiteur, lineterminator="\n").writerows(lignes)
+    return tampon.getvalue(), len(lignes)
+
+def convertir_bloc_jsonl(lignes, colonnes, facteur, decalage, premiere=1):
+    """
+    Convertit les clés demandées d'un bloc de lignes JSONL brutes.
+    Les clés absentes ou nulles sont laissées telles quelles.
+
+    Args:
+        premiere (int): Numéro de la première ligne du bloc dans le fichier, pour les erreurs
+
+    Returns:
+        tuple: (texte JSONL du bloc, nombre d'enregistrements)
+    """
+    enregistrements = []
+    numeros = []
+    for numero, ligne in enumerate(lignes, premiere):
+        if not ligne.strip():
+            continue
+        try:
+            enregistrement = json.loads(ligne)
+        except ValueError as e:
+            raise ValueError(f"Ligne {numero} : JSON invalide ({e})") from None
+        if not isinstance(enregistrement, dict):
+            raise ValueError(f"Ligne {numero} : objet JSON attendu, trouvé {type(enregistrement).__name__}")
+        enregistrements.append(enregistrement)
+        numeros.append(numero)
+
+    for colonne in colonnes:
+        presents = [n for n, e in enumerate(enregistrements) if e.get(colonne) is not None]
+        try:
+            valeurs = appliquer_lot([float(enregistrements[n][colonne]) for n in presents], facteur, decalage)
+        except (TypeError, ValueError):
+            raise _valeur_invalide([enregistrements[n][colonne] for n in presents],
+                                   [numeros[n] for n in presents], colonne) from None
+        for n, valeur in zip(presents, valeurs):
+            enregistrements[n][colonne] = valeur
+
+    texte = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in enregistrements)
+    return texte, len(enregistrements)
+
+def _traiter_bloc(tache):
+    """Point d'entrée des processus de travail (doit rester au niveau du module)"""
+    format_fichier, bloc, parametres, premiere = tache
+    if format_fichier == "csv":
+        return convertir_bloc_csv(bloc, *parametres, premiere)
+    return convertir_bloc_jsonl(bloc, *parametres, premiere)
+
+def _decouper(iterable, taille_bloc):
+    """Découpe un itérable en listes d'au plus taille_bloc éléments"""
+    iterateur = iter(iterable)
+    while True:
+        bloc = list(islice(iterateur, taille_bloc))
+        if not bloc:
+            return
+        yield bloc
+
+def _executer_en_parallele(taches, workers):
+    """
+    Répartit les blocs sur un pool de processus en gardant l'ordre du fichier.
+    Au plus 2 blocs par processus sont en vol, la mémoire reste donc bornée.
+    """
+    from multiprocessing import Pool
+
+    with Pool(workers) as pool:
+        en_cours = deque()
+        for tache in taches:
+            en_cours.append(pool.apply_async(_traiter_bloc, (tache,)))
+            if len(en_cours) >= 2 * workers:
+                yield en_cours.popleft().get()
+        while en_cours:
+            yield en_cours.popleft().get()
+
+def convertir_flux(entree, sortie, format_fichier, colonnes, unite_source, unite_cible, grandeur,
+                   taille_bloc=TAILLE_BLOC, workers=1, delimiteur=","):
+    """
+    Convertit un flux CSV ou JSONL bloc par bloc.
+
+    Args:
+        entree: Fichier texte ouvert en lecture
+        sortie: Fichier texte ouvert en écriture
+        format_fichier (str): "csv" ou "jsonl"
+        colonnes (list): Noms des colonnes (ou clés JSON) à convertir
+        unite_source (str): Unité de départ
+        unite_cible (str): Unité cible
+        grandeur (str): Type de grandeur physique
+        taille_bloc (int): Nombre de lignes lues et écrites à la fois
+        workers (int): Nombre de processus (1 pour tout faire sur place)
+        delimiteur (str): Séparateur CSV
+
+    Returns:
+        int: Nombre de lignes converties
+    """
+    facteur, decalage = coefficients(unite_source, unite_cible, grandeur)
+
+    if format_fichier == "csv":
+        lecteur = csv.reader(entree, delimiter=delimiteur)
+        entete = next(lecteur, None)
+        if entete is None:
+            return 0
+        manquantes = [c for c in colonnes if c not in entete]
+        if manquantes:
+            raise ValueError(f"Colonnes absentes de l'en-tête : {', '.join(manquantes)}")
+        csv.writer(sortie, delimiter=delimiteur, lineterminator="\n").writerow(entete)
+        parametres = ([entete.index(c) for c in colonnes], facteur, decalage, delimiteur)
+        blocs = _decouper(lecteur, taille_bloc)
+        premiere = 2  # après l'en-tête
+    else:
+        parametres = (colonnes, facteur, decalage)
+        blocs = _decouper(entree, taille_bloc)
+        premiere = 1
+
+    taches = ((format_fichier, bloc, parametres, premiere + n * taille_bloc) for n, bloc in enumerate(blocs))
+    if workers > 1:
+        resultats = _executer_en_parallele(taches, workers)
+    else:
+        resultats = map(_traiter_bloc, taches)
+
+    total = 0
+    for texte, nombre in resultats:
+        sortie.write(texte)
+        total += nombre
+    return total
+
+def creer_parseur():
+    """Construit le parseur de la ligne de commande"""
+    import argparse  # seulement pour la ligne de commande
+
+    parseur = argparse.ArgumentParser(
+        prog="python -m conversions",
+        description="Convertit des colonnes d'un fichier CSV ou JSONL en flux.",
+    )
+    parseur.add_argument("entree", help="Fichier d'entrée ('-' pour l'entrée standard)")
+    parseur.add_argument("-o", "--sortie", default="-", help="Fichier de sortie (par défaut la sortie standard)")
+    parseur.add_argument("-c", "--colonne", action="append", dest="colonnes",
+                         help="Colonne à convertir (option répétable, sauf en f64)")
+    parseur.add_argument("--de", required=True, dest="unite_source", help="Unité source")
+    parseur.add_argument("--vers", required=True, dest="unite_cible", help="Unité cible")
+    parseur.add_argument("-g", "--grandeur", required=True, help="Type de grandeur physique")
+    parseur.add_argument("-f", "--format", choices=["csv", "jsonl", "f64"], dest="format_fichier",
+                         help="Format du fichier (déduit de l'extension par défaut) ; "
+                              "f64 = float64 petit-boutistes bruts")
+    parseur.add_argument("--sur-place", action="store_true",
+                         help="f64 uniquement : convertit le fichier d'entrée sur place")
+    parseur.add_argument("-d", "--delimiteur", default=",", help="Séparateur CSV (par défaut ',')")
+    parseur.add_argument("--taille-bloc", type=int, default=TAILLE_BLOC,
+                         help=f"Lignes lues et écrites à la fois (par défaut {TAILLE_BLOC})")
+    parseur.add_argument("--workers", type=int, default=1, help="Nombre de processus de conversion")
+    return parseur
+
+def _ouvrir(chemin, mode):
+    """Ouvre un fichier texte, ou renvoie l'entrée/sortie standard pour '-'"""
+    if chemin == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    return open(chemin, mode, newline="", encoding="utf-8")
+
+def _convertir_binaire(args):
+    """Mode f64 : fichier projeté en mémoire, débit affiché en Mo/s"""
+    from binaire import convertir_fichier_binaire
+
+    if args.entree == "-" or (args.sortie == "-" and not args.sur_place):
+        print("Erreur: le format f64 demande des chemins de fichiers (-o ou --sur-place)", file=sys.stderr)
+        return 1
+    try:
+        octets, duree = convertir_fichier_binaire(
+            args.entree, None if args.sur_place else args.sortie,
+            args.unite_source, args.unite_cible, args.grandeur,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{octets // 8} valeurs converties en {duree:.2f} s "
+          f"({octets / 1e6 / max(duree, 1e-9):,.1f} Mo/s)", file=sys.stderr)
+    return 0
+
+def main(argv=None):
+    """Point d'entrée de la ligne de commande"""
+    parseur = creer_parseur()
+    args = parseur.parse_args(argv)
+    format_fichier = args.format_fichier
+    if format_fichier is None:
+        if args.entree.endswith((".jsonl", ".ndjson")):
+            format_fichier = "jsonl"
+        elif args.entree.endswith((".f64", ".bin")):
+            format_fichier = "f64"
+        else:
+            format_fichier = "csv"
+
+    if format_fichier == "f64":
+        return _convertir_binaire(args)
+    if not args.colonnes:
+        parseur.error("au moins une colonne (-c) est requise en csv et jsonl")
+
+    debut = time.perf_counter()
+    try:
+        if "-" not in (args.entree, args.sortie) and os.path.exists(args.sortie) \
+                and os.path.samefile(args.entree, args.sortie):
+            # Ouvrir la sortie en "w" viderait l'entrée avant de la lire
+            raise ValueError(f"{args.sortie} est aussi le fichier d'entrée : choisir une autre sortie")
+        entree = _ouvrir(args.entree, "r")
+        try:
+            sortie = _ouvrir(args.sortie, "w")
+            try:
+                total = convertir_flux(
+                    entree, sortie, format_fichier, args.colonnes,
+                    args.unite_source, args.unite_cible, args.grandeur,
+                    taille_bloc=args.taille_bloc, workers=args.workers, delimiteur=args.delimiteur,
+                )
+            finally:
+                if sortie is not sys.stdout:
+                    sortie.close()
+        finally:
+            if entree is not sys.stdin:
+                entree.close()
+    except (OSError, ValueError) as e:
+        print(f"Erreur: {e}", file=sys.stderr)
+        return 1
+
+    duree = time.perf_counter() - debut
+    print(f"{total} lignes converties en {duree:.2f} s ({total / max(duree, 1e-9):,.0f} lignes/s)",
+          file=sys.stderr)
+    return 0
@@ -0,0 +1,164 @@
+"""
+Graphe des unités définies les unes par rapport aux autres (ex. une unité
+fournisseur définie en pieds, elle-même définie en mètres). Chaque définition
+"1 unite = facteur reference" est une arête, parcourable dans les deux sens.
+
+La conversion entre deux unités suit le plus court chemin (le moins de
+multiplications, donc le moins d'arrondis), réduit à un seul facteur gardé en
+mémoire : après le premier appel, une paire se résout en O(1). Les
+définitions redondantes (cycles) sont repérées, et signalées comme
+incohérentes si elles ne donnent pas le même facteur.
+"""
+from collections import deque, namedtuple
+
+TOLERANCE = 1e-9  # écart relatif admis entre deux chemins d'un même cycle
+
+# Arête fermant un cycle : facteur déclaré et facteur déduit par les autres définitions
+Incoherence = namedtuple("Incoherence", ["unite", "reference", "facteur_declare", "facteur_deduit", "ecart"])
+
+class GrapheUnites:
+    """
+    Graphe non orienté pondéré des unités d'une grandeur multiplicative.
+
+    Exemple:
+        graphe = GrapheUnites.depuis_table(GRANDEURS["longueur"], "m")
+        graphe.ajouter("brasse", 6, "pied")
+        graphe.facteur("brasse", "m")  # 1.8288
+    """
+
+    def __init__(self):
+        self.voisins = {}  # unite -> {voisine: facteur tel que 1 unite = facteur voisine}
+        self.aretes = []  # (unite, facteur, reference) dans l'ordre des définitions
+        self._facteurs = {}  # (source, cible) -> facteur résolu
+
+    @classmethod
+    def depuis_table(cls, facteurs, reference):
+        """Construit le graphe en étoile d'une table de facteurs vers l'unité de reférence"""
+        graphe = cls()
+        graphe.voisins.setdefault(reference, {})
+        for unite, facteur in facteurs.items():
+            if unite != reference:
+                graphe.ajouter(unite, facteur, reference)
+        return graphe
+
+    def __contains__(self, unite):
+        return unite in self.voisins
+
+    def ajouter(self, unite, facteur, reference):
+        """Déclare 1 unite = facteur reference"""
+        if unite == reference:
+            raise ValueError(f"Unité définie par rapport à elle-même : {unite}")
+        if facteur == 0:
+            raise ValueError(f"Facteur nul pour {unite}")
+        existant = self.voisins.get(unite, {}).get(reference)
+        if existant is not None and abs(existant - facteur) > TOLERANCE * abs(existant):
+            raise ValueError(
+                f"Définitions contradictoires : 1 {unite} = {existant} {reference} puis {facteur} {reference}"
+            )
+        self.voisins.setdefault(unite, {})[reference] = facteur
+        self.voisins.setdefault(reference, {})[unite] = 1 / facteur
+        self.aretes.append((unite, facteur, reference))
+        self._facteurs.clear()
+
+    def chemin(self, source, cible):
+        """
+        Plus court chemin (en nombre de définitions) entre deux unités.
+
+        Returns:
+            list: Unités traversées, de source à cible, ou None si elles ne sont pas reliées
+        """
+        for unite in (source, cible):
+            if unite not in self.voisins:
+                raise ValueError(f"Unité inconnue : {unite}")
+        precedents = {source: None}
+        file = deque([source])
+        while file:
+            unite = file.popleft()
+            if unite == cible:
+                chemin = []
+                while unite is not None:
+                    chemin.append(unite)
+                    unite = precedents[unite]
+                return chemin[::-1]
+            for voisine in self.voisins[unite]:
+                if voisine not in precedents:
+                    precedents[voisine] = unite
+                    file.append(voisine)
+        return None
+
+    def facteur(self, source, cible):
+        """
+        Facteur de conversion de source vers cible, le long du plus court chemin.
+        Le résultat (et son inverse) est mémorisé.
+        """
+        cle = (source, cible)
+        facteur = self._facteurs.get(cle)
+        if facteur is not None:
+            return facteur
+
+        chemin = self.chemin(source, cible)
+        if chemin is None:
+            raise ValueError(f"Aucune définition ne relie {source} à {cible}")
+        facteur = 1
+        for unite, suivante in zip(chemin, chemin[1:]):
+            facteur *= self.voisins[unite][suivante]
+        self._facteurs[cle] = facteur
+        self._facteurs[(cible, source)] = 1 / facteur
+        return facteur
+
+    def _potentiels(self):
+        """
+        Parcours en largeur de chaque composante : facteur de chaque unité vers
+        la racine de sa composante, et arêtes hors de l'arbre couvrant (cycles).
+        """
+        potentiels = {}
+        arbre = set()
+        for racine in self.voisins:
+            if racine in potentiels:
+                continue
+            potentiels[racine] = 1
+            file = deque([racine])
+            while file:
+                unite = file.popleft()
+                for voisine, facteur in self.voisins[unite].items():
+                    if voisine not in potentiels:
+                        potentiels[voisine] = potentiels[unite] * facteur
+                        arbre.add(frozenset((unite, voisine)))
+                        file.append(voisine)
+        return potentiels, arbre
+
+    def cycles(self):
+        """
+        Définitions redondantes : chacune ferme un cycle, les deux unités étant
+        déjà reliées par d'autres définitions.
+
+        Returns:
+            list: Arêtes (unite, facteur, reference) qui ferment un cycle
+        """
+        _, arbre = self._potentiels()
+        vues = set()
+        redondantes = []
+        for unite, facteur, reference in self.aretes:
+            paire = frozenset((unite, reference))
+            if paire in arbre and paire not in vues:
+                vues.add(paire)
+                continue
+            redondantes.append((unite, facteur, reference))
+        return redondantes
+
+    def incoherences(self, tolerance=TOLERANCE):
+        """
+        Cycles dont les définitions se contredisent : le facteur déclaré diffère
+        de celui déduit par les autres définitions de plus de `tolerance`.
+
+        Returns:
+            list: Incoherence pour chaque définition contradictoire
+        """
+        potentiels, _ = self._potentiels()
+        resultat = []
+        for unite, facteur, reference in self.cycles():
+            deduit = potentiels[reference] / potentiels[unite]
+            ecart = abs(facteur - deduit) / abs(deduit)
+            if ecart > tolerance:
+                resultat.append(Incoherence(unite, reference, facteur, deduit, ecart))
+        return resultat
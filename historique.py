@@ -0,0 +1,538 @@
+"""
+Historique des conversions en ajout seul. Chaque entrée est une ligne JSON
+ajoutée à la fin de data/historique.jsonl par un fil d'écriture en arrière-plan :
+l'interface ne fait que déposer l'entrée dans une file, sans jamais réécrire
+le fichier. Les fsync sont groupés, et le fichier est compacté quand il
+dépasse la rétention configurée.
+
+Un index des fins de ligne permet de relire n'importe quelle plage d'entrées
+sans charger tout le fichier (affichage fenêtré de l'onglet Historique), et un
+index en colonnes (date, grandeur, unités) sert aux recherches filtrées.
+
+Le compactage et l'effacement renumérotent les lignes : ils incrémentent
+JournalHistorique.generation. Un numéro de ligne ou une position n'a de sens
+que pour la génération sous laquelle il a été obtenu ; lire_plage et
+lire_lignes renvoient None quand on leur passe une génération périmée.
+
+Format d'une entrée :
+    {"horodatage": "2024-01-01 12:00:00", "texte": "1 km = 0.621371 mile",
+     "grandeur": "longueur", "valeur": 1, "source": "km", "cible": "mile",
+     "resultat": 0.621371}
+Seuls "horodatage" et "texte" sont obligatoires.
+"""
+import json
+import os
+import pickle
+import queue
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from itertools import islice
+
+CHEMIN_HISTORIQUE = os.path.join("data", "historique.jsonl")
+RETENTION = 1_000_000  # nombre d'entrées conservées (None pour illimité)
+MARGE_COMPACTAGE = 0.25  # on compacte quand le fichier dépasse la rétention de 25 %
+LOT_FSYNC = 256  # fsync au plus tard toutes les 256 entrées...
+DELAI_FSYNC = 1.0  # ... ou toutes les secondes
+TAILLE_LECTURE = 64 * 1024
+
+def formater_entree(entree):
+    """Met en forme une entrée comme dans l'affichage : "[date heure] texte" """
+    return f"[{entree['horodatage']}] {entree['texte']}"
+
+def analyser_entree(texte):
+    """Reconstruit une entrée depuis une ligne "[date heure] texte" (ancien format)"""
+    horodatage, _, reste = texte.partition("] ")
+    return {"horodatage": horodatage.lstrip("["), "texte": reste}
+
+_SEPARATEURS_DATE = str.maketrans("", "", "-: T")
+
+def cle_temps(horodatage, fin=False):
+    """
+    Convertit "AAAA-MM-JJ HH:MM:SS" (ou un préfixe, ex. "2024-01") en entier
+    AAAAMMJJHHMMSS qui respecte l'ordre chronologique. Avec fin=True, un
+    préfixe couvre toute la période : "2024-01-31" va jusqu'à la fin du jour.
+    """
+    chiffres = horodatage.translate(_SEPARATEURS_DATE)[:14]
+    if not chiffres.isdigit():
+        raise ValueError(f"Date invalide : {horodatage}")
+    return int(chiffres.ljust(14, "9" if fin else "0"))
+
+class IndexHistorique:
+    """
+    Index en colonnes des entrées pour la recherche : dates triées (l'historique
+    est en ajout seul) et listes triées de numéros de ligne par grandeur et par
+    unité (source ou cible).
+    """
+
+    def __init__(self):
+        self.temps = array("Q")
+        self.par_grandeur = {}
+        self.par_unite = {}
+
+    def __len__(self):
+        return len(self.temps)
+
+    def ajouter(self, entree):
+        ligne = len(self.temps)
+        try:
+            self.temps.append(cle_temps(entree.get("horodatage", "")))
+        except ValueError:
+            # Date illisible : on garde l'ordre en reprenant la précédente
+            self.temps.append(self.temps[-1] if self.temps else 0)
+        grandeur = entree.get("grandeur")
+        if grandeur:
+            self.par_grandeur.setdefault(grandeur, array("I")).append(ligne)
+        for unite in {entree.get("source"), entree.get("cible")}:
+            if unite:
+                self.par_unite.setdefault(unite, array("I")).append(ligne)
+
+    def rechercher(self, grandeur=None, unite=None, debut=None, fin=None):
+        """
+        Renvoie les numéros de ligne correspondant à tous les filtres, dans
+        l'ordre croissant (range ou array, indexables sans tout parcourir).
+
+        Args:
+            grandeur (str, optional): Grandeur exacte
+            unite (str, optional): Unité source ou cible
+            debut (str, optional): Date de début, ex. "2024-01-01"
+            fin (str, optional): Date de fin incluse, ex. "2024-01-31"
+        """
+        bas = bisect_left(self.temps, cle_temps(debut)) if debut else 0
+        haut = bisect_right(self.temps, cle_temps(fin, fin=True)) if fin else len(self.temps)
+
+        listes = []
+        if grandeur:
+            listes.append(self.par_grandeur.get(grandeur, array("I")))
+        if unite:
+            listes.append(self.par_unite.get(unite, array("I")))
+        if not listes:
+            return range(bas, max(bas, haut))
+
+        # Restriction à la fenêtre de temps par dichotomie, puis intersection
+        tranches = sorted(
+            (l[bisect_left(l, bas):bisect_left(l, haut)] for l in listes), key=len
+        )
+        resultat = tranches[-1]
+        for tranche in tranches[:-1]:
+            gardees = set(tranche)
+            resultat = array("I", (ligne for ligne in resultat if ligne in gardees))
+        return resultat
+
+def _indexer(chemin):
+    """Renvoie la position de fin (octet suivant le \\n) de chaque ligne du fichier"""
+    fins = array("Q")
+    try:
+        with open(chemin, "rb") as f:
+            position = 0
+            for morceau in iter(lambda: f.read(TAILLE_LECTURE), b""):
+                debut = 0
+                while True:
+                    trouve = morceau.find(b"\n", debut)
+                    if trouve < 0:
+                        break
+                    fins.append(position + trouve + 1)
+                    debut = trouve + 1
+                position += len(morceau)
+    except FileNotFoundError:
+        pass
+    return fins
+
+def _derniere_ligne(chemin, fins, lignes):
+    """Octets de la ligne numéro lignes - 1 (b"" pour lignes = 0), qui identifient un instantané"""
+    if not lignes:
+        return b""
+    debut = fins[lignes - 2] if lignes > 1 else 0
+    with open(chemin, "rb") as f:
+        f.seek(debut)
+        return f.read(fins[lignes - 1] - debut)
+
+class JournalHistorique:
+    """
+    Historique persistant en ajout seul, écrit par un fil dédié.
+
+    Args:
+        chemin (str): Fichier JSONL de l'historique
+        retention (int ou None): Nombre d'entrées conservées au compactage
+        lot_fsync (int): Nombre d'entrées écrites entre deux fsync
+        delai_fsync (float): Délai maximal en secondes entre deux fsync
+    """
+
+    def __init__(self, chemin=CHEMIN_HISTORIQUE, retention=RETENTION,
+                 lot_fsync=LOT_FSYNC, delai_fsync=DELAI_FSYNC):
+        self.chemin = chemin
+        self.retention = retention
+        self.lot_fsync = lot_fsync
+        self.delai_fsync = delai_fsync
+        self._file = queue.Queue()
+        # L'index et les entrées pas encore écrites sont partagés avec l'interface
+        self._verrou = threading.Lock()
+        self._fins = array("Q")
+        self._en_attente = deque()
+        self._fins_pretes = threading.Event()  # levé une fois le fichier existant indexé
+        self._erreur = None  # exception qui a arrêté le fil d'écriture
+        self._vider_en_cours = None  # Event de la dernière commande "vider" prise par le fil
+        self.generation = 0  # incrémentée (sous _verrou) à chaque renumérotation des lignes
+        # Index de recherche, construit en arrière-plan au démarrage
+        self._verrou_index = threading.Lock()
+        self._index = IndexHistorique()
+        self._index_pret = threading.Event()
+        self._fil = threading.Thread(target=self._ecrire_en_continu, name="journal-historique", daemon=True)
+        self._fil.start()
+
+    # --- API utilisée par l'interface (non bloquante) ---
+
+    def ajouter(self, texte, **champs):
+        """
+        Horodate une entrée et la dépose dans la file d'écriture.
+
+        Args:
+            texte (str): Texte affiché, ex. "1 km = 0.621371 mile"
+            **champs: Champs structurés (grandeur, valeur, source, cible, resultat...)
+        """
+        entree = {
+            "horodatage": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "texte": texte,
+        }
+        entree.update(champs)
+        self.importer([entree])
+        return entree
+
+    def importer(self, entrees):
+        """Ajoute des entrées déjà horodatées (migration de l'ancien config.json)"""
+        for entree in entrees:
+            with self._verrou:
+                self._en_attente.append(entree)
+            self._file.put(("ajouter", entree))
+
+    def effacer(self):
+        """Vide l'historique (attend que le fichier soit effectivement vidé)"""
+        self._file.put(("effacer", None))
+        self.vider()
+
+    def compacter(self):
+        """Ne garde que les `retention` dernières entrées"""
+        self._file.put(("compacter", None))
+
+    def vider(self, delai=None):
+        """
+        Attend que toutes les entrées en file soient écrites et synchronisées.
+        Si le fil d'écriture s'est arrêté sur une erreur (ex. OSError), la
+        relève au lieu d'attendre : les entrées en attente ne seront pas écrites.
+
+        Returns:
+            bool: False si le délai a expiré avant
+        """
+        fait = threading.Event()
+        with self._verrou:
+            # Sous le verrou : le fil ne peut pas s'arrêter entre le test et le dépôt
+            if self._erreur is None:
+                self._file.put(("vider", fait))
+        termine = self._erreur is not None or fait.wait(delai)
+        if self._erreur is not None:
+            raise self._erreur
+        return termine
+
+    def fermer(self):
+        """Écrit les entrées en attente puis arrête le fil d'écriture"""
+        if self._fil.is_alive():
+            self._file.put(("fermer", None))
+            self._fil.join()
+
+    def pret(self, delai=None):
+        """
+        Attend que le fichier existant soit indexé au démarrage.
+
+        Args:
+            delai (float, optional): Attente maximale en secondes
+
+        Returns:
+            bool: True si l'historique est lisible
+        """
+        return self._fins_pretes.wait(delai)
+
+    def nombre(self):
+        """
+        Nombre total d'entrées, y compris celles pas encore écrites.
+        Renvoie None tant que le fichier existant n'est pas indexé (voir pret).
+        """
+        if not self._fins_pretes.is_set():
+            return None
+        with self._verrou:
+            return len(self._fins) + len(self._en_attente)
+
+    def lire_plage(self, debut, fin, generation=None):
+        """
+        Lit les entrées d'indices debut à fin (exclu), 0 étant la plus ancienne.
+        Seules les lignes demandées sont lues sur le disque.
+
+        Args:
+            debut (int): Indice de la première entrée
+            fin (int): Indice suivant la dernière entrée
+            generation (int, optional): Génération sous laquelle les indices ont été calculés
+
+        Returns:
+            list: Entrées lues, ou None si le fichier existant n'est pas encore
+            indexé (voir pret) ou si la génération a changé depuis
+        """
+        if not self._fins_pretes.is_set():
+            return None
+        with self._verrou:
+            if generation is not None and generation != self.generation:
+                return None
+            sur_disque = len(self._fins)
+            debut = max(0, debut)
+            fin = min(fin, sur_disque + len(self._en_attente))
+            entrees = []
+            if debut < min(fin, sur_disque):
+                position = self._fins[debut - 1] if debut else 0
+                with open(self.chemin, "rb") as f:
+                    f.seek(position)
+                    donnees = f.read(self._fins[min(fin, sur_disque) - 1] - position)
+                entrees = [json.loads(ligne) for ligne in donnees.splitlines()]
+            if fin > sur_disque:
+                attente = list(self._en_attente)
+                entrees.extend(attente[max(0, debut - sur_disque):fin - sur_disque])
+        return entrees
+
+    def lire_lignes(self, numeros, generation=None):
+        """
+        Lit des entrées par numéro de ligne (ex. résultats d'une recherche).
+
+        Args:
+            numeros: Numéros de ligne
+            generation (int, optional): Génération sous laquelle les numéros ont été obtenus
+
+        Returns:
+            list: Entrées lues, ou None si la génération a changé depuis
+        """
+        entrees = []
+        with self._verrou:
+            if generation is not None and generation != self.generation:
+                return None
+            with open(self.chemin, "rb") as f:
+                for numero in numeros:
+                    position = self._fins[numero - 1] if numero else 0
+                    f.seek(position)
+                    entrees.append(json.loads(f.read(self._fins[numero] - position)))
+        return entrees
+
+    def rechercher(self, grandeur=None, unite=None, debut=None, fin=None):
+        """
+        Filtre l'historique écrit sur le disque (voir IndexHistorique.rechercher).
+        Attend, au premier appel ou pendant un compactage, que l'index de
+        recherche soit construit ; relève l'erreur du fil d'écriture s'il s'est
+        arrêté. Lire `generation` avant l'appel pour pouvoir relire ensuite
+        les lignes trouvées avec lire_lignes.
+
+        Returns:
+            Numéros de ligne correspondants, du plus ancien au plus récent
+        """
+        self._index_pret.wait()
+        if self._erreur is not None:
+            raise self._erreur
+        with self._verrou_index:
+            return self._index.rechercher(grandeur, unite, debut, fin)
+
+    def lire(self, limite=None):
+        """
+        Lit les entrées, les plus anciennes d'abord.
+
+        Args:
+            limite (int, optional): Ne renvoie que les `limite` dernières entrées
+        """
+        self.pret()
+        total = self.nombre()
+        return self.lire_plage(0 if limite is None else total - limite, total)
+
+    # --- Fil d'écriture ---
+
+    def _ecrire_en_continu(self):
+        try:
+            self._ecrire()
+        except Exception as e:
+            # Personne ne doit attendre une écriture qui n'aura pas lieu
+            with self._verrou:
+                self._erreur = e
+                if self._vider_en_cours is not None:
+                    self._vider_en_cours.set()
+                while True:
+                    try:
+                        commande, argument = self._file.get_nowait()
+                    except queue.Empty:
+                        break
+                    if commande == "vider":
+                        argument.set()
+            self._fins_pretes.set()
+            self._index_pret.set()
+
+    def _ecrire(self):
+        # Parcours complet hors verrou, puis publication en une seule étape
+        fins = _indexer(self.chemin)
+        with self._verrou:
+            self._fins = fins
+        self._fins_pretes.set()
+        self._reconstruire_index()
+
+        fichier = open(self.chemin, "ab")
+        position = self._fins[-1] if self._fins else 0
+        if fichier.tell() != position:
+            # Dernière ligne incomplète (arrêt brutal) : on la retire
+            fichier.truncate(position)
+        nouvelles_fins = array("Q")  # lignes écrites, pas encore visibles dans l'index
+        nouvelles_entrees = []
+        en_attente = 0  # entrées écrites mais pas encore synchronisées sur le disque
+        debut_lot = 0.0
+        try:
+            while True:
+                try:
+                    commande, argument = self._file.get(timeout=self.delai_fsync if en_attente else None)
+                except queue.Empty:
+                    commande, argument = None, None
+                if commande == "vider":
+                    self._vider_en_cours = argument  # réveillé aussi si une erreur arrête le fil
+
+                if commande == "ajouter":
+                    donnees = (json.dumps(argument, ensure_ascii=False) + "\n").encode("utf-8")
+                    fichier.write(donnees)
+                    position += len(donnees)
+                    nouvelles_fins.append(position)
+                    nouvelles_entrees.append(argument)
+                    if not en_attente:
+                        debut_lot = time.monotonic()
+                    en_attente += 1
+
+                # Rend les lignes écrites lisibles dès que la file est au repos
+                if nouvelles_fins and (commande != "ajouter" or self._file.empty()
+                                       or len(nouvelles_fins) >= self.lot_fsync):
+                    fichier.flush()
+                    with self._verrou:
+                        self._fins.extend(nouvelles_fins)
+                        for _ in nouvelles_fins:
+                            self._en_attente.popleft()
+                    with self._verrou_index:
+                        for entree in nouvelles_entrees:
+                            self._index.ajouter(entree)
+                    nouvelles_fins = array("Q")
+                    nouvelles_entrees = []
+
+                if commande == "effacer":
+                    fichier.close()
+                    self._supprimer_instantane()
+                    fichier = open(self.chemin, "wb")
+                    position = 0
+                    en_attente = 0
+                    self._index_pret.clear()
+                    with self._verrou:
+                        self._fins = array("Q")
+                        self.generation += 1
+                    with self._verrou_index:
+                        self._index = IndexHistorique()
+                    self._index_pret.set()
+                elif commande == "compacter" or (
+                    not nouvelles_fins and self.retention is not None
+                    and len(self._fins) > self.retention * (1 + MARGE_COMPACTAGE)
+                ):
+                    fichier = self._compacter(fichier)
+                    position = self._fins[-1] if self._fins else 0
+                    en_attente = 0
+
+                # fsync groupé : lot plein, délai écoulé, file au repos ou demande explicite
+                if en_attente and (
+                    commande in (None, "vider", "fermer")
+                    or en_attente >= self.lot_fsync
+                    or time.monotonic() - debut_lot >= self.delai_fsync
+                ):
+                    fichier.flush()
+                    os.fsync(fichier.fileno())
+                    en_attente = 0
+
+                if commande == "vider":
+                    argument.set()
+                elif commande == "fermer":
+                    self._enregistrer_index()
+                    return
+        finally:
+            fichier.close()
+
+    def _compacter(self, fichier):
+        """
+        Réécrit le fichier avec les dernières entrées puis le remplace atomiquement.
+        Seul ce fil modifie le fichier et _fins : la copie se fait hors verrou,
+        l'interface continuant de lire l'ancien fichier, et le verrou n'est pris
+        que pour le remplacer.
+        """
+        fichier.close()
+        if self.retention is not None and len(self._fins) > self.retention:
+            premiere = len(self._fins) - self.retention
+            decalage = self._fins[premiere - 1]
+            temporaire = self.chemin + ".tmp"
+            with open(self.chemin, "rb") as source, open(temporaire, "wb") as cible:
+                source.seek(decalage)
+                for morceau in iter(lambda: source.read(TAILLE_LECTURE), b""):
+                    cible.write(morceau)
+                cible.flush()
+                os.fsync(cible.fileno())
+            fins = array("Q", (fin - decalage for fin in self._fins[premiere:]))
+            # Les recherches attendent l'index renuméroté (voir _reconstruire_index)
+            self._index_pret.clear()
+            self._supprimer_instantane()
+            with self._verrou:
+                os.replace(temporaire, self.chemin)
+                self._fins = fins
+                self.generation += 1
+        self._reconstruire_index(depuis_instantane=False)
+        return open(self.chemin, "ab")
+
+    def _reconstruire_index(self, depuis_instantane=True):
+        """
+        Reconstruit l'index de recherche. L'instantané enregistré à la
+        fermeture est repris s'il correspond au début du fichier (même position
+        et même contenu de sa dernière ligne) : seules les lignes ajoutées
+        depuis sont alors relues.
+        """
+        index, octets = IndexHistorique(), 0
+        if depuis_instantane:
+            try:
+                with open(self.chemin + ".index", "rb") as f:
+                    instantane = pickle.load(f)
+                lignes = len(instantane["index"])
+                if (lignes <= len(self._fins)
+                        and instantane["octets"] == (self._fins[lignes - 1] if lignes else 0)
+                        and instantane["derniere"] == _derniere_ligne(self.chemin, self._fins, lignes)):
+                    index, octets = instantane["index"], instantane["octets"]
+            except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+                pass
+
+        try:
+            with open(self.chemin, "rb") as f:
+                f.seek(octets)
+                # Seules les lignes complètes sont indexées
+                for ligne in islice(f, len(self._fins) - len(index)):
+                    index.ajouter(json.loads(ligne))
+        except FileNotFoundError:
+            pass
+        with self._verrou_index:
+            self._index = index
+        self._index_pret.set()
+
+    def _enregistrer_index(self):
+        """Enregistre un instantané de l'index pour accélérer le prochain démarrage"""
+        with self._verrou_index:
+            lignes = len(self._index)
+            instantane = {"octets": self._fins[lignes - 1] if lignes else 0,
+                          "derniere": _derniere_ligne(self.chemin, self._fins, lignes), "index": self._index}
+            temporaire = self.chemin + ".index.tmp"
+            with open(temporaire, "wb") as f:
+                pickle.dump(instantane, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaire, self.chemin + ".index")
+
+    def _supprimer_instantane(self):
+        """Avant une renumérotation des lignes : l'instantané décrirait l'ancien fichier"""
+        try:
+            os.remove(self.chemin + ".index")
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,277 @@
+"""
+Instrumentation des chemins chauds : nombre d'appels et histogramme de latence
+par opération (convertir par grandeur et paire d'unités, ajout à l'historique,
+sauvegarde de la configuration, rafraîchissement de l'interface...).
+
+Désactivée par défaut : mesurer() renvoie alors un contexte vide partagé et
+convertir n'est pas chronométrée (la variante mesurée n'est installée qu'à
+l'activation). Les mesures s'exportent en instantané
+JSON ou au format texte de Prometheus.
+
+Exemple:
+    from instrumentation import activer_instrumentation, mesurer
+    instrumentation = activer_instrumentation()
+    with mesurer("sauvegarder_config"):
+        ...
+    instrumentation.exporter("data/mesures.prom")
+"""
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+# Bornes supérieures des seaux de latence, en secondes (de 1 µs à 10 s)
+BORNES = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+          1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SERIES_MAX = 10_000  # au-delà, les nouvelles étiquettes sont regroupées sous "autres"
+METRIQUE = "unit_switch_duree_secondes"
+
+class Histogramme:
+    """Compteurs par seau de latence, somme et maximum des durées observées"""
+
+    __slots__ = ("seaux", "nombre", "somme", "max")
+
+    def __init__(self):
+        self.seaux = [0] * (len(BORNES) + 1)  # le dernier seau compte les durées > 10 s
+        self.nombre = 0
+        self.somme = 0.0
+        self.max = 0.0
+
+    def observer(self, duree):
+        self.seaux[bisect_left(BORNES, duree)] += 1
+        self.nombre += 1
+        self.somme += duree
+        if duree > self.max:
+            self.max = duree
+
+    def quantile(self, q):
+        """Borne supérieure du seau contenant le quantile q (le maximum pour le dernier seau)"""
+        if not self.nombre:
+            return 0.0
+        rang = q * self.nombre
+        cumul = 0
+        for borne, compte in zip(BORNES, self.seaux):
+            cumul += compte
+            if cumul >= rang:
+                return min(borne, self.max)
+        return self.max
+
+class Instrumentation:
+    """
+    Mesures accumulées depuis l'activation (ou la dernière réinitialisation).
+    Une série est identifiée par l'opération et ses étiquettes, ex.
+    ("convertir", (("grandeur", "longueur"), ("source", "km"), ("cible", "mile"))).
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._conversions = {}  # (grandeur, source, cible) -> Histogramme, même objet que dans _series
+        self._verrou = threading.Lock()
+        self.debut = datetime.now()
+
+    def observer(self, operation, duree, etiquettes=()):
+        """
+        Enregistre une durée. Seule la création d'une série prend le verrou :
+        sous forte contention entre fils, un compteur peut perdre une unité.
+
+        Args:
+            operation (str): Nom de l'opération
+            duree (float): Durée en secondes
+            etiquettes (tuple): Paires (nom, valeur) qui distinguent la série
+        """
+        histogramme = self._series.get((operation, etiquettes))
+        if histogramme is None:
+            histogramme = self._creer_serie(operation, etiquettes)
+        histogramme.observer(duree)
+
+    def observer_conversion(self, grandeur, unite_source, unite_cible, duree):
+        """Point d'entrée de conversions.convertir, sans construire d'étiquettes une fois la série créée"""
+        histogramme = self._conversions.get((grandeur, unite_source, unite_cible))
+        if histogramme is None:
+            histogramme = self._creer_serie(
+                "convertir", (("grandeur", grandeur), ("source", unite_source), ("cible", unite_cible))
+            )
+            self._conversions[(grandeur, unite_source, unite_cible)] = histogramme
+        histogramme.observer(duree)
+
+    def _creer_serie(self, operation, etiquettes):
+        with self._verrou:
+            cle = (operation, etiquettes)
+            if cle not in self._series and len(self._series) >= SERIES_MAX:
+                cle = (operation, (("serie", "autres"),))
+            histogramme = self._series.get(cle)
+            if histogramme is None:
+                histogramme = self._series[cle] = Histogramme()
+            return histogramme
+
+    def mesurer(self, operation, **etiquettes):
+        """Contexte qui chronomètre son bloc"""
+        return _Chrono(self, operation, tuple(etiquettes.items()))
+
+    def reinitialiser(self):
+        with self._verrou:
+            self._series.clear()
+            self._conversions.clear()
+            self.debut = datetime.now()
+
+    def _copie(self):
+        with self._verrou:
+            return [(operation, etiquettes, h.nombre, h.somme, h.max, list(h.seaux), h.quantile(0.5), h.quantile(0.99))
+                    for (operation, etiquettes), h in self._series.items()]
+
+    def resume(self, limite=None):
+        """
+        Séries triées par temps total décroissant, pour le panneau de débogage.
+
+        Returns:
+            list: (libelle, nombre, total, p50, p99, max), durées en secondes
+        """
+        lignes = []
+        for operation, etiquettes, nombre, somme, maximum, _, p50, p99 in self._copie():
+            libelle = " ".join([operation] + [str(valeur) for _, valeur in etiquettes])
+            lignes.append((libelle, nombre, somme, p50, p99, maximum))
+        lignes.sort(key=lambda ligne: ligne[2], reverse=True)
+        return lignes[:limite]
+
+    def instantane(self):
+        """
+        Returns:
+            dict: Mesures sérialisables en JSON
+        """
+        series = []
+        for operation, etiquettes, nombre, somme, maximum, seaux, p50, p99 in self._copie():
+            series.append({
+                "operation": operation,
+                "etiquettes": dict(etiquettes),
+                "nombre": nombre,
+                "somme": somme,
+                "max": maximum,
+                "p50": p50,
+                "p99": p99,
+                "seaux": {str(borne): compte for borne, compte in zip(BORNES + ("+Inf",), seaux)},
+            })
+        return {
+            "debut": self.debut.isoformat(timespec="seconds"),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "series": series,
+        }
+
+    def prometheus(self):
+        """
+        Returns:
+            str: Mesures au format texte d'exposition de Prometheus (histogramme)
+        """
+        lignes = [
+            f"# HELP {METRIQUE} Durée des opérations instrumentées",
+            f"# TYPE {METRIQUE} histogram",
+        ]
+        for operation, etiquettes, nombre, somme, _, seaux, _, _ in self._copie():
+            base = ",".join(f'{_nom_prometheus(nom)}="{_echapper(valeur)}"'
+                            for nom, valeur in (("operation", operation),) + etiquettes)
+            cumul = 0
+            for borne, compte in zip(BORNES + ("+Inf",), seaux):
+                cumul += compte
+                lignes.append(f'{METRIQUE}_bucket{{{base},le="{borne}"}} {cumul}')
+            lignes.append(f"{METRIQUE}_sum{{{base}}} {somme!r}")
+            lignes.append(f"{METRIQUE}_count{{{base}}} {nombre}")
+        return "\n".join(lignes) + "\n"
+
+    def exporter(self, chemin):
+        """Écrit les mesures : texte Prometheus pour .prom/.txt, JSON sinon"""
+        if chemin.lower().endswith((".prom", ".txt")):
+            contenu = self.prometheus()
+        else:
+            contenu = json.dumps(self.instantane(), indent=2, ensure_ascii=False)
+        temporaire = chemin + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            f.write(contenu)
+        os.replace(temporaire, chemin)
+
+class _Chrono:
+    __slots__ = ("instrumentation", "operation", "etiquettes", "debut")
+
+    def __init__(self, instrumentation, operation, etiquettes):
+        self.instrumentation = instrumentation
+        self.operation = operation
+        self.etiquettes = etiquettes
+
+    def __enter__(self):
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        self.instrumentation.observer(self.operation, time.perf_counter() - self.debut, self.etiquettes)
+        return False
+
+class _Inactif:
+    """Contexte vide renvoyé par mesurer() quand l'instrumentation est désactivée"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+_INACTIF = _Inactif()
+_active = None
+
+def _nom_prometheus(nom):
+    return re.sub(r"\W", "_", nom, flags=re.ASCII)
+
+def _echapper(valeur):
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def formater_duree(secondes):
+    """Durée lisible à largeur fixe, ex. 12.3 µs"""
+    if secondes < 1e-3:
+        return f"{secondes * 1e6:6.1f} µs"
+    if secondes < 1:
+        return f"{secondes * 1e3:6.1f} ms"
+    return f"{secondes:6.2f} s "
+
+def activer_instrumentation():
+    """
+    Active l'instrumentation (et celle de conversions.convertir). Sans effet
+    si elle est déjà active.
+
+    Returns:
+        Instrumentation: Mesures en cours
+    """
+    global _active
+    import conversions
+
+    if _active is None:
+        _active = Instrumentation()
+    conversions._mesures = _active
+    conversions._installer_convertir()
+    return _active
+
+def desactiver_instrumentation():
+    """Désactive l'instrumentation ; les mesures accumulées sont abandonnées"""
+    global _active
+    import conversions
+
+    conversions._mesures = None
+    conversions._installer_convertir()
+    _active = None
+
+def instrumentation_active():
+    """Renvoie l'Instrumentation en cours, ou None si elle est désactivée"""
+    return _active
+
+def mesurer(operation, **etiquettes):
+    """
+    Chronomètre un bloc si l'instrumentation est active, ne fait rien sinon.
+
+    Exemple:
+        with mesurer("rafraichir", vue="historique"):
+            ...
+    """
+    active = _active
+    if active is None:
+        return _INACTIF
+    return _Chrono(active, operation, tuple(etiquettes.items()))
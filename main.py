@@ -1,11 +1,27 @@
+import time
+DEBUT_DEMARRAGE = time.perf_counter()  # avant tout autre import, pour --mesurer-demarrage
+
 import customtkinter as ctk
-from tkinter import messagebox
-from conversions import convertir, GRANDEURS, TEMPERATURE
+from tkinter import filedialog, messagebox
+import conversions
+from conversions import convertir_vers_toutes, GRANDEURS, TEMPERATURE
+from expressions import evaluer
+from export import exporter_historique as exporter_journal
+from historique import JournalHistorique, analyser_entree
+from instrumentation import (activer_instrumentation, desactiver_instrumentation, formater_duree,
+                             instrumentation_active, mesurer)
+from registre import charger_registre
+from taches import PlanificateurTaches
+from vue_historique import VueHistorique
 import json
 import os
+import sys
+import threading
 import webbrowser
 from datetime import datetime
-import csv
+
+RETENTION_HISTORIQUE = 1_000_000
+DELAI_SAISIE = 150  # ms sans frappe avant la conversion en direct
 
 class ConvertisseurApp:
     def __init__(self, root):
@@ -13,9 +29,16 @@ class ConvertisseurApp:
         self.root.title("🌟 UNIT SWITCH : Convertisseur d'unités SI 🌟")
         self.root.geometry("750x550")
         
+        # Disque, exports et recherches passent par le pool de tâches
+        self.taches = PlanificateurTaches(self.root)
+        self.verrou_config = threading.Lock()
+        self.version_config = 0  # dernière version demandée...
+        self.version_config_ecrite = 0  # ... et dernière version écrite
+        
         # Configuration initiale
         self.setup_dossiers()
         self.charger_config()
+        self.charger_unites()
         
         # Emojis pour chaque grandeur
         self.grandeur_emojis = {
@@ -32,16 +55,30 @@ class ConvertisseurApp:
         # Variables
         self.grandeurs = list(GRANDEURS.keys())
         self.unites = {}
-        self.historique = []
+        self.unites_affichees = []
+        self.calc_grandeur = None
+        self.tache_export = None
+        self.conversion_planifiee = None  # conversion en direct en attente (root.after)
+        self.vue_historique = None  # construite à la première ouverture de l'onglet
+        self.panneau_mesures = None  # panneau de débogage, construit à la première ouverture
+        self.actualisation_mesures = None
+        self.fichier_mesures = None  # export des mesures à la fermeture (--instrumentation=fichier)
         
         # Interface
         self.setup_ui()
-        self.changer_theme_customtkinter()
+        self.taches.statut_var = self.statut_var
+        self.appliquer_theme(self.config["theme"])  # sans réécrire config.json
         
         # Démarrer avec une grandeur commune (longueur)
         self.grandeur_combobox.set("📏 longueur")
         self.update_unites()
         
+        # Écrit l'historique en attente avant de fermer la fenêtre
+        self.root.protocol("WM_DELETE_WINDOW", self.quitter)
+        
+        # Le reste attend que la fenêtre soit affichée
+        self.root.after_idle(self.apres_affichage)
+        
     def setup_dossiers(self):
         """Crée le dossier data si inexistant"""
         if not os.path.exists("data"):
@@ -52,7 +89,7 @@ class ConvertisseurApp:
         self.config = {
             "theme": "light",
             "couleur": "blue",
-            "historique": [],
+            "retention_historique": RETENTION_HISTORIQUE,
             "unite_preferees": {}
         }
         
@@ -62,11 +99,57 @@ class ConvertisseurApp:
                 self.config.update(loaded_config)
         except (FileNotFoundError, json.JSONDecodeError):
             self.sauvegarder_config()
+        
+        # L'historique vit dans un journal en ajout seul, hors de config.json
+        self.journal = JournalHistorique(retention=self.config["retention_historique"])
+    
+    def apres_affichage(self):
+        """Travaux de démarrage repoussés après le premier affichage"""
+        anciennes_entrees = self.config.get("historique")
+        if anciennes_entrees:
+            # Migration de l'ancien format (liste de textes dans config.json)
+            def migrer():
+                self.journal.importer(analyser_entree(e) for e in anciennes_entrees)
+                self.journal.vider()
+            
+            def migration_terminee(_):
+                # Les anciennes entrées ne quittent config.json qu'une fois dans le journal
+                self.config.pop("historique", None)
+                self.sauvegarder_config()
+            
+            def echec(e):
+                messagebox.showwarning("Historique", f"Migration de l'ancien historique impossible : {str(e)}")
+            
+            self.taches.soumettre(
+                migrer, rappel=migration_terminee, erreur=echec,
+                libelle="Migration de l'historique"
+            )
+    
+    def charger_unites(self):
+        """Ajoute les unités personnalisées de data/unites.toml (ou .json)"""
+        try:
+            charger_registre()
+        except (OSError, ValueError) as e:
+            messagebox.showwarning("Unités personnalisées", f"Définitions ignorées : {str(e)}")
     
     def sauvegarder_config(self):
-        """Sauvegarde la configuration"""
-        with open("data/config.json", "w") as f:
-            json.dump(self.config, f, indent=4)
+        """Sauvegarde la configuration en arrière-plan"""
+        with mesurer("sauvegarder_config"):
+            # Copie prise dans le fil de l'interface : le fil d'écriture ne lit pas self.config
+            texte = json.dumps(self.config, indent=4)
+            self.version_config += 1
+            self.taches.soumettre(self.ecrire_config, texte, self.version_config, libelle="Sauvegarde de la configuration")
+    
+    def ecrire_config(self, texte, version):
+        """Écrit config.json (fil de travail), sans écraser une version plus récente"""
+        with self.verrou_config, mesurer("ecrire_config"):
+            if version <= self.version_config_ecrite:
+                return
+            temporaire = "data/config.json.tmp"
+            with open(temporaire, "w") as f:
+                f.write(texte)
+            os.replace(temporaire, "data/config.json")
+            self.version_config_ecrite = version
     
     def setup_ui(self):
         """Construit l'interface avec CustomTkinter"""
@@ -75,7 +158,7 @@ class ConvertisseurApp:
         self.root.grid_columnconfigure(0, weight=1)
         
         # Frame principale avec onglets
-        self.tabview = ctk.CTkTabview(self.root)
+        self.tabview = ctk.CTkTabview(self.root, command=self.onglet_selectionne)
         self.tabview.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
         
         # Création des onglets
@@ -84,17 +167,15 @@ class ConvertisseurApp:
         self.tabview.add("Historique")  # Onglet 3
         self.tabview.add("Aide")  # Onglet 4
         
-        # Onglet Conversion
+        # Onglet Conversion, affiché au démarrage
         self.setup_onglet_conversion()
         
-        # Onglet Calculatrice
-        self.setup_onglet_calculatrice()
-        
-        # Onglet Historique
-        self.setup_onglet_historique()
-        
-        # Onglet Aide
-        self.setup_onglet_aide()
+        # Les autres onglets sont construits à leur première ouverture
+        self.onglets_a_construire = {
+            "Calculatrice": self.setup_onglet_calculatrice,
+            "Historique": self.setup_onglet_historique,
+            "Aide": self.setup_onglet_aide,
+        }
         
         # Barre de statut
         self.setup_barre_statut()
@@ -102,6 +183,15 @@ class ConvertisseurApp:
         # Configuration du redimensionnement
         self.root.minsize(750, 550)
 
+    def onglet_selectionne(self):
+        """Construit l'onglet choisi s'il est ouvert pour la première fois"""
+        self.construire_onglet(self.tabview.get())
+    
+    def construire_onglet(self, nom):
+        construire = self.onglets_a_construire.pop(nom, None)
+        if construire is not None:
+            construire()
+    
     def setup_onglet_conversion(self):
         """Configure l'onglet de conversion"""
         tab = self.tabview.tab("Conversion")
@@ -140,7 +230,10 @@ class ConvertisseurApp:
         valeur_frame = ctk.CTkFrame(conv_frame)
         valeur_frame.pack(fill="x", pady=5)
         ctk.CTkLabel(valeur_frame, text="Valeur:").pack(side="left")
-        self.valeur_entry = ctk.CTkEntry(valeur_frame)
+        # Le résultat suit la saisie ; la frappe ne fait que replanifier la conversion
+        self.valeur_var = ctk.StringVar()
+        self.valeur_var.trace_add("write", self.planifier_conversion_directe)
+        self.valeur_entry = ctk.CTkEntry(valeur_frame, textvariable=self.valeur_var)
         self.valeur_entry.pack(side="left", padx=10, fill="x", expand=True)
         
         # Unités
@@ -148,11 +241,11 @@ class ConvertisseurApp:
         unites_frame.pack(fill="x", pady=5)
         
         ctk.CTkLabel(unites_frame, text="De:").pack(side="left")
-        self.unite_source_combobox = ctk.CTkComboBox(unites_frame)
+        self.unite_source_combobox = ctk.CTkComboBox(unites_frame, command=self.planifier_conversion_directe)
         self.unite_source_combobox.pack(side="left", padx=10, fill="x", expand=True)
         
         ctk.CTkLabel(unites_frame, text="À:").pack(side="left")
-        self.unite_cible_combobox = ctk.CTkComboBox(unites_frame)
+        self.unite_cible_combobox = ctk.CTkComboBox(unites_frame, command=self.planifier_conversion_directe)
         self.unite_cible_combobox.pack(side="left", padx=10, fill="x", expand=True)
         
         # Bouton de conversion
@@ -173,6 +266,20 @@ class ConvertisseurApp:
             wraplength=550
         )
         resultat_label.pack(fill="x", pady=10)
+        
+        # Panneau optionnel : la valeur dans toutes les unités de la grandeur
+        self.toutes_unites_switch = ctk.CTkSwitch(
+            conv_frame,
+            text="Afficher dans toutes les unités",
+            command=self.basculer_toutes_unites
+        )
+        self.toutes_unites_switch.pack(anchor="w", padx=5)
+        self.toutes_unites_texte = ctk.CTkTextbox(
+            conv_frame,
+            height=150,
+            font=ctk.CTkFont(family="Courier", size=12),
+            state="disabled"
+        )
     
     def setup_onglet_calculatrice(self):
         """Configure l'onglet calculatrice avancée"""
@@ -204,8 +311,10 @@ class ConvertisseurApp:
             command=self.convertir_resultat
         ).pack(side="left", padx=5, fill="x", expand=True)
         
-        self.unite_resultat_combobox = ctk.CTkComboBox(btn_frame)
+        self.unite_resultat_combobox = ctk.CTkComboBox(btn_frame, values=self.unites_affichees)
         self.unite_resultat_combobox.pack(side="left", padx=5, fill="x", expand=True)
+        if self.unites_affichees:
+            self.unite_resultat_combobox.set(self.unites_affichees[0])
         
         # Résultat
         self.calc_resultat_var = ctk.StringVar(value="Résultat apparaîtra ici")
@@ -223,7 +332,7 @@ class ConvertisseurApp:
         ctk.CTkLabel(exemples_frame, text="Exemples:").pack(anchor="w")
         exemples = [
             "2h30min + 45min → 3.25 h",
-            "500 g × 10 → 5 kg",
+            "500 g × 10 → 5000 g",
             "1 m + 5000 mm → 6 m"
         ]
         for ex in exemples:
@@ -243,24 +352,48 @@ class ConvertisseurApp:
             command=self.effacer_historique
         ).pack(side="left", padx=5)
         
-        ctk.CTkButton(
+        self.export_bouton = ctk.CTkButton(
             toolbar_frame, 
-            text="💾 Exporter en CSV", 
+            text="💾 Exporter", 
             command=self.exporter_historique
+        )
+        self.export_bouton.pack(side="left", padx=5)
+        
+        # Affichée seulement pendant un export
+        self.export_progression = ctk.CTkProgressBar(toolbar_frame, width=150)
+        
+        # Recherche : grandeur ou unité, et période
+        recherche_frame = ctk.CTkFrame(tab)
+        recherche_frame.pack(fill="x", pady=5)
+        
+        self.recherche_entry = ctk.CTkEntry(recherche_frame, width=140, placeholder_text="Grandeur ou unité")
+        self.recherche_entry.pack(side="left", padx=5)
+        self.recherche_debut_entry = ctk.CTkEntry(recherche_frame, width=100, placeholder_text="Du AAAA-MM-JJ")
+        self.recherche_debut_entry.pack(side="left", padx=5)
+        self.recherche_fin_entry = ctk.CTkEntry(recherche_frame, width=100, placeholder_text="Au AAAA-MM-JJ")
+        self.recherche_fin_entry.pack(side="left", padx=5)
+        self.recherche_entry.bind("<Return>", lambda e: self.rechercher_historique())
+        
+        ctk.CTkButton(
+            recherche_frame,
+            text="🔎 Rechercher",
+            width=110,
+            command=self.rechercher_historique
         ).pack(side="left", padx=5)
         
-        # Liste d'historique
-        self.histoire_text = ctk.CTkTextbox(
-            tab, 
-            wrap="word",
-            font=ctk.CTkFont(family="Courier", size=12)
-        )
-        self.histoire_text.pack(fill="both", expand=True, padx=5, pady=5)
-        self.histoire_text.insert("1.0", "Historique des conversions:\n\n")
-        self.histoire_text.configure(state="disabled")
+        ctk.CTkButton(
+            recherche_frame,
+            text="✖",
+            width=30,
+            command=self.reinitialiser_recherche
+        ).pack(side="left", padx=5)
         
-        # Charger l'historique existant
-        self.actualiser_affichage_historique()
+        # Liste d'historique (seules les lignes visibles sont rendues)
+        self.vue_historique = VueHistorique(tab, self.journal)
+        self.vue_historique.pack(fill="both", expand=True, padx=5, pady=5)
+        
+        # Charger l'historique existant une fois l'onglet affiché
+        self.root.after_idle(self.actualiser_affichage_historique)
     def setup_onglet_aide(self):
         """Configure l'onglet d'aide et informations"""
         tab = self.tabview.tab("Aide")
@@ -285,7 +418,7 @@ class ConvertisseurApp:
             "✅ Calculs complexes avec unités hétérogènes",
             "✅ Interface moderne et personnalisable",
             "✅ Historique complet des conversions",
-            "✅ Export des données en CSV"
+            "✅ Export des données en CSV, JSONL ou colonnes binaires"
         ]
         
         for feat in features:
@@ -325,12 +458,105 @@ class ConvertisseurApp:
             text=f"v1.0 • {datetime.now().year}",
             font=ctk.CTkFont(size=12)
         ).pack(side="right", padx=10)
+        
+        ctk.CTkButton(
+            statut_frame,
+            text="📊",
+            width=28,
+            height=22,
+            command=self.basculer_panneau_mesures
+        ).pack(side="right")
+    
+    def basculer_panneau_mesures(self):
+        """Affiche ou masque le panneau de débogage ; l'afficher active l'instrumentation"""
+        if self.panneau_mesures is None:
+            self.construire_panneau_mesures()
+        if self.panneau_mesures.winfo_ismapped():
+            self.masquer_panneau_mesures()
+            return
+        activer_instrumentation()
+        self.panneau_mesures.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
+        self.actualiser_panneau_mesures()
+    
+    def construire_panneau_mesures(self):
+        """Panneau des mesures : opérations les plus coûteuses, export et remise à zéro"""
+        self.panneau_mesures = ctk.CTkFrame(self.root)
+        self.mesures_texte = ctk.CTkTextbox(
+            self.panneau_mesures,
+            height=140,
+            font=ctk.CTkFont(family="Courier", size=11),
+            wrap="none"
+        )
+        self.mesures_texte.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        
+        boutons = ctk.CTkFrame(self.panneau_mesures, fg_color="transparent")
+        boutons.pack(side="right", fill="y", padx=5, pady=5)
+        ctk.CTkButton(boutons, text="💾 Exporter", width=120, command=self.exporter_mesures).pack(pady=2)
+        ctk.CTkButton(boutons, text="↺ Remettre à zéro", width=120, command=self.reinitialiser_mesures).pack(pady=2)
+        ctk.CTkButton(boutons, text="⏹ Désactiver", width=120, command=self.desactiver_mesures).pack(pady=2)
+    
+    def masquer_panneau_mesures(self):
+        if self.actualisation_mesures is not None:
+            self.root.after_cancel(self.actualisation_mesures)
+            self.actualisation_mesures = None
+        self.panneau_mesures.grid_remove()
+    
+    def actualiser_panneau_mesures(self):
+        """Réaffiche les mesures chaque seconde tant que le panneau est visible"""
+        instrumentation = instrumentation_active()
+        if instrumentation is None:
+            return
+        lignes = [f"{'opération':<40} {'appels':>8} {'total':>9} {'p50':>9} {'p99':>9} {'max':>9}"]
+        for libelle, nombre, total, p50, p99, maximum in instrumentation.resume(limite=20):
+            lignes.append(
+                f"{libelle[:40]:<40} {nombre:>8} {formater_duree(total)} {formater_duree(p50)} "
+                f"{formater_duree(p99)} {formater_duree(maximum)}"
+            )
+        self.mesures_texte.configure(state="normal")
+        self.mesures_texte.delete("1.0", "end")
+        self.mesures_texte.insert("1.0", "\n".join(lignes))
+        self.mesures_texte.configure(state="disabled")
+        self.actualisation_mesures = self.root.after(1000, self.actualiser_panneau_mesures)
+    
+    def exporter_mesures(self):
+        """Enregistre les mesures en JSON ou au format texte de Prometheus"""
+        instrumentation = instrumentation_active()
+        if instrumentation is None:
+            return
+        chemin = filedialog.asksaveasfilename(
+            initialdir="data",
+            initialfile="mesures.json",
+            defaultextension=".json",
+            filetypes=[("Instantané JSON", "*.json"), ("Prometheus", "*.prom")]
+        )
+        if not chemin:
+            return
+        try:
+            instrumentation.exporter(chemin)
+            self.statut_var.set(f"Mesures exportées dans {os.path.basename(chemin)}")
+        except OSError as e:
+            messagebox.showerror("Erreur", f"Échec de l'export des mesures: {str(e)}")
+    
+    def reinitialiser_mesures(self):
+        instrumentation = instrumentation_active()
+        if instrumentation is not None:
+            instrumentation.reinitialiser()
+    
+    def desactiver_mesures(self):
+        """Arrête l'instrumentation (mesures abandonnées) et masque le panneau"""
+        desactiver_instrumentation()
+        self.masquer_panneau_mesures()
+        self.statut_var.set("Instrumentation désactivée")
     
     def changer_theme_customtkinter(self):
-        """Change le thème avec CustomTkinter"""
+        """Change le thème avec CustomTkinter et l'enregistre"""
         theme = "dark" if self.theme_switch.get() == 1 else "light"
         self.config["theme"] = theme
         self.sauvegarder_config()
+        self.appliquer_theme(theme)
+    
+    def appliquer_theme(self, theme):
+        """Applique un thème sans toucher à la configuration"""
         ctk.set_appearance_mode(theme)
     
     def update_unites(self, event=None):
@@ -346,16 +572,74 @@ class ConvertisseurApp:
         else:
             unites = []
         
+        self.unites_affichees = unites
         self.unite_source_combobox.configure(values=unites)
         self.unite_cible_combobox.configure(values=unites)
-        self.unite_resultat_combobox.configure(values=unites)
         
         if unites:
             self.unite_source_combobox.set(unites[0])
             self.unite_cible_combobox.set(unites[1] if len(unites) > 1 else unites[0])
-            self.unite_resultat_combobox.set(unites[0])
+        
+        if "Calculatrice" not in self.onglets_a_construire and self.calc_grandeur is None:
+            # Sans calcul en cours, le résultat se convertit dans la grandeur de l'onglet Conversion
+            self.remplir_unites_resultat(grandeur)
         
         self.statut_var.set(f"Unités de {grandeur} chargées")
+        self.planifier_conversion_directe()
+    
+    def planifier_conversion_directe(self, *args):
+        """Repousse la conversion en direct de DELAI_SAISIE ms après la dernière frappe"""
+        if self.conversion_planifiee is not None:
+            self.root.after_cancel(self.conversion_planifiee)
+        self.conversion_planifiee = self.root.after(DELAI_SAISIE, self.convertir_en_direct)
+    
+    def convertir_en_direct(self):
+        """Met à jour le résultat (et le panneau toutes unités) sans toucher à l'historique"""
+        self.conversion_planifiee = None
+        with mesurer("conversion_directe"):
+            grandeur_full = self.grandeur_combobox.get()
+            grandeur = grandeur_full.split(" ")[1] if " " in grandeur_full else grandeur_full
+            texte = self.valeur_var.get().strip()
+            unite_source = self.unite_source_combobox.get()
+            unite_cible = self.unite_cible_combobox.get()
+            
+            if not texte:
+                self.resultat_var.set("Résultat apparaîtra ici")
+                self.afficher_toutes_unites(None)
+                return
+            try:
+                valeur = float(texte)
+                resultat = conversions.convertir(valeur, unite_source, unite_cible, grandeur)
+                toutes = convertir_vers_toutes(valeur, unite_source, grandeur) if self.toutes_unites_switch.get() else None
+            except ValueError:
+                # Saisie en cours ("1e", "-") : pas de boîte de dialogue à chaque frappe
+                self.resultat_var.set("…")
+                self.afficher_toutes_unites(None)
+                return
+            
+            self.resultat_var.set(f"{valeur} {unite_source} = {resultat:.6g} {unite_cible}")
+            self.afficher_toutes_unites(toutes, unite_cible)
+    
+    def basculer_toutes_unites(self):
+        """Affiche ou masque le panneau des conversions vers toutes les unités"""
+        if self.toutes_unites_switch.get():
+            self.toutes_unites_texte.pack(fill="both", expand=True, pady=5)
+            self.convertir_en_direct()
+        else:
+            self.toutes_unites_texte.pack_forget()
+    
+    def afficher_toutes_unites(self, toutes, unite_cible=None):
+        """Réécrit le panneau toutes unités en une seule insertion"""
+        if not self.toutes_unites_switch.get():
+            return
+        lignes = [
+            f"{valeur:>18.6g}  {unite}{'  ◀' if unite == unite_cible else ''}"
+            for unite, valeur in (toutes or {}).items()
+        ]
+        self.toutes_unites_texte.configure(state="normal")
+        self.toutes_unites_texte.delete("1.0", "end")
+        self.toutes_unites_texte.insert("1.0", "\n".join(lignes))
+        self.toutes_unites_texte.configure(state="disabled")
     
     def convertir(self):
         """Effectue une conversion simple"""
@@ -364,15 +648,20 @@ class ConvertisseurApp:
             grandeur_full = self.grandeur_combobox.get()
             grandeur = grandeur_full.split(" ")[1] if " " in grandeur_full else grandeur_full
             
-            valeur = float(self.valeur_entry.get())
-            unite_source = self.unite_source_combobox.get()
-            unite_cible = self.unite_cible_combobox.get()
+            with mesurer("saisie", vue="conversion"):
+                valeur = float(self.valeur_entry.get())
+                unite_source = self.unite_source_combobox.get()
+                unite_cible = self.unite_cible_combobox.get()
             
-            resultat = convertir(valeur, unite_source, unite_cible, grandeur)
+            resultat = conversions.convertir(valeur, unite_source, unite_cible, grandeur)
             texte_resultat = f"{valeur} {unite_source} = {resultat:.6g} {unite_cible}"
             
-            self.resultat_var.set(texte_resultat)
-            self.ajouter_historique(texte_resultat)
+            with mesurer("affichage", vue="conversion"):
+                self.resultat_var.set(texte_resultat)
+            self.ajouter_historique(
+                texte_resultat, grandeur=grandeur, valeur=valeur,
+                source=unite_source, cible=unite_cible, resultat=resultat
+            )
             self.statut_var.set("Conversion réussie!")
             
         except ValueError as e:
@@ -386,109 +675,221 @@ class ConvertisseurApp:
         """Effectue un calcul complexe avec unités"""
         try:
             expression = self.calc_entry.get()
-            grandeur_full = self.grandeur_combobox.get()
-            grandeur = grandeur_full.split(" ")[1] if " " in grandeur_full else grandeur_full
             
-            # Permet de parser 
-            if "+" in expression:
-                parties = expression.split("+")
-                val1, unite1 = parties[0].strip().split()
-                val2, unite2 = parties[1].strip().split()
-                
-                # Convertir tout dans la première unité
-                val2_conv = convertir(float(val2), unite2, unite1, grandeur)
-                total = float(val1) + val2_conv
-                
-                texte_resultat = f"{expression} = {total:.6g} {unite1}"
-                self.calc_resultat_var.set(texte_resultat)
-                self.ajouter_historique(f"Calcul: {texte_resultat}")
-                self.statut_var.set("Calcul réussi!")
+            # La grandeur est déduite des unités de l'expression
+            with mesurer("evaluer"):
+                resultat = evaluer(expression)
+            self.calc_grandeur = resultat.grandeur
+            if resultat.grandeur is not None:
+                self.remplir_unites_resultat(resultat.grandeur, resultat.unite)
+            
+            unite = f" {resultat.unite}" if resultat.unite else ""
+            texte_resultat = f"{expression} = {resultat.valeur:.6g}{unite}"
+            self.calc_resultat_var.set(texte_resultat)
+            self.ajouter_historique(
+                f"Calcul: {texte_resultat}", grandeur=resultat.grandeur, expression=expression,
+                cible=resultat.unite, resultat=resultat.valeur
+            )
+            self.statut_var.set("Calcul réussi!")
             
         except Exception as e:
             messagebox.showerror("Erreur", f"Expression invalide: {str(e)}")
             self.statut_var.set("Erreur dans le calcul")
     
+    def remplir_unites_resultat(self, grandeur, unite_actuelle=None):
+        """
+        Propose, pour convertir le résultat de la calculatrice, les unités de sa grandeur.
+        
+        Args:
+            grandeur (str): Grandeur du résultat
+            unite_actuelle (str, optional): Unité du résultat, choisie si la sélection n'est plus valable
+        """
+        unites = list(GRANDEURS.get(grandeur, ()))
+        self.unite_resultat_combobox.configure(values=unites)
+        if unites and self.unite_resultat_combobox.get() not in unites:
+            self.unite_resultat_combobox.set(unite_actuelle if unite_actuelle in unites else unites[0])
+    
     def convertir_resultat(self):
         """Convertit le résultat précédent dans une autre unité"""
         try:
             unite_cible = self.unite_resultat_combobox.get()
             grandeur_full = self.grandeur_combobox.get()
             grandeur = grandeur_full.split(" ")[1] if " " in grandeur_full else grandeur_full
+            grandeur = self.calc_grandeur or grandeur
             
             # Permet de parser le résultat précédent
             if "=" in self.calc_resultat_var.get():
-                valeur, unite_source = self.calc_resultat_var.get().split("=")[1].strip().split()
+                valeur, unite_source = self.calc_resultat_var.get().split("=")[-1].strip().split()
                 valeur = float(valeur)
                 
-                resultat = convertir(valeur, unite_source, unite_cible, grandeur)
+                resultat = conversions.convertir(valeur, unite_source, unite_cible, grandeur)
                 texte_resultat = f"{valeur} {unite_source} = {resultat:.6g} {unite_cible}"
                 self.calc_resultat_var.set(texte_resultat)
-                self.ajouter_historique(f"Conversion: {texte_resultat}")
+                self.ajouter_historique(
+                    f"Conversion: {texte_resultat}", grandeur=grandeur, valeur=valeur,
+                    source=unite_source, cible=unite_cible, resultat=resultat
+                )
                 self.statut_var.set("Résultat converti")
             
         except Exception as e:
             messagebox.showerror("Erreur", f"Impossible de convertir: {str(e)}")
             self.statut_var.set("Erreur de conversion")
     
-    def ajouter_historique(self, texte):
-        """Ajoute une entrée à l'historique"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entree = f"[{timestamp}] {texte}"
-        
-        self.historique.append(entree)
-        self.config["historique"] = self.historique[-50:]  # Pour garder 50 entrées
-        self.sauvegarder_config()
-        self.actualiser_affichage_historique()
+    def ajouter_historique(self, texte, **champs):
+        """Ajoute une entrée à l'historique, avec ses champs structurés pour la recherche"""
+        with mesurer("ajouter_historique"):
+            # Le journal écrit en arrière-plan : pas de réécriture de config.json ici
+            entree = self.journal.ajouter(texte, **champs)
+        
+        if self.vue_historique is not None:
+            with mesurer("affichage", vue="historique"):
+                self.vue_historique.ajouter_entree(entree)  # une seule ligne insérée
     
     def actualiser_affichage_historique(self):
         """Met à jour l'affichage de l'historique"""
-        self.histoire_text.configure(state="normal")
-        self.histoire_text.delete("1.0", "end")
-        self.histoire_text.insert("1.0", "Historique des conversions:\n\n")
-        
-        for entree in reversed(self.config["historique"]):
-            self.histoire_text.insert("end", entree + "\n")
-        
-        self.histoire_text.configure(state="disabled")
+        if self.vue_historique is not None:
+            self.vue_historique.charger()
+    
+    def rechercher_historique(self):
+        """Filtre l'historique par grandeur ou unité et par période"""
+        terme = self.recherche_entry.get().strip()
+        debut = self.recherche_debut_entry.get().strip() or None
+        fin = self.recherche_fin_entry.get().strip() or None
+        if not (terme or debut or fin):
+            self.reinitialiser_recherche()
+            return
+        
+        # Un nom de grandeur filtre la grandeur, tout autre texte une unité
+        grandeur = terme if terme in GRANDEURS else None
+        unite = terme if terme and grandeur is None else None
+        
+        def rechercher():
+            # La première recherche peut attendre la construction de l'index
+            debut_recherche = time.perf_counter()
+            generation = self.journal.generation
+            numeros = self.journal.rechercher(grandeur=grandeur, unite=unite, debut=debut, fin=fin)
+            return numeros, generation, time.perf_counter() - debut_recherche
+        
+        def afficher(resultat):
+            numeros, generation, duree = resultat
+            self.vue_historique.afficher_selection(numeros, generation)
+            self.statut_var.set(f"{len(numeros)} résultats ({duree * 1000:.1f} ms)")
+        
+        def echec(e):
+            messagebox.showerror("Erreur", f"Recherche invalide: {str(e)}")
+            self.statut_var.set("Erreur de recherche")
+        
+        self.taches.soumettre(rechercher, rappel=afficher, erreur=echec, libelle="Recherche dans l'historique")
+    
+    def reinitialiser_recherche(self):
+        """Efface les filtres et réaffiche tout l'historique"""
+        for entry in (self.recherche_entry, self.recherche_debut_entry, self.recherche_fin_entry):
+            entry.delete(0, "end")
+        self.actualiser_affichage_historique()
+        self.statut_var.set("Prêt")
     
     def effacer_historique(self):
         """Efface tout l'historique"""
         if messagebox.askyesno("Confirmer", "Voulez-vous vraiment effacer tout l'historique?"):
-            self.historique = []
-            self.config["historique"] = []
-            self.sauvegarder_config()
-            self.actualiser_affichage_historique()
-            self.statut_var.set("Historique effacé")
+            def effacer_termine(_):
+                self.actualiser_affichage_historique()
+                self.statut_var.set("Historique effacé")
+            
+            self.taches.soumettre(self.journal.effacer, rappel=effacer_termine, libelle="Effacement de l'historique")
     
     def exporter_historique(self):
-        """Exporte l'historique en CSV"""
-        try:
-            with open("data/historique_conversions.csv", "w", newline='', encoding="utf-8") as f:
-                writer = csv.writer(f, delimiter=';')
-                writer.writerow(["Date", "Heure", "Conversion"])
-                for entree in self.historique:
-                    # Format: "[2023-01-01 12:00:00] 1 km = 0,621371 mile"
-                    parts = entree.split("] ")
-                    date_heure = parts[0][1:]
-                    conversion = parts[1]
-                    date, heure = date_heure.split(" ")
-                    writer.writerow([date, heure, conversion])
-            
-            messagebox.showinfo("Succès", "Historique exporté dans data/historique_conversions.csv")
-            self.statut_var.set("Historique exporté en CSV")
+        """Exporte l'historique persistant en arrière-plan (CSV, JSONL ou colonnes .ucol)"""
+        if self.tache_export is not None:
+            # Export en cours : le bouton sert à l'annuler
+            self.tache_export.annuler()
+            return
+        
+        chemin = filedialog.asksaveasfilename(
+            initialdir="data",
+            initialfile="historique_conversions.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Colonnes binaires", "*.ucol")]
+        )
+        if not chemin:
+            return
+        
+        def exporte(nombre):
+            if self.tache_export.annulee():
+                self.statut_var.set(f"Export annulé après {nombre} entrées, aucun fichier écrit")
+                return
+            messagebox.showinfo("Succès", f"{nombre} entrées exportées dans {chemin}")
+            self.statut_var.set("Historique exporté")
             
             # Ouvre le dossier contenant le fichier (Windows)
             if os.name == 'nt':
-                os.startfile("data")
-            
-        except Exception as e:
+                os.startfile(os.path.dirname(chemin))
+        
+        def echec(e):
             messagebox.showerror("Erreur", f"Échec de l'export: {str(e)}")
             self.statut_var.set("Erreur lors de l'export")
+        
+        def termine():
+            self.tache_export = None
+            self.export_bouton.configure(text="💾 Exporter")
+            self.export_progression.pack_forget()
+        
+        self.tache_export = self.taches.soumettre(
+            exporter_journal, self.journal, chemin,
+            rappel=exporte, erreur=echec, fin=termine,
+            progression=lambda faites, total: self.export_progression.set(faites / total if total else 1),
+            libelle="Export de l'historique"
+        )
+        self.export_bouton.configure(text="⏹ Annuler l'export")
+        self.export_progression.set(0)
+        self.export_progression.pack(side="left", padx=5)
+    
+    def quitter(self):
+        """Termine les tâches en cours, ferme le journal d'historique puis la fenêtre"""
+        if self.tache_export is not None:
+            self.tache_export.annuler()
+        if self.conversion_planifiee is not None:
+            self.root.after_cancel(self.conversion_planifiee)
+        self.taches.fermer()
+        self.journal.fermer()
+        if self.fichier_mesures and instrumentation_active() is not None:
+            try:
+                instrumentation_active().exporter(self.fichier_mesures)
+            except OSError as e:
+                print(f"Export des mesures impossible : {e}", file=sys.stderr)
+        self.root.destroy()
     
   
 
+def mesurer_demarrage(root, app, fin_imports):
+    """
+    Affiche la durée de chaque étape du démarrage jusqu'à une fenêtre
+    utilisable, puis ferme l'application (python main.py --mesurer-demarrage).
+    """
+    fin_construction = time.perf_counter()
+    root.update()  # premier affichage complet de la fenêtre
+    fin_affichage = time.perf_counter()
+    etapes = [
+        ("imports", fin_imports - DEBUT_DEMARRAGE),
+        ("construction", fin_construction - fin_imports),
+        ("premier affichage", fin_affichage - fin_construction),
+        ("total (fenêtre utilisable)", fin_affichage - DEBUT_DEMARRAGE),
+    ]
+    for nom, duree in etapes:
+        print(f"{nom:<28} {duree * 1000:8.1f} ms", file=sys.stderr)
+    app.quitter()
+
 if __name__ == "__main__":
+    fin_imports = time.perf_counter()
     ctk.set_appearance_mode("system")
     root = ctk.CTk()
+    # --instrumentation[=fichier] : mesures actives dès le démarrage, exportées à la fermeture
+    option_mesures = next((a for a in sys.argv[1:] if a.partition("=")[0] == "--instrumentation"), None)
+    if option_mesures is not None:
+        activer_instrumentation()
     app = ConvertisseurApp(root)
-    root.mainloop()
\ No newline at end of file
+    if option_mesures is not None:
+        app.fichier_mesures = option_mesures.partition("=")[2] or None
+    if "--mesurer-demarrage" in sys.argv[1:]:
+        mesurer_demarrage(root, app, fin_imports)
+    else:
+        root.mainloop()
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Conversion de gros lots répartie sur plusieurs cœurs. Les valeurs sont copiées
+une seule fois dans un segment multiprocessing.shared_memory : les processus
+de travail n'en reçoivent que le nom et leurs bornes, sans aucun pickling des
+données.
+"""
+import atexit
+import os
+from array import array
+from math import ceil
+
+from conversions import appliquer_lot, coefficients
+
+TAILLE_FLOAT64 = 8
+SEUIL_PARALLELE = 1_000_000  # en dessous, le lot est converti sur un seul cœur
+TRANCHE_MIN = 65_536  # nombre minimal de valeurs par tranche
+TRANCHES_PAR_PROCESSUS = 4  # plusieurs tranches par processus pour équilibrer la charge
+
+_pool = None
+_pool_taille = 0
+
+def taille_tranche_auto(nombre, processus):
+    """
+    Choisit la taille des tranches : environ TRANCHES_PAR_PROCESSUS tranches
+    par processus, mais jamais moins de TRANCHE_MIN valeurs pour amortir le coût
+    d'un envoi de tâche.
+    """
+    return max(TRANCHE_MIN, ceil(nombre / (processus * TRANCHES_PAR_PROCESSUS)))
+
+def obtenir_pool(processus):
+    """Renvoie le pool de processus partagé, recréé si sa taille change"""
+    global _pool, _pool_taille
+    if _pool is None or _pool_taille != processus:
+        fermer_pool()
+        from multiprocessing import Pool
+
+        _pool = Pool(processus)
+        _pool_taille = processus
+    return _pool
+
+def fermer_pool():
+    """Arrête le pool de processus partagé s'il existe"""
+    global _pool, _pool_taille
+    if _pool is not None:
+        _pool.close()
+        _pool.join()
+        _pool = None
+        _pool_taille = 0
+
+atexit.register(fermer_pool)
+
+def _convertir_tranche(nom, debut, fin, facteur, decalage):
+    """Travail d'un processus : applique le facteur à sa tranche, sur place"""
+    from multiprocessing.shared_memory import SharedMemory
+
+    segment = SharedMemory(name=nom)
+    try:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+        if np is not None:
+            vue = np.ndarray((fin - debut,), dtype="d", buffer=segment.buf, offset=debut * TAILLE_FLOAT64)
+            vue *= facteur
+            if decalage:
+                vue += decalage
+            del vue
+        else:
+            vue = segment.buf.cast("d")
+            tranche = array("d", vue[debut:fin].tobytes())
+            vue[debut:fin] = appliquer_lot(tranche, facteur, decalage)
+            vue.release()
+    finally:
+        segment.close()
+
+def _copier_vers_segment(valeurs, segment, nombre):
+    """Copie les valeurs d'entrée dans le segment partagé, en float64"""
+    octets = nombre * TAILLE_FLOAT64
+    if isinstance(valeurs, array) and valeurs.typecode == "d":
+        segment.buf[:octets] = valeurs.tobytes()
+    elif isinstance(valeurs, memoryview) and valeurs.format == "d":
+        segment.buf[:octets] = valeurs.cast("B")
+    elif type(valeurs).__module__ == "numpy":
+        import numpy as np
+        np.ndarray((nombre,), dtype="d", buffer=segment.buf)[:] = valeurs
+    else:
+        segment.buf[:octets] = array("d", valeurs).tobytes()
+
+def _copier_depuis_segment(valeurs, segment, nombre):
+    """Recopie le résultat dans un conteneur du même type que l'entrée"""
+    octets = nombre * TAILLE_FLOAT64
+    if type(valeurs).__module__ == "numpy":
+        import numpy as np
+        return np.ndarray((nombre,), dtype="d", buffer=segment.buf).copy()
+    resultat = array("d", bytes(segment.buf[:octets]))
+    if isinstance(valeurs, array):
+        return resultat
+    if isinstance(valeurs, memoryview):
+        return memoryview(resultat)
+    if isinstance(valeurs, tuple):
+        return tuple(resultat)
+    return resultat.tolist()
+
+def convertir_lot_parallele(valeurs, unite_source, unite_cible, grandeur,
+                            processus=None, seuil=SEUIL_PARALLELE, taille_tranche=None):
+    """
+    Convertit un gros lot de valeurs sur plusieurs processus.
+
+    Args:
+        valeurs: Liste, tuple, array.array, memoryview ou tableau NumPy
+        unite_source (str): Unité de départ
+        unite_cible (str): Unité cible
+        grandeur (str): Type de grandeur physique
+        processus (int, optional): Nombre de processus (par défaut os.cpu_count())
+        seuil (int): En dessous de ce nombre de valeurs, convertir_lot est
+            utilisé directement sur un seul cœur
+        taille_tranche (int, optional): Valeurs par tâche (réglée automatiquement)
+
+    Returns:
+        Valeurs converties (float64), dans le même type de conteneur
+    """
+    facteur, decalage = coefficients(unite_source, unite_cible, grandeur)
+    nombre = len(valeurs)
+    processus = processus or os.cpu_count() or 1
+    if processus == 1 or nombre < seuil:
+        return appliquer_lot(valeurs, facteur, decalage)
+
+    # multiprocessing n'est importé que pour les lots réellement répartis
+    from multiprocessing.shared_memory import SharedMemory
+
+    taille_tranche = taille_tranche or taille_tranche_auto(nombre, processus)
+    segment = SharedMemory(create=True, size=nombre * TAILLE_FLOAT64)
+    try:
+        _copier_vers_segment(valeurs, segment, nombre)
+        taches = [
+            (segment.name, debut, min(debut + taille_tranche, nombre), facteur, decalage)
+            for debut in range(0, nombre, taille_tranche)
+        ]
+        obtenir_pool(processus).starmap(_convertir_tranche, taches)
+        return _copier_depuis_segment(valeurs, segment, nombre)
+    finally:
+        segment.close()
+        segment.unlink()
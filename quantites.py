@@ -0,0 +1,228 @@
+"""
+Analyse dimensionnelle : quantités avec unités composées (m/s, km/h,
+kg·m/s², kWh...). Une unité composée est analysée une seule fois en un
+facteur vers les unités SI et un vecteur d'exposants des 7 grandeurs de base ;
+le résultat est mémorisé dans un cache LRU.
+"""
+import re
+from functools import lru_cache
+
+from constantes import DIMENSIONS, GRANDEURS, NOM_UNITE, SYMBOLES_SI, UNITES_DERIVEES
+
+TAILLE_CACHE = 1024
+SANS_DIMENSION = (0, 0, 0, 0, 0, 0, 0)
+
+_EXPOSANTS = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁻", "0123456789-")
+
+_JETON = re.compile(r"""
+    \s*(?:
+        (?P<nom>""" + NOM_UNITE + r""")
+        (?:\^(?P<puissance>-?\d+)|(?P<exposant>⁻?[⁰¹²³⁴⁵⁶⁷⁸⁹]+))?
+      | (?P<symbole>[·*./()])
+      | (?P<un>1)
+    )""", re.VERBOSE)
+
+def _unite_simple(nom):
+    """Renvoie (facteur SI, dimensions) d'une unité non composée"""
+    if nom in UNITES_DERIVEES:
+        return UNITES_DERIVEES[nom]
+    for grandeur, facteurs in GRANDEURS.items():
+        if nom in facteurs:
+            if grandeur == "temperature":
+                # Seul le kelvin est une échelle absolue, utilisable dans un produit
+                if nom != "K":
+                    raise ValueError(f"Unité affine non composable : {nom} (utiliser convertir)")
+                return 1, DIMENSIONS[grandeur]
+            return facteurs[nom], DIMENSIONS[grandeur]
+    raise ValueError(f"Unité inconnue : {nom}")
+
+def _combiner(a, b, signe=1):
+    """Additionne (ou soustrait) deux vecteurs de dimensions"""
+    return tuple(x + signe * y for x, y in zip(a, b))
+
+def _puissance(facteur, dimensions, n):
+    return facteur ** n, tuple(d * n for d in dimensions)
+
+class _Analyseur:
+    """
+    Analyse une unité composée :
+        produit := facteur (("·" | "*" | "." | "/" | espace) facteur)*
+        facteur := nom exposant? | "(" produit ")" | "1"
+    Un "/" ne s'applique qu'au facteur qui le suit : kg/m/s = kg·m⁻¹·s⁻¹.
+    """
+
+    def __init__(self, texte):
+        self.jetons = []
+        position = 0
+        texte = texte.rstrip()
+        while position < len(texte):
+            correspondance = _JETON.match(texte, position)
+            if correspondance is None:
+                raise ValueError(f"Unité invalide : {texte!r}")
+            self.jetons.append(correspondance)
+            position = correspondance.end()
+        self.position = 0
+
+    def regarder(self):
+        if self.position < len(self.jetons):
+            return self.jetons[self.position]
+        return None
+
+    def analyser(self):
+        if not self.jetons:
+            raise ValueError("Unité vide")
+        resultat = self.produit()
+        if self.regarder() is not None:
+            raise ValueError(f"Jeton inattendu dans l'unité : {self.regarder().group().strip()}")
+        return resultat
+
+    def produit(self):
+        facteur, dimensions = self.facteur()
+        while True:
+            jeton = self.regarder()
+            if jeton is None or jeton.group("symbole") == ")":
+                return facteur, dimensions
+            signe = 1
+            if jeton.group("symbole") is not None:
+                signe = -1 if jeton.group("symbole") == "/" else 1
+                self.position += 1
+            f, d = self.facteur()
+            facteur = facteur * f if signe == 1 else facteur / f
+            dimensions = _combiner(dimensions, d, signe)
+
+    def facteur(self):
+        jeton = self.regarder()
+        if jeton is None:
+            raise ValueError("Unité incomplète")
+        self.position += 1
+        if jeton.group("un") is not None:
+            return 1, SANS_DIMENSION
+        if jeton.group("symbole") == "(":
+            resultat = self.produit()
+            jeton = self.regarder()
+            if jeton is None or jeton.group("symbole") != ")":
+                raise ValueError("Parenthèse fermante manquante dans l'unité")
+            self.position += 1
+            return resultat
+        if jeton.group("nom") is None:
+            raise ValueError(f"Unité attendue, trouvé : {jeton.group().strip()}")
+
+        facteur, dimensions = _unite_simple(jeton.group("nom"))
+        if jeton.group("puissance") is not None:
+            return _puissance(facteur, dimensions, int(jeton.group("puissance")))
+        if jeton.group("exposant") is not None:
+            return _puissance(facteur, dimensions, int(jeton.group("exposant").translate(_EXPOSANTS)))
+        return facteur, dimensions
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def analyser_unite(texte):
+    """
+    Analyse une unité, simple ou composée, une seule fois par texte.
+
+    Returns:
+        tuple: (facteur vers les unités SI, dimensions)
+    """
+    return _Analyseur(texte).analyser()
+
+@lru_cache(maxsize=TAILLE_CACHE)
+def unite_canonique(dimensions):
+    """Écrit un vecteur de dimensions en unités SI, ex. kg·m²/s²"""
+    chiffres = str.maketrans("0123456789-", "⁰¹²³⁴⁵⁶⁷⁸⁹⁻")
+
+    def ecrire(symbole, exposant):
+        return symbole if exposant == 1 else symbole + str(exposant).translate(chiffres)
+
+    numerateur = [ecrire(s, e) for s, e in zip(SYMBOLES_SI, dimensions) if e > 0]
+    denominateur = [ecrire(s, -e) for s, e in zip(SYMBOLES_SI, dimensions) if e < 0]
+    texte = "·".join(numerateur) or "1"
+    if len(denominateur) == 1:
+        texte += "/" + denominateur[0]
+    elif denominateur:
+        texte += "/(" + "·".join(denominateur) + ")"
+    return texte
+
+def _diviser_unites(a, b):
+    """Écrit le quotient de deux unités, avec parenthèses si b est composée"""
+    return f"{a}/{b}" if re.fullmatch(r"[A-Za-zµ°]+", b) else f"{a}/({b})"
+
+class Quantite:
+    """Valeur associée à une unité, simple ou composée"""
+    __slots__ = ("valeur", "unite", "facteur", "dimensions")
+
+    def __init__(self, valeur, unite):
+        self.valeur = valeur
+        self.unite = unite
+        self.facteur, self.dimensions = analyser_unite(unite)
+
+    @classmethod
+    def _creer(cls, valeur, unite, facteur, dimensions):
+        """Construit une quantité dont l'unité est déjà analysée"""
+        quantite = cls.__new__(cls)
+        quantite.valeur = valeur
+        quantite.unite = unite
+        quantite.facteur = facteur
+        quantite.dimensions = dimensions
+        return quantite
+
+    def __repr__(self):
+        return f"Quantite({self.valeur!r}, {self.unite!r})"
+
+    def __str__(self):
+        return f"{self.valeur:.6g} {self.unite}"
+
+    def vers(self, unite):
+        """
+        Convertit la quantité dans une autre unité de même dimension.
+
+        Exemple:
+            Quantite(90, "km/h").vers("m/s")  # Quantite(25.0, 'm/s')
+        """
+        facteur, dimensions = analyser_unite(unite)
+        if dimensions != self.dimensions:
+            raise ValueError(
+                f"Dimensions incompatibles : {self.unite} ({unite_canonique(self.dimensions)}) "
+                f"et {unite} ({unite_canonique(dimensions)})"
+            )
+        return Quantite._creer(self.valeur * self.facteur / facteur, unite, facteur, dimensions)
+
+    def en_si(self):
+        """Exprime la quantité en unités SI de reférence"""
+        return Quantite._creer(self.valeur * self.facteur, unite_canonique(self.dimensions), 1, self.dimensions)
+
+    def __add__(self, autre):
+        if not isinstance(autre, Quantite):
+            return NotImplemented
+        return Quantite._creer(self.valeur + autre.vers(self.unite).valeur, self.unite, self.facteur, self.dimensions)
+
+    def __sub__(self, autre):
+        if not isinstance(autre, Quantite):
+            return NotImplemented
+        return Quantite._creer(self.valeur - autre.vers(self.unite).valeur, self.unite, self.facteur, self.dimensions)
+
+    def __neg__(self):
+        return Quantite._creer(-self.valeur, self.unite, self.facteur, self.dimensions)
+
+    def __mul__(self, autre):
+        if isinstance(autre, Quantite):
+            return Quantite._creer(
+                self.valeur * autre.valeur, f"{self.unite}·{autre.unite}",
+                self.facteur * autre.facteur, _combiner(self.dimensions, autre.dimensions),
+            )
+        return Quantite._creer(self.valeur * autre, self.unite, self.facteur, self.dimensions)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, autre):
+        if isinstance(autre, Quantite):
+            return Quantite._creer(
+                self.valeur / autre.valeur, _diviser_unites(self.unite, autre.unite),
+                self.facteur / autre.facteur, _combiner(self.dimensions, autre.dimensions, -1),
+            )
+        return Quantite._creer(self.valeur / autre, self.unite, self.facteur, self.dimensions)
+
+def convertir_compose(valeur, unite_source, unite_cible):
+    """
+    Convertit une valeur entre deux unités composées de même dimension,
+    par exemple km/h vers m/s ou kWh vers J.
+    """
+    return Quantite(valeur, unite_source).vers(unite_cible).valeur
@@ -0,0 +1,308 @@
+"""
+Registre d'unités extensible : des unités supplémentaires sont lues depuis un
+fichier de définitions utilisateur (TOML ou JSON), validées puis fusionnées
+dans les tables de constantes.py. Les tables compilées sont gardées dans un
+cache binaire identifié par l'empreinte du contenu : tant que les définitions
+ne changent pas, le démarrage ne revalide ni ne recompile rien, même avec des
+milliers d'unités.
+
+Format (data/unites.toml) :
+    [longueur]
+    brasse = 1.8288          # facteur vers l'unité de reférence (m)
+    lieue = 4828.032
+    encablure = [100, "brasse"]  # ou relatif à une autre unité, même ajoutée ici
+
+
+    [temperature]
+    "°Ré" = ["5/4", "273.15"]  # (echelle, decalage) vers K, en rationnels exacts
+
+Le même contenu en JSON : {"longueur": {"brasse": 1.8288}, ...}
+"""
+import hashlib
+import json
+import math
+import os
+import pickle
+import re
+import sys
+
+from constantes import (GRANDEURS, NOM_UNITE, TABLES, TABLES_EXACTES, UNITES_DERIVEES, compiler_tables,
+                        rationnel)
+from graphe import GrapheUnites
+
+CHEMINS_DEFINITIONS = (os.path.join("data", "unites.toml"), os.path.join("data", "unites.json"))
+CHEMIN_CACHE = os.path.join("data", "unites.cache")
+VERSION_CACHE = 1
+
+# Un nom d'unité doit rester lisible par la calculatrice et l'analyse dimensionnelle
+_NOM_UNITE = re.compile(NOM_UNITE)
+
+# Unités livrées avec l'application, pour revenir à l'état initial
+UNITES_INTEGREES = {nom: dict(facteurs) for nom, facteurs in GRANDEURS.items()}
+
+def _refuser_doublons(paires):
+    """object_pairs_hook de json : une clé répétée est une erreur, pas un écrasement"""
+    objet = {}
+    for cle, valeur in paires:
+        if cle in objet:
+            raise ValueError(f"Clé en double dans les définitions : {cle}")
+        objet[cle] = valeur
+    return objet
+
+def lire_definitions(contenu, format_fichier):
+    """
+    Décode le contenu d'un fichier de définitions.
+
+    Args:
+        contenu (bytes): Contenu du fichier
+        format_fichier (str): "toml" ou "json"
+
+    Returns:
+        dict: {grandeur: {unite: definition}}
+    """
+    if format_fichier == "toml":
+        try:
+            import tomllib
+        except ImportError:
+            raise ValueError("Les définitions TOML demandent Python 3.11 ou plus (utiliser JSON)")
+        try:
+            return tomllib.loads(contenu.decode("utf-8"))
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Définitions TOML invalides : {e}")
+    try:
+        return json.loads(contenu, object_pairs_hook=_refuser_doublons)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Définitions JSON invalides : {e}")
+
+def _valider_facteur(grandeur, unite, facteur):
+    if isinstance(facteur, bool) or not isinstance(facteur, (int, float)):
+        raise ValueError(f"{grandeur}.{unite} : le facteur doit être un nombre")
+    if not math.isfinite(facteur) or facteur <= 0:
+        raise ValueError(f"{grandeur}.{unite} : le facteur doit être fini et strictement positif")
+    return facteur
+
+def _valider_affine(grandeur, unite, definition):
+    if not isinstance(definition, (list, tuple)) or len(definition) != 2:
+        raise ValueError(f"{grandeur}.{unite} : attendu [echelle, decalage]")
+    coefficients = []
+    for coefficient in definition:
+        if isinstance(coefficient, bool) or not isinstance(coefficient, (str, int, float)):
+            raise ValueError(f"{grandeur}.{unite} : coefficient invalide {coefficient!r}")
+        texte = coefficient if isinstance(coefficient, str) else repr(coefficient)
+        try:
+            numerateur, denominateur = rationnel(texte)
+        except ValueError:
+            raise ValueError(f"{grandeur}.{unite} : coefficient invalide {coefficient!r}")
+        if denominateur == 0:
+            raise ValueError(f"{grandeur}.{unite} : dénominateur nul dans {coefficient!r}")
+        coefficients.append((texte, numerateur))
+    if coefficients[0][1] == 0:
+        raise ValueError(f"{grandeur}.{unite} : l'échelle ne peut pas être nulle")
+    return tuple(texte for texte, _ in coefficients)
+
+def _relative(definition):
+    """Une définition [facteur, "unite"] exprime une unité par rapport à une autre"""
+    return isinstance(definition, (list, tuple)) and len(definition) == 2 and isinstance(definition[1], str)
+
+def _resoudre_relatives(grandeur, facteurs, relatives):
+    """
+    Ramène des définitions relatives à des facteurs vers l'unité de reférence,
+    par le plus court chemin du graphe des définitions.
+
+    Args:
+        grandeur (str): Nom de la grandeur
+        facteurs (dict): Facteurs absolus (unités existantes et nouvelles)
+        relatives (list): (unite, facteur, reference) dans l'ordre du fichier
+
+    Returns:
+        dict: {unite: facteur} pour les unités qui n'ont pas de facteur absolu
+    """
+    reference = next((u for u, f in facteurs.items() if f == 1), None)
+    if reference is None:
+        raise ValueError(f"{grandeur} : aucune unité de reférence de facteur 1")
+    graphe = GrapheUnites.depuis_table(facteurs, reference)
+    for unite, facteur, cible in relatives:
+        try:
+            graphe.ajouter(unite, facteur, cible)
+        except ValueError as e:
+            raise ValueError(f"{grandeur}.{unite} : {e}")
+
+    incoherences = graphe.incoherences()
+    if incoherences:
+        i = incoherences[0]
+        raise ValueError(
+            f"{grandeur}.{i.unite} : définitions incohérentes (1 {i.unite} = {i.facteur_declare} {i.reference}, "
+            f"les autres définitions donnent {i.facteur_deduit:.10g})"
+        )
+
+    resolues = {}
+    for unite, _, cible in relatives:
+        if unite in facteurs or unite in resolues:
+            continue
+        try:
+            resolues[unite] = graphe.facteur(unite, reference)
+        except ValueError:
+            raise ValueError(f"{grandeur}.{unite} : non reliée à {reference} (via {cible})")
+    return resolues
+
+def valider_definitions(definitions, tables=None):
+    """
+    Vérifie des définitions avant de les fusionner : grandeurs connues, noms
+    d'unités lisibles par la calculatrice, facteurs valides, et aucune unité
+    déjà définie ailleurs (même grandeur avec une autre valeur, autre grandeur
+    ou unité dérivée). Les définitions relatives sont résolues en facteurs
+    absolus ; une chaîne qui ne mène pas à l'unité de reférence, ou un cycle de
+    définitions contradictoires, est une erreur.
+
+    Args:
+        definitions (dict): {grandeur: {unite: definition}}
+        tables (dict, optional): Tables existantes, GRANDEURS par défaut
+
+    Returns:
+        dict: Définitions normalisées, sans les redéfinitions identiques
+    """
+    tables = GRANDEURS if tables is None else tables
+    if not isinstance(definitions, dict):
+        raise ValueError("Les définitions doivent être une table de grandeurs")
+
+    proprietaires = {unite: nom for nom, facteurs in tables.items() for unite in facteurs}
+    nouvelles = {}
+    relatives = {}
+    for grandeur, unites in definitions.items():
+        if grandeur not in tables:
+            raise ValueError(f"Grandeur inconnue : {grandeur} (grandeurs : {', '.join(tables)})")
+        if not isinstance(unites, dict):
+            raise ValueError(f"{grandeur} : attendu une table unité = facteur")
+
+        for unite, definition in unites.items():
+            if not _NOM_UNITE.fullmatch(unite):
+                raise ValueError(f"{grandeur} : nom d'unité invalide {unite!r}")
+            if unite in UNITES_DERIVEES:
+                raise ValueError(f"{grandeur}.{unite} : déjà une unité dérivée")
+
+            proprietaire = proprietaires.get(unite)
+            if proprietaire is not None and proprietaire != grandeur:
+                raise ValueError(f"{grandeur}.{unite} : unité déjà définie pour {proprietaire}")
+
+            if grandeur != "temperature" and _relative(definition):
+                # Résolue une fois toutes les unités de la grandeur connues ; sur une
+                # unité existante, ce n'est qu'une définition de plus à vérifier
+                facteur = _valider_facteur(grandeur, unite, definition[0])
+                relatives.setdefault(grandeur, []).append((unite, facteur, definition[1]))
+                proprietaires[unite] = grandeur
+                continue
+            if grandeur == "temperature":
+                valeur = _valider_affine(grandeur, unite, definition)
+            else:
+                valeur = _valider_facteur(grandeur, unite, definition)
+
+            if proprietaire == grandeur:
+                existante = tables[grandeur][unite]
+                if grandeur == "temperature":
+                    identique = tuple(map(rationnel, existante)) == tuple(map(rationnel, valeur))
+                else:
+                    identique = existante == valeur
+                if not identique:
+                    raise ValueError(
+                        f"{grandeur}.{unite} : redéfinition incohérente ({existante!r} puis {definition!r})"
+                    )
+                continue
+            proprietaires[unite] = grandeur
+            nouvelles.setdefault(grandeur, {})[unite] = valeur
+
+    for grandeur, definies in relatives.items():
+        facteurs = {**tables[grandeur], **nouvelles.get(grandeur, {})}
+        resolues = _resoudre_relatives(grandeur, facteurs, definies)
+        if resolues:
+            nouvelles.setdefault(grandeur, {}).update(resolues)
+    return nouvelles
+
+def empreinte(contenu):
+    """Empreinte du contenu des définitions, des unités intégrées et du format du cache"""
+    hachage = hashlib.sha256()
+    hachage.update(f"v{VERSION_CACHE}\n".encode())
+    hachage.update(repr(sorted((nom, sorted(f.items())) for nom, f in UNITES_INTEGREES.items())).encode())
+    hachage.update(contenu)
+    return hachage.hexdigest()
+
+def _lire_cache(chemin, cle):
+    try:
+        with open(chemin, "rb") as f:
+            cache = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    if not isinstance(cache, dict) or cache.get("empreinte") != cle:
+        return None
+    return cache
+
+def _ecrire_cache(chemin, cle, unites):
+    temporaire = chemin + ".tmp"
+    try:
+        with open(temporaire, "wb") as f:
+            pickle.dump({"empreinte": cle, "unites": unites, "tables": dict(TABLES)},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaire, chemin)
+    except OSError:
+        pass  # le cache n'est qu'une accélération
+
+def _oublier_resultats():
+    """Vide les caches qui dépendent des facteurs de conversion"""
+    TABLES_EXACTES.clear()
+    if "conversions" in sys.modules:
+        sys.modules["conversions"].oublier_specialisations()
+    if "quantites" in sys.modules:
+        sys.modules["quantites"].analyser_unite.cache_clear()
+    if "cache" in sys.modules:
+        sys.modules["cache"].vider_cache()
+
+def reinitialiser_registre():
+    """Revient aux seules unités intégrées"""
+    for nom, facteurs in UNITES_INTEGREES.items():
+        GRANDEURS[nom].clear()
+        GRANDEURS[nom].update(facteurs)
+    compiler_tables()
+    _oublier_resultats()
+
+def charger_registre(chemin=None, chemin_cache=CHEMIN_CACHE):
+    """
+    Ajoute aux unités intégrées celles d'un fichier de définitions, puis
+    recompile les tables (ou les relit dans le cache binaire si le contenu
+    n'a pas changé).
+
+    Args:
+        chemin (str, optional): Fichier .toml ou .json ; par défaut data/unites.toml
+            puis data/unites.json, s'ils existent
+        chemin_cache (str, optional): Cache binaire des tables compilées (None pour s'en passer)
+
+    Returns:
+        int: Nombre d'unités ajoutées
+    """
+    if chemin is None:
+        chemin = next((c for c in CHEMINS_DEFINITIONS if os.path.exists(c)), None)
+        if chemin is None:
+            return 0
+    with open(chemin, "rb") as f:
+        contenu = f.read()
+    cle = empreinte(contenu)
+
+    cache = _lire_cache(chemin_cache, cle) if chemin_cache else None
+    if cache is not None:
+        unites = cache["unites"]
+    else:
+        format_fichier = "toml" if chemin.lower().endswith(".toml") else "json"
+        unites = valider_definitions(lire_definitions(contenu, format_fichier), UNITES_INTEGREES)
+
+    for nom, facteurs in UNITES_INTEGREES.items():
+        GRANDEURS[nom].clear()
+        GRANDEURS[nom].update(facteurs)
+        GRANDEURS[nom].update(unites.get(nom, {}))
+
+    if cache is not None:
+        TABLES.clear()
+        TABLES.update(cache["tables"])
+    else:
+        compiler_tables()
+        if chemin_cache:
+            _ecrire_cache(chemin_cache, cle, unites)
+    _oublier_resultats()
+    return sum(len(u) for u in unites.values())
@@ -0,0 +1,307 @@
+"""
+Service de conversion local, sans interface graphique : HTTP/JSON sur
+127.0.0.1 et, si demandé, sur une socket Unix (même protocole). Les
+conversions simples reçues en même temps sont regroupées par paire d'unités et
+calculées en un seul appel à convertir_lot.
+
+Usage:
+    python serveur.py --port 8765 --socket /tmp/unitswitch.sock
+
+Routes (POST, corps JSON) :
+    /convertir  {"valeur": 1, "de": "km", "vers": "mile", "grandeur": "longueur"}
+    /lot        {"valeurs": [1, 2, 3], "de": "km", "vers": "mile", "grandeur": "longueur"}
+    /evaluer    {"expression": "2h30min + 45min", "grandeur": null}
+    GET /sante  état du service et statistiques de regroupement
+
+Exemple:
+    curl -s localhost:8765/convertir -d '{"valeur": 1, "de": "km", "vers": "m", "grandeur": "longueur"}'
+    curl -s --unix-socket /tmp/unitswitch.sock http://x/sante
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from cache import activer_cache, statistiques_cache
+from conversions import convertir_lot
+from expressions import evaluer
+from registre import charger_registre
+
+HOTE = "127.0.0.1"
+PORT = 8765
+DELAI_REGROUPEMENT = 0.0  # s ; 0 regroupe les requêtes arrivées dans le même tour de boucle
+TAILLE_MAX_LOT = 4096
+SEUIL_EXECUTEUR = 100_000  # au-delà, un lot est converti hors de la boucle d'événements
+TAILLE_MAX_CORPS = 64 * 1024 * 1024
+
+STATUTS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+class ErreurRequete(Exception):
+    """Erreur renvoyée au client avec un statut HTTP"""
+
+    def __init__(self, statut, message):
+        super().__init__(message)
+        self.statut = statut
+
+class Regroupeur:
+    """
+    Regroupe les conversions simples en attente par (source, cible, grandeur)
+    et les calcule en un seul appel à convertir_lot.
+
+    Args:
+        delai (float): Attente maximale en secondes avant de calculer un lot
+        taille_max (int): Un lot est calculé sans attendre dès cette taille
+    """
+
+    def __init__(self, delai=DELAI_REGROUPEMENT, taille_max=TAILLE_MAX_LOT):
+        self.delai = delai
+        self.taille_max = taille_max
+        self.en_attente = {}  # (source, cible, grandeur) -> ([valeurs], [futures])
+        self.planifie = None
+        self.requetes = 0
+        self.lots = 0
+
+    async def convertir(self, valeur, unite_source, unite_cible, grandeur):
+        boucle = asyncio.get_running_loop()
+        future = boucle.create_future()
+        cle = (unite_source, unite_cible, grandeur)
+        valeurs, futures = self.en_attente.setdefault(cle, ([], []))
+        valeurs.append(valeur)
+        futures.append(future)
+
+        if len(valeurs) >= self.taille_max:
+            self._calculer(cle, *self.en_attente.pop(cle))
+        elif self.planifie is None:
+            if self.delai:
+                self.planifie = boucle.call_later(self.delai, self.vider)
+            else:
+                self.planifie = boucle.call_soon(self.vider)
+        return await future
+
+    def vider(self):
+        """Calcule tous les lots en attente"""
+        self.planifie = None
+        en_attente, self.en_attente = self.en_attente, {}
+        for cle, (valeurs, futures) in en_attente.items():
+            self._calculer(cle, valeurs, futures)
+
+    def _calculer(self, cle, valeurs, futures):
+        self.requetes += len(valeurs)
+        self.lots += 1
+        try:
+            resultats = convertir_lot(valeurs, *cle)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, resultat in zip(futures, resultats):
+            if not future.done():  # client parti entre-temps
+                future.set_result(resultat)
+
+    def statistiques(self):
+        return {
+            "requetes": self.requetes,
+            "lots": self.lots,
+            "taille_moyenne_lot": self.requetes / self.lots if self.lots else 0,
+        }
+
+def _champ(donnees, nom, type_attendu=str):
+    valeur = donnees.get(nom)
+    if not isinstance(valeur, type_attendu) or isinstance(valeur, bool):
+        raise ErreurRequete(400, f"Champ manquant ou invalide : {nom}")
+    return valeur
+
+class ServiceConversion:
+    """Traite les requêtes HTTP d'un client (TCP ou socket Unix)"""
+
+    def __init__(self, regroupeur=None):
+        self.regroupeur = regroupeur or Regroupeur()
+
+    async def convertir(self, donnees):
+        valeur = _champ(donnees, "valeur", (int, float))
+        try:
+            valeur = float(valeur)
+        except OverflowError:
+            # Entier JSON trop grand pour un float : à refuser avant de rejoindre un lot
+            raise ErreurRequete(400, "Valeur hors limites")
+        resultat = await self.regroupeur.convertir(
+            valeur, _champ(donnees, "de"), _champ(donnees, "vers"), _champ(donnees, "grandeur")
+        )
+        return {"resultat": resultat}
+
+    async def lot(self, donnees):
+        valeurs = _champ(donnees, "valeurs", list)
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in valeurs):
+            raise ErreurRequete(400, "Les valeurs doivent être des nombres")
+        parametres = (_champ(donnees, "de"), _champ(donnees, "vers"), _champ(donnees, "grandeur"))
+        if len(valeurs) >= SEUIL_EXECUTEUR:
+            boucle = asyncio.get_running_loop()
+            resultats = await boucle.run_in_executor(None, convertir_lot, valeurs, *parametres)
+        else:
+            resultats = convertir_lot(valeurs, *parametres)
+        return {"resultats": resultats}
+
+    async def evaluer(self, donnees):
+        grandeur = donnees.get("grandeur")
+        if grandeur is not None and not isinstance(grandeur, str):
+            raise ErreurRequete(400, "Champ invalide : grandeur")
+        resultat = evaluer(_champ(donnees, "expression"), grandeur)
+        return {"valeur": resultat.valeur, "unite": resultat.unite, "grandeur": resultat.grandeur}
+
+    async def repondre(self, methode, chemin, corps):
+        if chemin == "/sante":
+            return {"etat": "ok", **self.regroupeur.statistiques(), "cache": statistiques_cache()}
+        routes = {"/convertir": self.convertir, "/lot": self.lot, "/evaluer": self.evaluer}
+        if chemin not in routes:
+            raise ErreurRequete(404, f"Route inconnue : {chemin}")
+        if methode != "POST":
+            raise ErreurRequete(405, "Utiliser POST")
+        try:
+            donnees = json.loads(corps)
+        except (ValueError, UnicodeDecodeError):
+            raise ErreurRequete(400, "Corps JSON invalide")
+        if not isinstance(donnees, dict):
+            raise ErreurRequete(400, "Le corps doit être un objet JSON")
+        return await routes[chemin](donnees)
+
+    async def servir_client(self, lecteur, ecrivain):
+        """Boucle de requêtes d'une connexion (HTTP/1.1 persistant)"""
+        try:
+            while True:
+                ligne = await lecteur.readline()
+                if not ligne:
+                    return
+                try:
+                    methode, chemin, version = ligne.decode("latin-1").split()
+                except ValueError:
+                    await self._envoyer(ecrivain, 400, {"erreur": "Requête invalide"}, False)
+                    return
+
+                entetes = {}
+                while True:
+                    ligne = await lecteur.readline()
+                    if ligne in (b"\r\n", b"\n", b""):
+                        break
+                    nom, _, valeur = ligne.decode("latin-1").partition(":")
+                    entetes[nom.strip().lower()] = valeur.strip()
+                garder = (entetes.get("connection", "").lower() != "close"
+                          if version == "HTTP/1.1" else entetes.get("connection", "").lower() == "keep-alive")
+
+                texte_longueur = entetes.get("content-length", "")
+                # Chiffres ASCII seulement : int() accepterait aussi "-5", "+5" ou "1_000"
+                if texte_longueur and not (texte_longueur.isascii() and texte_longueur.isdigit()):
+                    await self._envoyer(ecrivain, 400, {"erreur": "Content-Length invalide"}, False)
+                    return
+                longueur = int(texte_longueur or 0)
+                if longueur > TAILLE_MAX_CORPS:
+                    await self._envoyer(ecrivain, 413, {"erreur": "Corps trop volumineux"}, False)
+                    return
+                corps = await lecteur.readexactly(longueur) if longueur else b""
+
+                try:
+                    statut, reponse = 200, await self.repondre(methode, chemin.split("?", 1)[0], corps)
+                except ErreurRequete as e:
+                    statut, reponse = e.statut, {"erreur": str(e)}
+                except (ValueError, OverflowError) as e:
+                    statut, reponse = 400, {"erreur": str(e)}
+                except Exception as e:
+                    statut, reponse = 500, {"erreur": str(e)}
+                await self._envoyer(ecrivain, statut, reponse, garder)
+                if not garder:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            ecrivain.close()
+
+    async def _envoyer(self, ecrivain, statut, reponse, garder):
+        try:
+            corps = json.dumps(reponse, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        except ValueError:
+            # NaN et Infinity ne sont pas du JSON valide : résultat hors limites
+            statut = 400
+            corps = json.dumps({"erreur": "Résultat non fini (hors limites)"}, ensure_ascii=False).encode("utf-8")
+        ecrivain.write(
+            f"HTTP/1.1 {statut} {STATUTS[statut]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(corps)}\r\n"
+            f"Connection: {'keep-alive' if garder else 'close'}\r\n\r\n".encode("latin-1") + corps
+        )
+        await ecrivain.drain()
+
+async def servir(hote=HOTE, port=PORT, socket_unix=None, delai=DELAI_REGROUPEMENT, pret=None):
+    """
+    Démarre le service et le fait tourner jusqu'à l'annulation.
+
+    Args:
+        hote (str): Adresse d'écoute TCP (None pour ne pas écouter en TCP)
+        port (int): Port TCP
+        socket_unix (str, optional): Chemin de la socket Unix
+        delai (float): Délai de regroupement des conversions, en secondes
+        pret (callable, optional): Appelée avec la liste des adresses d'écoute
+    """
+    service = ServiceConversion(Regroupeur(delai))
+    serveurs = []
+    if hote is not None:
+        serveurs.append(await asyncio.start_server(service.servir_client, hote, port))
+    if socket_unix:
+        if os.path.exists(socket_unix):
+            os.unlink(socket_unix)
+        serveurs.append(await asyncio.start_unix_server(service.servir_client, socket_unix))
+    if not serveurs:
+        raise ValueError("Aucune adresse d'écoute")
+
+    adresses = [sock.getsockname() for serveur in serveurs for sock in serveur.sockets]
+    if pret is not None:
+        pret(adresses)
+    try:
+        await asyncio.gather(*(serveur.serve_forever() for serveur in serveurs))
+    finally:
+        if socket_unix and os.path.exists(socket_unix):
+            os.unlink(socket_unix)
+
+def creer_parseur():
+    parseur = argparse.ArgumentParser(
+        prog="serveur.py",
+        description="Service local de conversion d'unités (HTTP/JSON et socket Unix).",
+    )
+    parseur.add_argument("--hote", default=HOTE, help=f"adresse d'écoute (défaut {HOTE})")
+    parseur.add_argument("--port", type=int, default=PORT, help=f"port TCP (défaut {PORT})")
+    parseur.add_argument("--socket", dest="socket_unix", help="chemin d'une socket Unix à ouvrir en plus")
+    parseur.add_argument("--sans-tcp", action="store_true", help="n'écouter que sur la socket Unix")
+    parseur.add_argument("--delai-lot", type=float, default=DELAI_REGROUPEMENT * 1000,
+                         help="attente maximale de regroupement en ms (défaut 0 : même tour de boucle)")
+    parseur.add_argument("--unites", help="fichier d'unités personnalisées (défaut data/unites.toml ou .json)")
+    parseur.add_argument("--cache", type=int, metavar="TAILLE",
+                         help="mettre en cache les résultats d'evaluer (TAILLE entrées)")
+    parseur.add_argument("--ttl", type=float, help="durée de vie des résultats en cache, en secondes")
+    return parseur
+
+def main(argv=None):
+    args = creer_parseur().parse_args(argv)
+    hote = None if args.sans_tcp else args.hote
+    try:
+        charger_registre(args.unites)
+    except (OSError, ValueError) as e:
+        print(f"Erreur dans les unités personnalisées : {e}", file=sys.stderr)
+        return 1
+    if args.cache:
+        # Les conversions simples sont déjà regroupées en lots : seul evaluer gagne au cache
+        activer_cache(args.cache, args.ttl, conversions=False)
+    try:
+        asyncio.run(servir(
+            hote, args.port, args.socket_unix, args.delai_lot / 1000,
+            pret=lambda adresses: print(f"En écoute sur {', '.join(map(str, adresses))}", file=sys.stderr, flush=True),
+        ))
+    except KeyboardInterrupt:
+        pass
+    except (ValueError, OSError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Planificateur de tâches de fond pour l'interface. Les tâches (écritures sur le
+disque, exports, recherches, lots de conversions) s'exécutent dans un pool de
+fils ; leurs résultats reviennent au fil de Tk par une file relevée avec
+root.after, seul fil autorisé à toucher aux widgets.
+"""
+import inspect
+import queue
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+WORKERS = 2
+INTERVALLE_RELEVE = 50  # ms entre deux relevés de la file tant que des tâches sont actives
+
+class Tache:
+    """
+    Tâche soumise au planificateur.
+
+    Attributes:
+        libelle (str): Texte affiché dans la barre de statut pendant l'exécution
+        annulation (threading.Event): Levée par annuler(), à consulter par les tâches longues
+        future (concurrent.futures.Future): Exécution sous-jacente
+    """
+    __slots__ = ("libelle", "annulation", "future", "rappel", "erreur", "progression", "fin")
+
+    def __init__(self, libelle, rappel, erreur, progression, fin):
+        self.libelle = libelle
+        self.annulation = threading.Event()
+        self.future = None
+        self.rappel = rappel
+        self.erreur = erreur
+        self.progression = progression
+        self.fin = fin
+
+    def annuler(self):
+        """Annule la tâche : retirée de la file si elle n'a pas démarré, interrompue sinon"""
+        self.annulation.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def annulee(self):
+        return self.annulation.is_set()
+
+class PlanificateurTaches:
+    """
+    Exécute des fonctions hors du fil de l'interface et rappelle le résultat
+    dans le fil de Tk.
+
+    Args:
+        root: Fenêtre Tk, utilisée pour les relevés par root.after
+        statut_var (StringVar, optional): Barre de statut où signaler l'activité
+        workers (int): Nombre de fils du pool
+    """
+
+    def __init__(self, root, statut_var=None, workers=WORKERS):
+        self.root = root
+        self.statut_var = statut_var
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tache")
+        self._messages = queue.Queue()
+        self._actives = []
+        self._releve = None  # identifiant du prochain root.after
+        self._statut_precedent = None
+        self._statut_occupe = None
+
+    def soumettre(self, fonction, *args, rappel=None, erreur=None, progression=None,
+                  fin=None, libelle="Traitement", **kwargs):
+        """
+        Exécute fonction(*args, **kwargs) dans le pool.
+
+        Si la fonction accepte un argument `annulation`, elle reçoit l'événement
+        d'annulation de la tâche ; si elle accepte `progression` et qu'un rappel
+        de progression est fourni, elle reçoit une fonction à appeler depuis le
+        fil de travail.
+
+        Args:
+            rappel (callable, optional): Appelé dans le fil de Tk avec le résultat
+            erreur (callable, optional): Appelé dans le fil de Tk avec l'exception
+            progression (callable, optional): Appelé dans le fil de Tk avec les arguments de progression
+            fin (callable, optional): Appelé dans le fil de Tk sans argument après la tâche,
+                qu'elle ait réussi, échoué ou été annulée
+            libelle (str): Texte de l'indicateur d'activité
+
+        Returns:
+            Tache: Permet d'annuler la tâche
+        """
+        tache = Tache(libelle, rappel, erreur, progression, fin)
+        parametres = inspect.signature(fonction).parameters
+        if "annulation" in parametres:
+            kwargs["annulation"] = tache.annulation
+        if progression is not None and "progression" in parametres:
+            kwargs["progression"] = lambda *valeurs: self._messages.put((tache, "progression", valeurs))
+
+        tache.future = self._pool.submit(fonction, *args, **kwargs)
+        tache.future.add_done_callback(lambda future: self._messages.put((tache, "fin", future)))
+        self._actives.append(tache)
+        self._signaler()
+        if self._releve is None:
+            self._releve = self.root.after(INTERVALLE_RELEVE, self._relever)
+        return tache
+
+    def occupe(self):
+        """Indique si des tâches sont en cours ou en attente"""
+        return bool(self._actives)
+
+    def annuler_tout(self):
+        for tache in list(self._actives):
+            tache.annuler()
+
+    def fermer(self, attendre=True):
+        """
+        Arrête le pool. Les tâches déjà soumises, y compris les écritures en
+        file, vont jusqu'au bout : annuler auparavant celles qui peuvent l'être.
+        """
+        self._pool.shutdown(wait=attendre)
+        if self._releve is not None:
+            self.root.after_cancel(self._releve)
+            self._releve = None
+
+    # --- Fil de Tk ---
+
+    def _relever(self):
+        self._releve = None
+        try:
+            while True:
+                tache, genre, contenu = self._messages.get_nowait()
+                if genre == "progression":
+                    if not tache.annulee():
+                        tache.progression(*contenu)
+                else:
+                    self._actives.remove(tache)
+                    try:
+                        self._terminer(tache, contenu)
+                    finally:
+                        if tache.fin is not None:
+                            tache.fin()
+                    self._retenir_statut()
+        except queue.Empty:
+            pass
+        self._signaler()
+        if self._actives:
+            self._releve = self.root.after(INTERVALLE_RELEVE, self._relever)
+
+    def _terminer(self, tache, future):
+        try:
+            resultat = future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            if tache.erreur is not None:
+                tache.erreur(e)
+            elif self.statut_var is not None:
+                self.statut_var.set(f"Erreur: {str(e)}")
+            return
+        if tache.rappel is not None:
+            tache.rappel(resultat)
+
+    def _retenir_statut(self):
+        """Garde le message laissé par un rappel pour le réafficher quand tout est fini"""
+        if self.statut_var is not None and self._statut_occupe is not None:
+            texte = self.statut_var.get()
+            if texte != self._statut_occupe:
+                self._statut_precedent = texte
+
+    def _signaler(self):
+        """Affiche l'indicateur d'activité, et le retire quand tout est fini"""
+        if self.statut_var is None:
+            return
+        if self._actives:
+            libelle = self._actives[0].libelle
+            texte = f"⏳ {libelle}..." if len(self._actives) == 1 else f"⏳ {libelle}... (+{len(self._actives) - 1})"
+            if self._statut_occupe is None:
+                self._statut_precedent = self.statut_var.get()
+            if self.statut_var.get() != texte:
+                self.statut_var.set(texte)
+            self._statut_occupe = texte
+        elif self._statut_occupe is not None:
+            self.statut_var.set(self._statut_precedent)
+            self._statut_occupe = None
@@ -0,0 +1,34 @@
+import os
+from array import array
+
+import pytest
+
+from binaire import convertir_fichier_binaire
+
+
+def ecrire(chemin, valeurs):
+    with open(chemin, "wb") as f:
+        f.write(array("d", valeurs).tobytes())
+
+
+def lire(chemin):
+    with open(chemin, "rb") as f:
+        return list(array("d", f.read()))
+
+
+def test_vers_un_autre_fichier(tmp_path):
+    entree, sortie = str(tmp_path / "km.f64"), str(tmp_path / "m.f64")
+    ecrire(entree, [1.0, 2.0, 3.0])
+    convertir_fichier_binaire(entree, sortie, "km", "m", "longueur")
+    assert lire(sortie) == [1000.0, 2000.0, 3000.0]
+    assert lire(entree) == [1.0, 2.0, 3.0]
+
+
+@pytest.mark.parametrize("meme_chemin", [True, False])
+def test_sortie_identique_a_l_entree(tmp_path, meme_chemin):
+    entree = str(tmp_path / "km.f64")
+    ecrire(entree, [1.0, 2.0, 3.0])
+    sortie = entree if meme_chemin else os.path.join(str(tmp_path), ".", "km.f64")
+    taille, _ = convertir_fichier_binaire(entree, sortie, "km", "m", "longueur")
+    assert taille == 24
+    assert lire(entree) == [1000.0, 2000.0, 3000.0]
@@ -0,0 +1,206 @@
+import sys
+import threading
+
+import pytest
+
+import conversions
+from conversions import configurer_specialisation, statistiques_specialisation
+
+
+@pytest.fixture
+def specialisation():
+    yield configurer_specialisation
+    configurer_specialisation(taille=0)
+    assert conversions.convertir is conversions._convertir_direct
+
+
+def test_specialisation_desactivee_par_defaut():
+    assert conversions.convertir is conversions._convertir_direct
+    conversions.convertir(1.0, "km", "m", "longueur")
+    assert statistiques_specialisation()["taille_max"] == 0
+    assert conversions._paires == {}
+
+
+def test_specialisation_resultats_identiques(specialisation):
+    specialisation(taille=2, seuil=4)
+    attendus = {}
+    for valeur in range(50):
+        for paire in (("°C", "°F", "temperature"), ("km", "mile", "longueur"), ("h", "s", "temps")):
+            resultat = conversions.convertir(float(valeur), *paire)
+            attendus.setdefault((valeur, paire), resultat)
+            assert resultat == attendus[(valeur, paire)]
+    stats = statistiques_specialisation()
+    assert stats["promotions"] >= 2
+    assert len(stats["specialisees"]) <= 2
+
+
+def test_specialisation_concurrente(specialisation):
+    # Changements de fil fréquents : une réévaluation croise des insertions
+    intervalle = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    specialisation(taille=2, seuil=1)
+    paires = [(source, cible, "longueur") for source in ("m", "km", "cm", "mm") for cible in ("m", "dm", "mile")]
+    table = conversions.TABLES["longueur"]
+    erreurs = []
+    depart = threading.Barrier(8)
+
+    def travailler(decalage):
+        depart.wait()
+        try:
+            for i in range(20_000):
+                source, cible, grandeur = paires[(i + decalage) % len(paires)]
+                resultat = conversions.convertir(2.0, source, cible, grandeur)
+                assert resultat == 2.0 * table.matrice[table.index[source]][table.index[cible]]
+        except Exception as e:
+            erreurs.append(e)
+
+    fils = [threading.Thread(target=travailler, args=(n,)) for n in range(8)]
+    try:
+        for fil in fils:
+            fil.start()
+        for fil in fils:
+            fil.join()
+    finally:
+        sys.setswitchinterval(intervalle)
+    assert erreurs == []
+
+
+def test_cache_valeurs_non_scalaires():
+    from fractions import Fraction
+
+    from cache import activer_cache, desactiver_cache, statistiques_cache
+
+    activer_cache(taille=16, expressions=False)
+    try:
+        # Comme un tableau numpy : se multiplie, mais n'est pas hachable
+        class Tableau(float):
+            __hash__ = None
+
+        assert conversions.convertir(Tableau(2.0), "km", "m", "longueur") == 2000.0
+        assert statistiques_cache()["conversions"]["taille"] == 0
+        conversions.convertir(2.0, "km", "m", "longueur")
+        conversions.convertir(Fraction(1, 3), "h", "s", "temps")
+        assert statistiques_cache()["conversions"]["taille"] == 2
+        assert conversions.convertir(2.0, "km", "m", "longueur") == 2000.0
+        assert statistiques_cache()["conversions"]["succes"] == 1
+    finally:
+        desactiver_cache()
+    assert conversions.convertir is conversions._convertir_direct
+
+
+def test_instrumentation_installee_a_l_activation():
+    from instrumentation import activer_instrumentation, desactiver_instrumentation
+
+    assert conversions.convertir is conversions._convertir_direct
+    instrumentation = activer_instrumentation()
+    try:
+        assert conversions.convertir is not conversions._convertir_direct
+        assert conversions.convertir(2.0, "km", "m", "longueur") == 2000.0
+        assert conversions.convertir_longueur(1.0, "km", "m") == 1000.0
+        nombres = {libelle: nombre for libelle, nombre, *_ in instrumentation.resume()}
+        assert nombres["convertir longueur km m"] == 2
+    finally:
+        desactiver_instrumentation()
+    assert conversions.convertir is conversions._convertir_direct
+
+
+def test_rapports_identiques_a_la_matrice():
+    for grandeur, table in conversions.TABLES.items():
+        if table.decalages is not None:
+            continue
+        for source, i in table.index.items():
+            for cible, j in table.index.items():
+                assert table.rapports[source][cible] == table.matrice[i][j]
+                assert conversions.convertir_standard(1.0, source, cible, grandeur) == table.matrice[i][j]
+    with pytest.raises(ValueError, match="Unité cible inconnue"):
+        conversions.convertir(1.0, "km", "kg", "longueur")
+
+
+PAIRES_LOT = [("km", "mile", "longueur"), ("g", "livre", "masse"), ("°C", "°F", "temperature"),
+              ("°F", "K", "temperature")]
+
+
+@pytest.mark.parametrize("source, cible, grandeur", PAIRES_LOT)
+def test_lot_identique_au_scalaire(source, cible, grandeur):
+    from array import array
+
+    valeurs = [-40.0, 0.0, 0.5, 37.0, 1e6]
+    attendus = [conversions.convertir(v, source, cible, grandeur) for v in valeurs]
+    lot = conversions.convertir_lot
+
+    assert lot(valeurs, source, cible, grandeur) == attendus
+    assert lot(tuple(valeurs), source, cible, grandeur) == tuple(attendus)
+    resultat = lot(array("d", valeurs), source, cible, grandeur)
+    assert isinstance(resultat, array) and resultat.typecode == "d"
+    assert list(resultat) == attendus
+    resultat = lot(memoryview(array("d", valeurs)), source, cible, grandeur)
+    assert isinstance(resultat, memoryview) and resultat.tolist() == attendus
+    # Entiers : le résultat est flottant
+    resultat = lot(array("i", [1, 2, 3]), source, cible, grandeur)
+    assert resultat.typecode == "d"
+    assert list(resultat) == [conversions.convertir(v, source, cible, grandeur) for v in (1, 2, 3)]
+
+
+def test_lot_numpy():
+    np = pytest.importorskip("numpy")
+    valeurs = np.array([0.0, 100.0, -40.0])
+    resultat = conversions.convertir_lot(valeurs, "°C", "°F", "temperature")
+    assert isinstance(resultat, np.ndarray)
+    assert resultat.tolist() == [conversions.convertir(v, "°C", "°F", "temperature") for v in valeurs.tolist()]
+
+
+@pytest.mark.parametrize("source, cible, grandeur", PAIRES_LOT)
+def test_convertisseur_compile(source, cible, grandeur):
+    convertisseur = conversions.compiler(source, cible, grandeur)
+    attendu = conversions.ConvertisseurAffine if grandeur == "temperature" else conversions.ConvertisseurLineaire
+    assert type(convertisseur) is attendu
+    valeurs = [-40.0, 0.0, 37.0, 1e6]
+    assert [convertisseur(v) for v in valeurs] == [conversions.convertir(v, source, cible, grandeur) for v in valeurs]
+    assert convertisseur.batch(valeurs) == conversions.convertir_lot(valeurs, source, cible, grandeur)
+    inverse = convertisseur.inverse()
+    assert [inverse(convertisseur(v)) for v in valeurs] == pytest.approx(valeurs)
+    assert inverse(1.0) == pytest.approx(conversions.convertir(1.0, cible, source, grandeur))
+
+
+def test_compiler_unite_inconnue():
+    with pytest.raises(ValueError, match="Unité cible inconnue"):
+        conversions.compiler("°C", "°R", "temperature")
+    with pytest.raises(ValueError, match="Grandeur inconnue"):
+        conversions.compiler("km", "m", "distance")
+
+
+@pytest.mark.parametrize("valeur, source, cible, attendu", [
+    (0, "°C", "°F", 32), (100, "°C", "°F", 212), (-40, "°F", "°C", -40),
+    (0, "K", "°C", -273.15), (32, "°F", "K", 273.15), (300, "K", "°F", 80.33),
+])
+def test_table_affine_temperature(valeur, source, cible, attendu):
+    assert conversions.convertir(float(valeur), source, cible, "temperature") == pytest.approx(attendu)
+    assert conversions.convertir_temperature(float(valeur), source, cible) == pytest.approx(attendu)
+
+
+def test_temperature_aller_retour():
+    table = conversions.TABLES["temperature"]
+    assert conversions.coefficients("°C", "°F", "temperature") == (pytest.approx(1.8), pytest.approx(32))
+    for source in table.unites:
+        for cible in table.unites:
+            for valeur in (-459.67, -40.0, 0.0, 21.5, 1e4):
+                aller = conversions.convertir(valeur, source, cible, "temperature")
+                assert conversions.convertir(aller, cible, source, "temperature") == pytest.approx(valeur)
+
+
+def test_arrondi_sur_demande():
+    assert conversions.convertir(21.0, "°C", "°F", "temperature", arrondi=1) == 69.8
+    assert conversions.convertir(1.0, "km", "mile", "longueur", arrondi=2) == 0.62
+    assert conversions.convertir(1.0, "km", "mile", "longueur") != 0.62
+
+
+@pytest.mark.parametrize("grandeur", sorted(conversions.TABLES))
+def test_vers_toutes_identique_au_scalaire(grandeur):
+    table = conversions.TABLES[grandeur]
+    for source in table.unites:
+        for valeur in (-40.0, 0.0, 2.5, 1e6):
+            toutes = conversions.convertir_vers_toutes(valeur, source, grandeur)
+            assert list(toutes) == list(table.unites)
+            assert toutes == {cible: conversions.convertir(valeur, source, cible, grandeur) for cible in table.unites}
+    with pytest.raises(ValueError, match="Unité source inconnue"):
+        conversions.convertir_vers_toutes(1.0, "kg", "longueur")
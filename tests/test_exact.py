@@ -0,0 +1,42 @@
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from constantes import GRANDEURS
+from conversions import convertir, convertir_exact
+
+
+def _paires():
+    return [(source, cible, grandeur) for grandeur, unites in GRANDEURS.items()
+            for source in unites for cible in unites]
+
+
+@pytest.mark.parametrize("source, cible, grandeur", _paires())
+def test_entier_identique_au_calcul_en_fractions(source, cible, grandeur):
+    # Le raccourci pour les entiers donne exactement le résultat du calcul général
+    for valeur in (0, 7, -40, 10 ** 20):
+        attendu = convertir_exact(Fraction(valeur), source, cible, grandeur)
+        assert convertir_exact(valeur, source, cible, grandeur) == attendu
+        assert type(convertir_exact(valeur, source, cible, grandeur)) is Fraction
+        decimal = convertir_exact(valeur, source, cible, grandeur, Decimal)
+        assert decimal == Decimal(attendu.numerator) / Decimal(attendu.denominator)
+        assert float(attendu) == pytest.approx(convertir(float(valeur), source, cible, grandeur), rel=1e-12,
+                                               abs=1e-9)
+
+
+def test_aller_retour_sans_derive():
+    aller = convertir_exact(1, "µm", "mile", "longueur")
+    assert convertir_exact(aller, "mile", "nm", "longueur") == 1000
+    assert convertir_exact(-40, "°C", "°F", "temperature") == -40
+    assert convertir_exact("98.6", "°F", "°C", "temperature") == 37
+
+
+def test_entrees_et_sorties():
+    assert convertir_exact("0.1", "km", "m", "longueur") == 100
+    assert convertir_exact(Decimal("2.5"), "h", "min", "temps", Decimal) == Decimal(150)
+    assert convertir_exact(0.5, "kg", "g", "masse") == 500
+    with pytest.raises(ValueError):
+        convertir_exact(1, "km", "m", "longueur", float)
+    with pytest.raises(ValueError):
+        convertir_exact(1, "km", "kg", "longueur")
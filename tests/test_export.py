@@ -0,0 +1,38 @@
+import os
+import threading
+
+import pytest
+
+from export import exporter_historique, lire_colonnes
+from historique import JournalHistorique
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = JournalHistorique(str(tmp_path / "historique.jsonl"), retention=None)
+    yield journal
+    journal.fermer()
+
+
+def test_ucol_dictionnaire_au_dela_de_65535(journal, tmp_path):
+    journal.importer({"horodatage": "2024-01-01 12:00:00", "texte": f"{i}", "grandeur": "longueur",
+                      "valeur": i, "source": f"u{i}", "cible": "m", "resultat": i}
+                     for i in range(70_000))
+    journal.vider()
+    chemin = str(tmp_path / "export.ucol")
+    assert exporter_historique(journal, chemin) == 70_000
+    sources = [source for groupe in lire_colonnes(chemin) for source in groupe["source"]]
+    assert sources[-1] == "u69999"
+    assert len(set(sources)) == 70_000
+
+
+def test_export_annule_sans_fichier(journal, tmp_path):
+    journal.importer({"horodatage": "2024-01-01 12:00:00", "texte": f"{i}"} for i in range(50))
+    journal.vider()
+    chemin = tmp_path / "export.csv"
+    chemin.write_text("ancien export")
+    annulation = threading.Event()
+    exporter_historique(journal, str(chemin), taille_bloc=10, annulation=annulation,
+                        progression=lambda ecrites, total: annulation.set())
+    assert chemin.read_text() == "ancien export"
+    assert not any(nom.endswith(".tmp") for nom in os.listdir(tmp_path))
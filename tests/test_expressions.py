@@ -0,0 +1,71 @@
+import pytest
+
+from expressions import Mesure, Operation, Scalaire, compiler_expression, decouper, evaluer
+
+
+def test_decouper():
+    assert decouper("2,5 km × 3") == [("nombre", 2.5), ("unite", "km"), ("symbole", "×"), ("nombre", 3.0)]
+    assert [valeur for _, valeur in decouper("1*2/3−4·5")] == [1.0, "×", 2.0, "÷", 3.0, "-", 4.0, "×", 5.0]
+    assert decouper(".5e3 m") == [("nombre", 500.0), ("unite", "m")]
+    with pytest.raises(ValueError, match="Caractère inattendu"):
+        decouper("1 km % 2")
+
+
+def test_arbre_et_priorites():
+    expression = compiler_expression("1 m + 2 × 3 cm")
+    assert expression.arbre == Operation(
+        "+", Mesure(((1.0, "m"),)), Operation("×", Scalaire(2.0), Mesure(((3.0, "cm"),))))
+    assert expression.unites == ("m", "cm")
+
+
+def test_arbre_garde_en_cache():
+    texte = "(7 km + 300 m) ÷ 3"
+    assert compiler_expression(texte) is compiler_expression(texte)
+
+
+@pytest.mark.parametrize("texte, valeur, unite", [
+    # Exemples affichés dans l'onglet calculatrice
+    ("2h30min + 45min", 3.25, "h"),
+    ("500 g × 10", 5000, "g"),
+    ("1 m + 5000 mm", 6, "m"),
+    ("(1 km + 300 m) ÷ 2", 0.65, "km"),
+    ("-(1 h) + 30 min", -0.5, "h"),
+    ("6 km ÷ 3 km", 2, None),
+])
+def test_evaluer(texte, valeur, unite):
+    resultat = evaluer(texte)
+    assert resultat.valeur == pytest.approx(valeur)
+    assert resultat.unite == unite
+
+
+def test_unites_accolees():
+    assert compiler_expression("2h30min").arbre == Mesure(((2.0, "h"), (30.0, "min")))
+    assert evaluer("1 m 20 cm").valeur == pytest.approx(1.2)
+    assert evaluer("1 h 30 min 30 s").valeur == pytest.approx(1.5 + 30 / 3600)
+
+
+@pytest.mark.parametrize("texte, valeur", [
+    ("10 °C + 5 K", 15),
+    ("10 °C 5 K", 15),
+    ("20 °C - 10 °C", 10),
+    ("68 °F - 10 °C", 50),
+    ("300 K + 1 °C - 9 °F", 296),
+    ("10 °C + (5 K + 9 °F)", 20),
+])
+def test_temperatures_ecarts(texte, valeur):
+    assert evaluer(texte).valeur == pytest.approx(valeur)
+
+
+@pytest.mark.parametrize("texte, message", [
+    ("", "vide"),
+    ("1 km +", "fin"),
+    ("(1 km", "Parenthèse"),
+    ("1 km + 1 kg", "Grandeurs incompatibles"),
+    ("1 km + 2", "additionner"),
+    ("1 km × 2 km", "produit"),
+    ("2 ÷ 1 km", "diviser"),
+    ("1 km ÷ 0", "zéro"),
+])
+def test_erreurs(texte, message):
+    with pytest.raises(ValueError, match=message):
+        evaluer(texte)
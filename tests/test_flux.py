@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from conversions import convertir
+from flux import convertir_bloc_jsonl, main
+
+
+def test_csv_aller_retour(tmp_path):
+    entree = tmp_path / "mesures.csv"
+    entree.write_text("nom,distance,duree\na,1.5,3\nb,,4\nc,42,5\n", encoding="utf-8")
+    sortie = tmp_path / "miles.csv"
+    retour = tmp_path / "retour.csv"
+    assert main([str(entree), "-c", "distance", "--de", "km", "--vers", "mile", "-g", "longueur",
+                 "-o", str(sortie), "--taille-bloc", "2"]) == 0
+    lignes = sortie.read_text(encoding="utf-8").splitlines()
+    assert lignes[0] == "nom,distance,duree"
+    assert lignes[1] == f"a,{convertir(1.5, 'km', 'mile', 'longueur')!r},3"
+    assert lignes[2] == "b,,4"
+    assert main([str(sortie), "-c", "distance", "--de", "mile", "--vers", "km", "-g", "longueur",
+                 "-o", str(retour)]) == 0
+    valeurs = [ligne.split(",")[1] for ligne in retour.read_text(encoding="utf-8").splitlines()[1:]]
+    assert [float(v) if v else None for v in valeurs] == [pytest.approx(1.5), None, pytest.approx(42)]
+
+
+def test_jsonl_temperatures(tmp_path):
+    entree = tmp_path / "releves.jsonl"
+    entree.write_text('{"t": 212, "lieu": "x"}\n\n{"t": null}\n{"t": -40}\n', encoding="utf-8")
+    sortie = tmp_path / "celsius.jsonl"
+    assert main([str(entree), "-c", "t", "--de", "°F", "--vers", "°C", "-g", "temperature",
+                 "-o", str(sortie)]) == 0
+    enregistrements = [json.loads(ligne) for ligne in sortie.read_text(encoding="utf-8").splitlines()]
+    assert enregistrements[0] == {"t": pytest.approx(100), "lieu": "x"}
+    assert enregistrements[1] == {"t": None}
+    assert enregistrements[2]["t"] == pytest.approx(-40)
+
+
+@pytest.mark.parametrize("suffixe, contenu", [(".csv", "d\n1\n2\n"), (".jsonl", '{"d": 1}\n')])
+def test_sortie_identique_a_l_entree(tmp_path, capsys, suffixe, contenu):
+    entree = tmp_path / ("mesures" + suffixe)
+    entree.write_text(contenu, encoding="utf-8")
+    assert main([str(entree), "-c", "d", "--de", "km", "--vers", "m", "-g", "longueur",
+                 "-o", str(tmp_path / "." / entree.name)]) == 1
+    assert "fichier d'entrée" in capsys.readouterr().err
+    assert entree.read_text(encoding="utf-8") == contenu
+
+
+@pytest.mark.parametrize("ligne, message", [
+    ("[1, 2]", "Ligne 3 : objet JSON attendu"),
+    ('{"d": {}}', "Ligne 3, colonne d : valeur non numérique"),
+    ('{"d": "abc"}', "Ligne 3, colonne d : valeur non numérique"),
+    ("{", "Ligne 3 : JSON invalide"),
+])
+def test_jsonl_lignes_invalides(ligne, message):
+    with pytest.raises(ValueError, match=message):
+        convertir_bloc_jsonl(['{"d": 1}\n', "\n", ligne + "\n"], ["d"], 1000.0, 0.0)
+
+
+def test_csv_valeur_invalide(tmp_path, capsys):
+    entree = tmp_path / "mesures.csv"
+    entree.write_text("d\n1\n2\nx\n", encoding="utf-8")
+    assert main([str(entree), "-c", "d", "--de", "km", "--vers", "m", "-g", "longueur",
+                 "-o", str(tmp_path / "sortie.csv"), "--taille-bloc", "2"]) == 1
+    assert "Ligne 4, colonne 1 : valeur non numérique 'x'" in capsys.readouterr().err
+
+
+def test_binaire_aller_retour(tmp_path):
+    from array import array
+
+    entree = tmp_path / "valeurs.f64"
+    valeurs = array("d", [0.0, 1.5, -2.25, 1e6])
+    entree.write_bytes(valeurs.tobytes())
+    sortie = tmp_path / "metres.f64"
+    assert main([str(entree), "--de", "km", "--vers", "m", "-g", "longueur", "-o", str(sortie)]) == 0
+    assert list(array("d", sortie.read_bytes())) == [convertir(v, "km", "m", "longueur") for v in valeurs]
+    assert main([str(sortie), "--de", "m", "--vers", "km", "-g", "longueur", "--sur-place"]) == 0
+    assert list(array("d", sortie.read_bytes())) == pytest.approx(list(valeurs))
+
+
+def test_binaire_sortie_identique_a_l_entree(tmp_path):
+    from array import array
+
+    entree = tmp_path / "valeurs.f64"
+    entree.write_bytes(array("d", [1.0, 2.5]).tobytes())
+    # Même fichier sous un autre chemin : converti sur place, jamais vidé
+    assert main([str(entree), "--de", "km", "--vers", "m", "-g", "longueur",
+                 "-o", str(tmp_path / "." / entree.name)]) == 0
+    assert list(array("d", entree.read_bytes())) == [1000.0, 2500.0]
+
+
+def test_colonne_obligatoire_hors_f64(tmp_path):
+    entree = tmp_path / "mesures.csv"
+    entree.write_text("d\n1\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        main([str(entree), "--de", "km", "--vers", "m", "-g", "longueur"])
+
+
+def test_python_m_conversions(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    racine = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    entree = tmp_path / "mesures.jsonl"
+    entree.write_text('{"d": 2}\n', encoding="utf-8")
+    processus = subprocess.run(
+        [sys.executable, "-m", "conversions", str(entree), "-c", "d", "--de", "km", "--vers", "m",
+         "-g", "longueur"],
+        cwd=racine, capture_output=True, text=True, check=True,
+    )
+    assert json.loads(processus.stdout) == {"d": 2000.0}
+    assert "1 lignes converties" in processus.stderr
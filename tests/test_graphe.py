@@ -0,0 +1,76 @@
+import pytest
+
+from graphe import GrapheUnites
+from registre import valider_definitions
+
+
+@pytest.fixture
+def graphe():
+    graphe = GrapheUnites.depuis_table({"m": 1, "km": 1000, "pied": 0.3048}, "m")
+    graphe.ajouter("brasse", 6, "pied")
+    graphe.ajouter("encablure", 100, "brasse")
+    return graphe
+
+
+def test_facteur_par_chaine(graphe):
+    assert graphe.chemin("encablure", "m") == ["encablure", "brasse", "pied", "m"]
+    assert graphe.facteur("encablure", "m") == pytest.approx(182.88)
+    assert graphe.facteur("km", "brasse") == pytest.approx(1000 / 1.8288)
+    assert graphe.facteur("m", "encablure") == pytest.approx(1 / 182.88)
+
+
+def test_definitions_invalides(graphe):
+    with pytest.raises(ValueError, match="elle-même"):
+        graphe.ajouter("brasse", 1, "brasse")
+    with pytest.raises(ValueError, match="Facteur nul"):
+        graphe.ajouter("ligne", 0, "pied")
+    with pytest.raises(ValueError, match="contradictoires"):
+        graphe.ajouter("brasse", 5, "pied")
+    with pytest.raises(ValueError, match="Unité inconnue"):
+        graphe.facteur("lieue", "m")
+
+
+def test_unites_non_reliees(graphe):
+    graphe.ajouter("verste", 500, "sajene")
+    assert graphe.chemin("verste", "m") is None
+    with pytest.raises(ValueError, match="Aucune définition"):
+        graphe.facteur("verste", "m")
+
+
+def test_cycle_coherent(graphe):
+    assert graphe.cycles() == []
+    graphe.ajouter("brasse", 1.8288, "m")
+    # L'arête signalée dépend du parcours ; elle appartient au cycle brasse-pied-m
+    redondante, = graphe.cycles()
+    assert redondante in (("brasse", 6, "pied"), ("pied", 0.3048, "m"), ("brasse", 1.8288, "m"))
+    assert graphe.incoherences() == []
+
+
+def test_cycle_incoherent(graphe):
+    graphe.ajouter("encablure", 200, "m")
+    assert len(graphe.cycles()) == 1
+    incoherence, = graphe.incoherences()
+    unite, facteur, reference = graphe.cycles()[0]
+    assert (incoherence.unite, incoherence.reference, incoherence.facteur_declare) == (unite, reference, facteur)
+    # Le facteur déduit passe par les autres arêtes du cycle
+    graphe.aretes.remove((unite, facteur, reference))
+    del graphe.voisins[unite][reference], graphe.voisins[reference][unite]
+    assert incoherence.facteur_deduit == pytest.approx(graphe.facteur(unite, reference))
+    assert incoherence.ecart == pytest.approx(abs(facteur - incoherence.facteur_deduit) / incoherence.facteur_deduit)
+    assert graphe.incoherences(tolerance=0.1) == []
+
+
+def test_registre_definitions_relatives():
+    resolues = valider_definitions({"longueur": {"brasse": 1.8288, "encablure": [100, "brasse"]}})
+    assert resolues["longueur"]["encablure"] == pytest.approx(182.88)
+
+
+def test_registre_refuse_cycle_incoherent():
+    with pytest.raises(ValueError, match="définitions incohérentes"):
+        # mile existe déjà en mètres : la redéfinir en pieds ferme un cycle
+        valider_definitions({"longueur": {"mile": [5000, "pied"]}})
+
+
+def test_registre_refuse_chaine_non_reliee():
+    with pytest.raises(ValueError, match="non reliée"):
+        valider_definitions({"longueur": {"verste": [500, "sajene"]}})
@@ -0,0 +1,190 @@
+import os
+import threading
+
+import pytest
+
+import historique
+from export import exporter_historique
+from historique import JournalHistorique
+
+
+def _entree(i):
+    return {"horodatage": f"2024-01-{i % 28 + 1:02d} 12:00:00", "texte": f"{i} km",
+            "grandeur": "longueur", "source": "km", "cible": "mile"}
+
+
+def test_demarrage_non_bloquant(tmp_path, monkeypatch):
+    chemin = str(tmp_path / "historique.jsonl")
+    journal = JournalHistorique(chemin, retention=None)
+    journal.importer(_entree(i) for i in range(10))
+    journal.fermer()
+
+    liberer = threading.Event()
+    indexer = historique._indexer
+
+    def indexer_lent(chemin):
+        liberer.wait(5)
+        return indexer(chemin)
+
+    monkeypatch.setattr(historique, "_indexer", indexer_lent)
+    journal = JournalHistorique(chemin, retention=None)
+    try:
+        # Pendant l'indexation : rien ne bloque, la lecture signale qu'elle n'est pas prête
+        assert journal.nombre() is None
+        assert journal.lire_plage(0, 5) is None
+        assert not journal.pret(0)
+        journal.ajouter("11 km")
+        liberer.set()
+        assert journal.pret(5)
+        journal.vider()
+        assert journal.nombre() == 11
+        assert [e["texte"] for e in journal.lire_plage(9, 11)] == ["9 km", "11 km"]
+    finally:
+        liberer.set()
+        journal.fermer()
+
+
+def test_compactage_hors_verrou(tmp_path, monkeypatch):
+    chemin = str(tmp_path / "historique.jsonl")
+    journal = JournalHistorique(chemin, retention=5)
+    etats = []
+    fsync = historique.os.fsync
+
+    def fsync_observe(descripteur):
+        etats.append(journal._verrou.locked())
+        fsync(descripteur)
+
+    monkeypatch.setattr(historique.os, "fsync", fsync_observe)
+    try:
+        journal.importer(_entree(i) for i in range(20))
+        journal.compacter()
+        journal.vider()
+        assert journal.nombre() == 5
+        assert [e["texte"] for e in journal.lire()] == [f"{i} km" for i in range(15, 20)]
+        assert etats and not any(etats)
+    finally:
+        journal.fermer()
+
+
+def test_recherche_apres_compactage(tmp_path):
+    journal = JournalHistorique(str(tmp_path / "historique.jsonl"), retention=None)
+    try:
+        journal.importer(_entree(i) for i in range(20))
+        journal.vider()
+        generation = journal.generation
+        numeros = journal.rechercher(debut="2024-01-18", fin="2024-01-19")
+        assert [e["texte"] for e in journal.lire_lignes(numeros, generation)] == ["17 km", "18 km"]
+
+        journal.retention = 5
+        journal.compacter()
+        journal.vider()
+        # Numéros obtenus avant le compactage : périmés
+        assert journal.generation != generation
+        assert journal.lire_lignes(numeros, generation) is None
+        assert journal.lire_plage(0, 5, generation) is None
+
+        # Index reconstruit sur les lignes renumérotées
+        generation = journal.generation
+        numeros = journal.rechercher(debut="2024-01-18", fin="2024-01-19")
+        assert list(numeros) == [2, 3]
+        assert [e["texte"] for e in journal.lire_lignes(numeros, generation)] == ["17 km", "18 km"]
+    finally:
+        journal.fermer()
+
+
+def test_index_reconstruit_depuis_instantane(tmp_path):
+    chemin = str(tmp_path / "historique.jsonl")
+    journal = JournalHistorique(chemin, retention=None)
+    journal.importer(_entree(i) for i in range(10))
+    journal.fermer()
+    assert os.path.exists(chemin + ".index")
+
+    journal = JournalHistorique(chemin, retention=None)
+    try:
+        journal.importer(_entree(i) for i in range(10, 15))
+        journal.vider()
+        assert list(journal.rechercher(unite="km")) == list(range(15))
+        assert list(journal.rechercher(debut="2024-01-11", fin="2024-01-11")) == [10]
+    finally:
+        journal.fermer()
+
+
+def _grandeur(i, grandeur):
+    return dict(_entree(i), grandeur=grandeur)
+
+
+def test_instantane_perime_apres_compactage(tmp_path):
+    chemin = str(tmp_path / "historique.jsonl")
+    journal = JournalHistorique(chemin, retention=None)
+    journal.importer(_grandeur(i, "masse") for i in range(5))
+    journal.fermer()
+
+    # Compactage puis arrêt brutal : l'instantané de la fermeture précédente ne vaut plus
+    journal = JournalHistorique(chemin, retention=10)
+    journal.importer(_grandeur(i, "temps") for i in range(20))
+    journal.vider()
+    assert not os.path.exists(chemin + ".index")
+
+    relu = JournalHistorique(chemin, retention=None)
+    try:
+        assert list(relu.rechercher(grandeur="masse")) == []
+        assert len(relu.rechercher(grandeur="temps")) == relu.nombre()
+    finally:
+        relu.fermer()
+        journal.fermer()
+
+
+def test_instantane_perime_apres_reecriture(tmp_path):
+    chemin = str(tmp_path / "historique.jsonl")
+    journal = JournalHistorique(chemin, retention=None)
+    journal.importer(_grandeur(i, "masse") for i in range(5))
+    journal.fermer()
+    # Mêmes longueurs de lignes, contenu différent
+    with open(chemin, encoding="utf-8") as f:
+        contenu = f.read()
+    with open(chemin, "w", encoding="utf-8") as f:
+        f.write(contenu.replace("masse", "temps"))
+
+    journal = JournalHistorique(chemin, retention=None)
+    try:
+        assert list(journal.rechercher(grandeur="masse")) == []
+        assert list(journal.rechercher(grandeur="temps")) == list(range(5))
+    finally:
+        journal.fermer()
+
+
+def test_fil_d_ecriture_arrete_sur_erreur(tmp_path, monkeypatch):
+    def fsync(descripteur):
+        raise OSError(28, "No space left on device")
+
+    journal = JournalHistorique(str(tmp_path / "historique.jsonl"), retention=None)
+    journal.rechercher()
+    monkeypatch.setattr(historique.os, "fsync", fsync)
+    journal.importer(_entree(i) for i in range(3))
+    with pytest.raises(OSError, match="No space"):
+        journal.vider(delai=5)
+    # Le fil est arrêté : plus aucune attente sans fin
+    with pytest.raises(OSError):
+        journal.effacer()
+    with pytest.raises(OSError):
+        journal.rechercher(grandeur="longueur")
+    journal.fermer()
+
+
+def test_export_interrompu_par_compactage(tmp_path):
+    journal = JournalHistorique(str(tmp_path / "historique.jsonl"), retention=None)
+    try:
+        journal.importer(_entree(i) for i in range(20))
+        journal.vider()
+
+        journal.retention = 5
+
+        def compacter(ecrites, total):
+            journal.compacter()
+            journal.vider()
+
+        with pytest.raises(ValueError):
+            exporter_historique(journal, str(tmp_path / "export.csv"), taille_bloc=4, progression=compacter)
+        assert os.listdir(tmp_path) == ["historique.jsonl"]
+    finally:
+        journal.fermer()
@@ -0,0 +1,40 @@
+from array import array
+
+import pytest
+
+import parallele
+from conversions import convertir_lot
+from parallele import TRANCHE_MIN, convertir_lot_parallele, taille_tranche_auto
+
+
+@pytest.fixture
+def pool():
+    yield
+    parallele.fermer_pool()
+
+
+def test_sous_le_seuil_sans_processus(pool):
+    valeurs = [float(i) for i in range(1000)]
+    assert convertir_lot_parallele(valeurs, "km", "m", "longueur") == convertir_lot(valeurs, "km", "m", "longueur")
+    assert convertir_lot_parallele(valeurs, "km", "m", "longueur", processus=1, seuil=0) == \
+        convertir_lot(valeurs, "km", "m", "longueur")
+    assert parallele._pool is None
+
+
+def test_taille_tranche_auto():
+    assert taille_tranche_auto(1_000, 4) == TRANCHE_MIN
+    assert taille_tranche_auto(10_000_000, 4) == 625_000
+    assert taille_tranche_auto(10_000_001, 4) == 625_001
+
+
+@pytest.mark.parametrize("conteneur", [list, tuple, lambda v: array("d", v), lambda v: memoryview(array("d", v))])
+@pytest.mark.parametrize("source, cible, grandeur", [("km", "mile", "longueur"), ("°F", "°C", "temperature")])
+def test_reparti_identique_au_lot(pool, conteneur, source, cible, grandeur):
+    valeurs = conteneur([i * 0.5 - 100 for i in range(10_001)])
+    resultat = convertir_lot_parallele(valeurs, source, cible, grandeur, processus=2, seuil=0, taille_tranche=1_000)
+    attendu = convertir_lot(valeurs, source, cible, grandeur)
+    assert type(resultat) is type(attendu)
+    if isinstance(resultat, memoryview):
+        resultat, attendu = resultat.tolist(), attendu.tolist()
+    assert list(resultat) == list(attendu)
+    assert parallele._pool is not None
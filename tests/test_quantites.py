@@ -0,0 +1,59 @@
+import pytest
+
+from quantites import Quantite, analyser_unite, convertir_compose, unite_canonique
+
+
+def test_conversions_composees():
+    assert convertir_compose(90, "km/h", "m/s") == pytest.approx(25.0)
+    assert convertir_compose(1, "kWh", "J") == pytest.approx(3.6e6)
+    assert Quantite(1, "km").vers("m").valeur == pytest.approx(1000)
+
+
+def test_analyse_puissances():
+    assert analyser_unite("m²·kg/s^2") == analyser_unite("m^2·kg/s²")
+    facteur, dimensions = analyser_unite("J")
+    assert (facteur, dimensions) == analyser_unite("kg·m²/s²")
+    assert unite_canonique(dimensions) == "m²·kg/s²"
+
+
+def test_addition_convertit_dans_l_unite_de_gauche():
+    somme = Quantite(1, "km") + Quantite(500, "m")
+    assert somme.unite == "km"
+    assert somme.valeur == pytest.approx(1.5)
+    assert (Quantite(1, "h") - Quantite(30, "min")).valeur == pytest.approx(0.5)
+
+
+def test_addition_dimensions_incompatibles():
+    with pytest.raises(ValueError, match="Dimensions incompatibles"):
+        Quantite(1, "m") + Quantite(1, "s")
+    with pytest.raises(ValueError, match="Dimensions incompatibles"):
+        Quantite(1, "m/s").vers("m")
+
+
+def test_produit_et_quotient():
+    vitesse = Quantite(10, "m") / Quantite(2, "s")
+    assert vitesse.vers("km/h").valeur == pytest.approx(18)
+    surface = Quantite(3, "m") * Quantite(2, "m")
+    assert surface.en_si().unite == "m²"
+    assert surface.en_si().valeur == pytest.approx(6)
+    assert (2 * Quantite(3, "kg")).valeur == 6
+
+
+def test_unites_qui_s_annulent():
+    rapport = Quantite(6, "km") / Quantite(3, "m")
+    assert rapport.dimensions == (0,) * len(rapport.dimensions)
+    assert rapport.en_si().unite == "1"
+    assert rapport.en_si().valeur == pytest.approx(2000)
+
+
+def test_unite_affine_non_composable():
+    with pytest.raises(ValueError, match="affine"):
+        analyser_unite("°C·m")
+    with pytest.raises(ValueError, match="affine"):
+        Quantite(1, "°C") * Quantite(1, "m")
+
+
+@pytest.mark.parametrize("texte", ["", "truc", "m/(s", "m/", "m²·"])
+def test_unites_invalides(texte):
+    with pytest.raises(ValueError):
+        analyser_unite(texte)
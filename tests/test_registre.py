@@ -0,0 +1,51 @@
+import pytest
+
+from constantes import GRANDEURS
+from expressions import evaluer
+from quantites import Quantite
+from registre import charger_registre, reinitialiser_registre, valider_definitions
+
+
+@pytest.fixture
+def registre(tmp_path):
+    def charger(contenu):
+        chemin = tmp_path / "unites.json"
+        chemin.write_text(contenu, encoding="utf-8")
+        return charger_registre(str(chemin), chemin_cache=None)
+    yield charger
+    reinitialiser_registre()
+
+
+@pytest.mark.parametrize("nom", ["m2", "m²", "pied carré", "_x", "", "k-m"])
+def test_nom_invalide(nom):
+    with pytest.raises(ValueError, match="nom d'unité invalide"):
+        valider_definitions({"longueur": {nom: 2}})
+
+
+def test_conflit_entre_grandeurs():
+    with pytest.raises(ValueError, match="déjà définie pour longueur"):
+        valider_definitions({"masse": {"km": 2}})
+    with pytest.raises(ValueError, match="unité dérivée"):
+        valider_definitions({"temps": {"Hz": 2}})
+
+
+def test_redefinition():
+    assert valider_definitions({"longueur": {"km": 1000}}) == {}
+    with pytest.raises(ValueError, match="redéfinition incohérente"):
+        valider_definitions({"longueur": {"km": 999}})
+
+
+def test_grandeur_inconnue_et_facteur_invalide():
+    with pytest.raises(ValueError, match="Grandeur inconnue"):
+        valider_definitions({"vitesse": {"noeud": 0.514}})
+    with pytest.raises(ValueError):
+        valider_definitions({"longueur": {"brasse": 0}})
+
+
+def test_nom_accepte_lisible_partout(registre):
+    # Un nom accepté par le registre est lu par la calculatrice et l'analyse dimensionnelle
+    assert registre('{"longueur": {"Ångström": 1e-10, "µpouce": 2.54e-8}}') == 2
+    assert "Ångström" in GRANDEURS["longueur"]
+    assert evaluer("1 Ångström + 1 m").unite == "Ångström"
+    assert Quantite(1, "Ångström/s").vers("m/s").valeur == pytest.approx(1e-10)
+    assert Quantite(1, "µpouce").vers("m").valeur == pytest.approx(2.54e-8)
@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+import pytest
+
+from serveur import ServiceConversion
+
+
+async def _requete(chemin, corps, longueur=None):
+    service = ServiceConversion()
+    serveur = await asyncio.start_server(service.servir_client, "127.0.0.1", 0)
+    port = serveur.sockets[0].getsockname()[1]
+    try:
+        lecteur, ecrivain = await asyncio.open_connection("127.0.0.1", port)
+        corps = corps.encode("utf-8")
+        longueur = len(corps) if longueur is None else longueur
+        ecrivain.write(f"POST {chemin} HTTP/1.1\r\nContent-Length: {longueur}\r\n"
+                       f"Connection: close\r\n\r\n".encode("latin-1") + corps)
+        reponse = await lecteur.read()
+        ecrivain.close()
+    finally:
+        serveur.close()
+        await serveur.wait_closed()
+    entete, _, contenu = reponse.partition(b"\r\n\r\n")
+    return int(entete.split()[1]), json.loads(contenu)
+
+
+def requete(chemin, corps, longueur=None):
+    return asyncio.run(_requete(chemin, corps, longueur))
+
+
+def test_conversion():
+    statut, reponse = requete("/convertir", '{"valeur": 2, "de": "km", "vers": "m", "grandeur": "longueur"}')
+    assert (statut, reponse) == (200, {"resultat": 2000.0})
+
+
+@pytest.mark.parametrize("chemin, corps", [
+    # Entier trop grand pour un float
+    ("/convertir", '{"valeur": 1%s, "de": "km", "vers": "m", "grandeur": "longueur"}' % ("0" * 400)),
+    ("/lot", '{"valeurs": [1, 1%s], "de": "km", "vers": "m", "grandeur": "longueur"}' % ("0" * 400)),
+    # Résultats infinis ou NaN
+    ("/convertir", '{"valeur": 1e308, "de": "km", "vers": "m", "grandeur": "longueur"}'),
+    ("/convertir", '{"valeur": NaN, "de": "km", "vers": "m", "grandeur": "longueur"}'),
+    ("/lot", '{"valeurs": [1, 1e400], "de": "km", "vers": "m", "grandeur": "longueur"}'),
+])
+def test_valeurs_hors_limites(chemin, corps):
+    statut, reponse = requete(chemin, corps)
+    assert statut == 400
+    assert "erreur" in reponse
+
+
+@pytest.mark.parametrize("longueur", ["-5", "abc", "+2", "1_0", "1e3"])
+def test_content_length_invalide(longueur):
+    statut, reponse = requete("/convertir", "{}", longueur)
+    assert (statut, reponse) == (400, {"erreur": "Content-Length invalide"})
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RACINE, "benchmarks"))
+
+from verifier_import import MODULES_MOTEUR, mesurer  # noqa: E402
+
+
+def test_moteur_sans_module_interdit():
+    cumuls, charges = mesurer(MODULES_MOTEUR)
+    assert charges == []
+    assert set(cumuls) == set(MODULES_MOTEUR)
+
+
+def test_module_interdit_detecte():
+    # L'historique démarre un thread d'écriture : il ne fait pas partie du moteur
+    _, charges = mesurer(("historique",))
+    assert "threading" in charges
+
+
+def test_budget_depasse():
+    processus = subprocess.run(
+        [sys.executable, os.path.join(RACINE, "benchmarks", "verifier_import.py"), "--budget", "0.001",
+         "--essais", "1"],
+        capture_output=True, text=True,
+    )
+    assert processus.returncode == 1
+    assert "ÉCHEC : import du moteur trop lent" in processus.stdout
@@ -0,0 +1,177 @@
+"""
+Affichage fenêtré de l'historique pour l'onglet Historique. Seules les lignes
+visibles sont rendues dans la zone de texte ; elles sont relues à la demande
+dans le journal, et une nouvelle conversion n'insère qu'une seule ligne en tête.
+Le résultat d'une recherche s'affiche de la même façon, ligne par ligne ; il
+est abandonné si un compactage ou un effacement renumérote les lignes.
+"""
+import customtkinter as ctk
+
+from historique import formater_entree
+from instrumentation import mesurer
+
+ENTETE = "Historique des conversions:\n\n"
+LIGNE_ENTETE = 3  # première ligne de la zone de texte après l'en-tête
+LIGNES_VISIBLES = 40  # valeur initiale, recalculée d'après la hauteur du widget
+ATTENTE_CHARGEMENT = 100  # ms entre deux essais tant que le journal s'indexe
+
+class VueHistorique(ctk.CTkFrame):
+    """
+    Vue virtualisée d'un JournalHistorique, les entrées les plus récentes en haut.
+
+    Args:
+        parent: Widget parent
+        journal (JournalHistorique): Source des entrées
+    """
+
+    def __init__(self, parent, journal, **kwargs):
+        super().__init__(parent, fg_color="transparent", **kwargs)
+        self.journal = journal
+        self.lignes_visibles = LIGNES_VISIBLES
+        self.decalage = 0  # nombre d'entrées plus récentes que la première ligne affichée
+        self.affichees = 0  # nombre d'entrées présentes dans la zone de texte
+        self.selection = None  # numéros de ligne d'une recherche, None pour tout afficher
+        self.generation = None  # génération du journal sous laquelle la sélection a été obtenue
+        self.rendu_planifie = None  # rendu repoussé tant que le journal s'indexe
+
+        self.police = ctk.CTkFont(family="Courier", size=12)
+        self.texte = ctk.CTkTextbox(self, wrap="none", font=self.police, activate_scrollbars=False)
+        self.texte.pack(side="left", fill="both", expand=True)
+        self.barre = ctk.CTkScrollbar(self, command=self.defiler)
+        self.barre.pack(side="right", fill="y")
+
+        self.texte.bind("<MouseWheel>", self._molette)
+        self.texte.bind("<Button-4>", lambda e: self._deplacer(-3))
+        self.texte.bind("<Button-5>", lambda e: self._deplacer(3))
+        self.texte.bind("<Configure>", self._redimensionner)
+
+        self.texte.insert("1.0", ENTETE)
+        self.texte.configure(state="disabled")
+
+    def charger(self):
+        """Revient en haut de l'historique complet et rend la fenêtre visible"""
+        self.selection = None
+        self.decalage = 0
+        self.rendre()
+
+    def afficher_selection(self, numeros, generation=None):
+        """
+        Affiche seulement les lignes trouvées par une recherche, les plus récentes en haut.
+
+        Args:
+            numeros: Numéros de ligne renvoyés par JournalHistorique.rechercher
+            generation (int, optional): JournalHistorique.generation lue avant la recherche
+        """
+        self.selection = numeros
+        self.generation = generation
+        self.decalage = 0
+        self.rendre()
+
+    def _total(self):
+        return len(self.selection) if self.selection is not None else self.journal.nombre()
+
+    def rendre(self):
+        """Relit dans le journal les seules entrées visibles et les affiche"""
+        with mesurer("rafraichir", vue="historique"):
+            self._rendre()
+
+    def _rendre(self):
+        total = self._total()
+        if total is None:
+            # Journal encore en cours d'indexation : on réessaie sans bloquer
+            self._afficher_chargement()
+            return
+        self.decalage = max(0, min(self.decalage, total - self.lignes_visibles))
+        fin = total - self.decalage
+        if self.selection is not None:
+            entrees = self.journal.lire_lignes(self.selection[max(0, fin - self.lignes_visibles):fin],
+                                               self.generation)
+            if entrees is None:
+                # Lignes renumérotées depuis la recherche : retour à l'historique complet
+                self.charger()
+                return
+        else:
+            entrees = self.journal.lire_plage(max(0, fin - self.lignes_visibles), fin)
+            if entrees is None:
+                self._afficher_chargement()
+                return
+
+        self.texte.configure(state="normal")
+        self.texte.delete("1.0", "end")
+        self.texte.insert("1.0", ENTETE + "".join(formater_entree(e) + "\n" for e in reversed(entrees)))
+        self.texte.configure(state="disabled")
+        self.affichees = len(entrees)
+        self._maj_barre(total)
+
+    def _afficher_chargement(self):
+        if self.rendu_planifie is None:
+            self.texte.configure(state="normal")
+            self.texte.delete("1.0", "end")
+            self.texte.insert("1.0", ENTETE + "Chargement de l'historique...\n")
+            self.texte.configure(state="disabled")
+            self.affichees = 0
+            self.rendu_planifie = self.after(ATTENTE_CHARGEMENT, self._rendre_planifie)
+
+    def _rendre_planifie(self):
+        self.rendu_planifie = None
+        self.rendre()
+
+    def ajouter_entree(self, entree):
+        """Affiche une nouvelle entrée sans reconstruire la vue"""
+        if self.selection is not None:
+            # Résultats de recherche affichés : ils ne changent pas
+            return
+        total = self.journal.nombre()
+        if total is None:
+            # Le rendu planifié affichera l'entrée une fois le journal indexé
+            return
+        if self.decalage:
+            # L'utilisateur consulte des entrées plus anciennes : la vue ne bouge pas
+            self.decalage += 1
+            self._maj_barre(total)
+            return
+
+        self.texte.configure(state="normal")
+        self.texte.insert(f"{LIGNE_ENTETE}.0", formater_entree(entree) + "\n")
+        if self.affichees >= self.lignes_visibles:
+            self.texte.delete("end-2l", "end-1l")
+        else:
+            self.affichees += 1
+        self.texte.configure(state="disabled")
+        self._maj_barre(total)
+
+    def defiler(self, action, valeur, unite=None):
+        """Commande de la barre de défilement ("moveto" ou "scroll")"""
+        total = self._total()
+        if total is None:
+            return
+        if action == "moveto":
+            self.decalage = int(float(valeur) * total)
+            self.rendre()
+        elif action == "scroll":
+            pas = self.lignes_visibles if unite == "pages" else 1
+            self._deplacer(int(valeur) * pas)
+
+    def _deplacer(self, lignes):
+        self.decalage = max(0, self.decalage + lignes)
+        self.rendre()
+        return "break"
+
+    def _molette(self, event):
+        # Windows : multiples de 120 ; macOS : petites valeurs
+        pas = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._deplacer(-3 * pas)
+
+    def _redimensionner(self, event):
+        hauteur_ligne = self.police.metrics("linespace") or 1
+        lignes = max(1, event.height // hauteur_ligne - (LIGNE_ENTETE - 1))
+        if lignes != self.lignes_visibles:
+            self.lignes_visibles = lignes
+            self.rendre()
+
+    def _maj_barre(self, total):
+        if total <= 0:
+            self.barre.set(0, 1)
+            return
+        debut = self.decalage / total
+        self.barre.set(debut, min(1, debut + self.lignes_visibles / total))